@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import tkinter as tk
+from tkinter import messagebox, ttk
+from typing import Mapping
+
+from normalization import NormalizerStats
+
+ALIAS_SEPARATOR = "="
+
+
+def format_aliases(aliases: Mapping[str, str]) -> str:
+    lines = [
+        f"{variant} {ALIAS_SEPARATOR} {target}"
+        for variant, target in sorted(aliases.items(), key=lambda item: (item[1].casefold(), item[0].casefold()))
+    ]
+    return "\n".join(lines)
+
+
+def parse_aliases(text: str) -> dict[str, str]:
+    aliases: dict[str, str] = {}
+    for number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        variant, sep, target = line.partition(ALIAS_SEPARATOR)
+        if not sep or not variant.strip() or not target.strip():
+            raise ValueError(f"Linha {number}: use 'variante {ALIAS_SEPARATOR} nome padrão'")
+        aliases[variant.strip()] = target.strip()
+    return aliases
+
+
+class AliasDialog(tk.Toplevel):
+    def __init__(self, master: tk.Misc, aliases: Mapping[str, str], stats: NormalizerStats) -> None:
+        super().__init__(master)
+
+        self.title("Apelidos de Produto/Avaria")
+        self.transient(master)
+
+        self.result: dict[str, str] | None = None
+
+        frame = ttk.Frame(self, padding=12)
+        frame.pack(fill="both", expand=True)
+        frame.columnconfigure(0, weight=1)
+        frame.rowconfigure(1, weight=1)
+
+        ttk.Label(
+            frame,
+            text=(
+                f"Um apelido por linha: variante {ALIAS_SEPARATOR} nome padrão.\n"
+                "Maiúsculas, acentos e espaços já são ignorados automaticamente."
+            ),
+            justify="left",
+        ).grid(row=0, column=0, columnspan=2, sticky="w", pady=(0, 6))
+
+        self.text = tk.Text(frame, width=70, height=16, wrap="none")
+        scroll = ttk.Scrollbar(frame, orient="vertical", command=self.text.yview)
+        self.text.configure(yscrollcommand=scroll.set)
+        self.text.grid(row=1, column=0, sticky="nsew")
+        scroll.grid(row=1, column=1, sticky="ns")
+        self.text.insert("1.0", format_aliases(aliases))
+
+        ttk.Label(frame, text=f"Cache de normalização: {stats.describe()}").grid(
+            row=2, column=0, columnspan=2, sticky="w", pady=(6, 0)
+        )
+
+        buttons = ttk.Frame(frame)
+        buttons.grid(row=3, column=0, columnspan=2, sticky="e", pady=(10, 0))
+        ttk.Button(buttons, text="Salvar", command=self._on_ok).grid(row=0, column=0, padx=4)
+        ttk.Button(buttons, text="Cancelar", command=self.destroy).grid(row=0, column=1, padx=4)
+
+        self.bind("<Escape>", lambda _evt: self.destroy())
+
+        self.grab_set()
+        self.text.focus_set()
+
+    def _on_ok(self) -> None:
+        try:
+            self.result = parse_aliases(self.text.get("1.0", "end"))
+        except ValueError as e:
+            messagebox.showerror("Apelidos", str(e), parent=self)
+            return
+        self.destroy()
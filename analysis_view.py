@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import tkinter as tk
+from tkinter import ttk
+
+from rollup import DIMENSION_LABELS, DIMENSIONS, RollupCube
+
+_NONE = "—"
+
+
+class AnalysisView(ttk.Frame):
+    def __init__(self, master: tk.Misc, cube: RollupCube, *, max_rows: int = 500) -> None:
+        super().__init__(master)
+
+        self.cube = cube
+        self.max_rows = max_rows
+        self._labels = {label: dim for dim, label in DIMENSION_LABELS.items()}
+
+        self.group_var = tk.StringVar(value=DIMENSION_LABELS["cliente"])
+        self.then_var = tk.StringVar(value=_NONE)
+        self.filter_dim_var = tk.StringVar(value=_NONE)
+        self.filter_value_var = tk.StringVar()
+        self.total_var = tk.StringVar()
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+
+        controls = ttk.Frame(self)
+        controls.grid(row=0, column=0, sticky="ew", padx=8, pady=(8, 4))
+
+        labels = [DIMENSION_LABELS[d] for d in DIMENSIONS]
+        ttk.Label(controls, text="Agrupar por").grid(row=0, column=0, sticky="w", padx=(0, 4))
+        group_combo = ttk.Combobox(controls, values=labels, textvariable=self.group_var, state="readonly", width=18)
+        group_combo.grid(row=0, column=1, sticky="w", padx=4)
+        ttk.Label(controls, text="e por").grid(row=0, column=2, sticky="w", padx=4)
+        then_combo = ttk.Combobox(
+            controls, values=[_NONE, *labels], textvariable=self.then_var, state="readonly", width=18
+        )
+        then_combo.grid(row=0, column=3, sticky="w", padx=4)
+
+        ttk.Label(controls, text="Filtrar").grid(row=1, column=0, sticky="w", padx=(0, 4), pady=(4, 0))
+        filter_combo = ttk.Combobox(
+            controls, values=[_NONE, *labels], textvariable=self.filter_dim_var, state="readonly", width=18
+        )
+        filter_combo.grid(row=1, column=1, sticky="w", padx=4, pady=(4, 0))
+        ttk.Label(controls, text="=").grid(row=1, column=2, sticky="w", padx=4, pady=(4, 0))
+        self.filter_value_combo = ttk.Combobox(
+            controls, textvariable=self.filter_value_var, state="readonly", width=24
+        )
+        self.filter_value_combo.grid(row=1, column=3, sticky="w", padx=4, pady=(4, 0))
+
+        for combo in (group_combo, then_combo, self.filter_value_combo):
+            combo.bind("<<ComboboxSelected>>", lambda _evt: self.refresh())
+        filter_combo.bind("<<ComboboxSelected>>", lambda _evt: self._on_filter_dimension())
+
+        table = ttk.Frame(self)
+        table.grid(row=1, column=0, sticky="nsew", padx=8)
+        table.columnconfigure(0, weight=1)
+        table.rowconfigure(0, weight=1)
+
+        self.tree = ttk.Treeview(table, show="headings")
+        scroll = ttk.Scrollbar(table, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scroll.set)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        scroll.grid(row=0, column=1, sticky="ns")
+
+        ttk.Label(self, textvariable=self.total_var, anchor="w").grid(row=2, column=0, sticky="ew", padx=8, pady=(4, 8))
+
+    def _dimension(self, label: str) -> str | None:
+        return self._labels.get(label)
+
+    def _on_filter_dimension(self) -> None:
+        dim = self._dimension(self.filter_dim_var.get())
+        values = self.cube.values(dim) if dim is not None else []
+        self.filter_value_combo.configure(values=values)
+        self.filter_value_var.set(values[0] if values else "")
+        self.refresh()
+
+    def refresh(self) -> None:
+        group_by = [self._dimension(self.group_var.get()) or "cliente"]
+        then = self._dimension(self.then_var.get())
+        if then is not None and then not in group_by:
+            group_by.append(then)
+
+        filters = {}
+        filter_dim = self._dimension(self.filter_dim_var.get())
+        if filter_dim is not None and self.filter_value_var.get():
+            filters[filter_dim] = self.filter_value_var.get()
+
+        rows = self.cube.query(group_by, filters)
+        total = sum(count for _cell, count in rows)
+
+        columns = [DIMENSION_LABELS[d] for d in group_by] + ["Qtd", "%"]
+        if list(self.tree["columns"]) != columns:
+            self.tree.configure(columns=columns)
+            for col in columns:
+                self.tree.heading(col, text=col)
+                numeric = col in {"Qtd", "%"}
+                self.tree.column(col, width=70 if numeric else 180, stretch=not numeric, anchor="center" if numeric else "w")
+
+        self.tree.delete(*self.tree.get_children(""))
+        for cell, count in rows[: self.max_rows]:
+            share = f"{count / total * 100:.1f}" if total else "0.0"
+            self.tree.insert("", "end", values=[*cell, count, share])
+
+        shown = min(len(rows), self.max_rows)
+        self.total_var.set(f"{total} registro(s) em {len(rows)} grupo(s)" + (f", exibindo {shown}" if shown < len(rows) else ""))
@@ -1,33 +1,43 @@
 from __future__ import annotations
 
+import math
 import os
-import re
-from datetime import datetime
+import queue
+import time
+from datetime import date, datetime
 from pathlib import Path
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
+from typing import TYPE_CHECKING, Any, Callable, Iterable
+
+from alias_dialog import AliasDialog
+from analysis_view import AnalysisView
+from archive import ArchiveStats, RmaArchive
+from archive_dialog import ArchiveSearchDialog
+from consolidation import consolidate_workbooks, find_workbooks
+from date_index import DateIndex, month_range
+from duplicate_dialog import DuplicateDialog
+from duplicates import MATCH_LABELS, REPLACE, SKIP, DuplicateIndex, DuplicateStats
+from entry_store import CATEGORICAL_FIELDS, ENTRY_FIELDS, FREE_TEXT_FIELDS, EntryStore
+from export_cache import ExportCache, entries_digest, row_digest
+from excel_exporter import MESES, IncrementalSummary, RmaEntry, export_to_excel, parse_recebimento
+from importer import WorkbookImportError, detect_paste_delimiter, iter_pasted_entries, iter_workbook_entries
+from jobs import BackgroundJob, JobContext
+from normalization import Normalizer, load_aliases, save_aliases
+from paste_dialog import PastePreviewDialog
+from progress_dialog import ProgressDialog
+from rollup import RollupCube
+from search_index import SearchIndex
+from sort_keys import SortKeyCache
+from split_export import SPLIT_KEYS, split_export
+from tracing import TRACER, laps, span
+from vector_summary import numpy_available, summarize_store
+from virtual_table import VirtualTable
+
+if TYPE_CHECKING:
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    from matplotlib.figure import Figure
 
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-import openpyxl
-
-from excel_exporter import RmaEntry, export_to_excel, summarize_entries
-
-
-MESES = [
-    "JANEIRO",
-    "FEVEREIRO",
-    "MARÇO",
-    "ABRIL",
-    "MAIO",
-    "JUNHO",
-    "JULHO",
-    "AGOSTO",
-    "SETEMBRO",
-    "OUTUBRO",
-    "NOVEMBRO",
-    "DEZEMBRO",
-]
 
 PALETTE = [
     "#FFD966",
@@ -42,6 +52,8 @@ PALETTE = [
     "#C9C9C9",
 ]
 
+SUMMARY_LIMITS = ["Todos", "10", "20", "50", "100"]
+
 
 class RmaApp(tk.Tk):
     def __init__(self) -> None:
@@ -57,6 +69,15 @@ class RmaApp(tk.Tk):
         self.periodo_mes_var = tk.StringVar(value=MESES[now.month - 1])
         self.periodo_ano_var = tk.StringVar(value=str(now.year))
         self.abrir_ao_exportar_var = tk.BooleanVar(value=True)
+        self.separar_por_var = tk.StringVar(value=SPLIT_KEYS["cliente"])
+        self.incluir_analise_var = tk.BooleanVar(value=False)
+        self.resumo_limite_var = tk.StringVar(value=SUMMARY_LIMITS[0])
+        self.incluir_detalhamento_var = tk.BooleanVar(value=False)
+        self.agrupar_variacoes_var = tk.BooleanVar(value=True)
+        self.periodo_filtro_var = tk.BooleanVar(value=False)
+        self.periodo_de_var = tk.StringVar()
+        self.periodo_ate_var = tk.StringVar()
+        self.periodo_info_var = tk.StringVar()
 
         self.vars: dict[str, tk.StringVar] = {
             "recebimento": tk.StringVar(value=now.strftime("%d/%m/%Y")),
@@ -74,9 +95,35 @@ class RmaApp(tk.Tk):
             "pedido_marketplace": tk.StringVar(),
         }
 
-        self.entry_counter = 0
-        self.entry_by_id: dict[str, RmaEntry] = {}
-        self.editing_id: str | None = None
+        self.store = EntryStore()
+        self.search_index = SearchIndex(
+            ENTRY_FIELDS,
+            CATEGORICAL_FIELDS,
+            tokenized=FREE_TEXT_FIELDS,
+            alive=self.store,
+            current=self.store.get,
+            text_of=self.store.search_text,
+        )
+        self.normalizer = Normalizer(self._read_aliases())
+        self.duplicate_index = DuplicateIndex(self.store.row, normalizer=self._active_normalizer())
+        self.cube = RollupCube(normalizer=self._active_normalizer())
+        self.sort_keys = SortKeyCache(self.store)
+        self.date_index = DateIndex()
+        self.period_ids: list[int] | None = None
+        self._sort_state: tuple[str, bool] | None = None
+        self.analysis_view: AnalysisView | None = None
+        self._analysis_stale = False
+        self.row_digests: dict[int, bytes] = {}
+        self.export_cache = ExportCache()
+        self.filter_ids: list[int] | None = None
+        self.filtro_var = tk.StringVar()
+        self.filtro_coluna_var = tk.StringVar(value="Todas as colunas")
+        self.filtro_resumo_var = tk.BooleanVar(value=False)
+        self._filter_after_id: str | None = None
+        self._filter_key: tuple[str, str, tuple[date, date] | None] | None = None
+        self._indexing_scheduled = False
+        self.editing_id: int | None = None
+        self.summary = IncrementalSummary(normalizer=self._active_normalizer())
 
         self.laudo_text: tk.Text | None = None
         self.add_update_button: ttk.Button | None = None
@@ -84,15 +131,46 @@ class RmaApp(tk.Tk):
         self.chart_fig: Figure | None = None
         self.chart_ax = None
         self.chart_canvas: FigureCanvasTkAgg | None = None
-
-        self.tree: ttk.Treeview | None = None
+        self.notebook: ttk.Notebook | None = None
+        self.chart_tab: ttk.Frame | None = None
+        self._chart_labels: list[str] = []
+        self._chart_wedges: list[Any] = []
+        self._chart_autotexts: list[Any] = []
+        self._chart_pending: set[str] = set()
+        self._chart_init_scheduled = False
+
+        self.table: VirtualTable | None = None
         self.pieces_tree: ttk.Treeview | None = None
         self.reasons_tree: ttk.Treeview | None = None
+        self._rendered_summary_rows: dict[ttk.Treeview, list[tuple[str, int]]] = {}
+
+        self.active_job: BackgroundJob | None = None
+        self.progress_dialog: ProgressDialog | None = None
+
+        self._dirty: set[str] = set()
+        self._refresh_pending = False
+        self._chart_has_data = False
+        self.trace_status_var = tk.StringVar(value="Rastreamento ativo")
+        self._trace_records: queue.SimpleQueue[dict[str, Any]] = queue.SimpleQueue()
 
         self._build_ui()
-        self._refresh_summaries()
+
+        if TRACER.enabled:
+            TRACER.add_listener(self._on_trace_record)
+            self.after(500, self._poll_trace_status)
+
+        self.periodo_mes_var.trace_add("write", lambda *_: self._on_period_changed(title=True))
+        self.periodo_ano_var.trace_add("write", lambda *_: self._on_period_changed(title=True))
+        self.periodo_de_var.trace_add("write", lambda *_: self._on_period_changed())
+        self.periodo_ate_var.trace_add("write", lambda *_: self._on_period_changed())
+
+        self._schedule_refresh("table", "summary", "chart")
 
     def _build_ui(self) -> None:
+        if TRACER.enabled:
+            status_bar = ttk.Label(self, textvariable=self.trace_status_var, anchor="w", relief="sunken", padding=(6, 2))
+            status_bar.pack(side="bottom", fill="x")
+
         main = ttk.Frame(self)
         main.pack(fill="both", expand=True)
 
@@ -139,6 +217,62 @@ class RmaApp(tk.Tk):
             row=1, column=6, sticky="e", padx=6, pady=4
         )
 
+        ttk.Button(meta, text="Consolidar Pasta", command=self._consolidate_folder).grid(
+            row=0, column=6, sticky="e", padx=6, pady=4
+        )
+
+        ttk.Label(meta, text="Separar por").grid(row=2, column=0, sticky="w", padx=6, pady=4)
+        ttk.Combobox(
+            meta,
+            values=list(SPLIT_KEYS.values()),
+            textvariable=self.separar_por_var,
+            state="readonly",
+            width=16,
+        ).grid(row=2, column=1, sticky="w", padx=6, pady=4)
+        ttk.Checkbutton(
+            meta,
+            text="Agrupar variações",
+            variable=self.agrupar_variacoes_var,
+            command=self._rebuild_normalized_state,
+        ).grid(row=2, column=2, columnspan=2, sticky="w", padx=6, pady=4)
+        ttk.Checkbutton(meta, text="Incluir aba Análise", variable=self.incluir_analise_var).grid(
+            row=2, column=4, sticky="w", padx=6, pady=4
+        )
+        ttk.Button(meta, text="Apelidos", command=self._edit_aliases).grid(
+            row=2, column=5, sticky="e", padx=6, pady=4
+        )
+        ttk.Button(meta, text="Exportar Separado", command=self._split_export).grid(
+            row=2, column=6, sticky="e", padx=6, pady=4
+        )
+
+        ttk.Checkbutton(
+            meta,
+            text="Filtrar pelo período",
+            variable=self.periodo_filtro_var,
+            command=self._on_period_changed,
+        ).grid(row=3, column=0, columnspan=2, sticky="w", padx=6, pady=4)
+        period_range = ttk.Frame(meta)
+        period_range.grid(row=3, column=2, columnspan=3, sticky="w", padx=6, pady=4)
+        ttk.Label(period_range, text="De").grid(row=0, column=0, sticky="w")
+        ttk.Entry(period_range, textvariable=self.periodo_de_var, width=11).grid(row=0, column=1, padx=(4, 8))
+        ttk.Label(period_range, text="Até").grid(row=0, column=2, sticky="w")
+        ttk.Entry(period_range, textvariable=self.periodo_ate_var, width=11).grid(row=0, column=3, padx=(4, 0))
+        ttk.Label(meta, textvariable=self.periodo_info_var).grid(
+            row=3, column=5, columnspan=2, sticky="e", padx=6, pady=4
+        )
+
+        ttk.Label(meta, text="Itens no Resumo").grid(row=4, column=0, sticky="w", padx=6, pady=4)
+        ttk.Combobox(
+            meta,
+            values=SUMMARY_LIMITS,
+            textvariable=self.resumo_limite_var,
+            state="readonly",
+            width=16,
+        ).grid(row=4, column=1, sticky="w", padx=6, pady=4)
+        ttk.Checkbutton(meta, text="Incluir aba Detalhamento", variable=self.incluir_detalhamento_var).grid(
+            row=4, column=2, columnspan=3, sticky="w", padx=6, pady=4
+        )
+
         form = ttk.LabelFrame(left, text="Cadastro")
         form.grid(row=1, column=0, sticky="ew", padx=0, pady=(0, 10))
 
@@ -183,7 +317,7 @@ class RmaApp(tk.Tk):
 
         actions = ttk.Frame(left)
         actions.grid(row=2, column=0, sticky="ew", padx=0, pady=(0, 10))
-        actions.columnconfigure(5, weight=1)
+        actions.columnconfigure(7, weight=1)
 
         self.add_update_button = ttk.Button(actions, text="Adicionar", command=self._add_or_update_entry)
         self.add_update_button.grid(row=0, column=0, padx=4, pady=4, sticky="w")
@@ -197,11 +331,17 @@ class RmaApp(tk.Tk):
         ttk.Button(actions, text="Colar Dados", command=self._paste_data).grid(
             row=0, column=4, padx=4, pady=4, sticky="w"
         )
+        ttk.Button(actions, text="Arquivar", command=self._archive_entries).grid(
+            row=0, column=5, padx=4, pady=4, sticky="w"
+        )
+        ttk.Button(actions, text="Buscar no Arquivo", command=self._search_archive).grid(
+            row=0, column=6, padx=4, pady=4, sticky="w"
+        )
 
         table_frame = ttk.LabelFrame(left, text="Registros")
         table_frame.grid(row=3, column=0, sticky="nsew")
         table_frame.columnconfigure(0, weight=1)
-        table_frame.rowconfigure(0, weight=1)
+        table_frame.rowconfigure(1, weight=1)
 
         cols = [
             "RECEBIMENTO",
@@ -220,43 +360,67 @@ class RmaApp(tk.Tk):
             "LAUDO TÉCNICO",
         ]
 
-        self.tree = ttk.Treeview(table_frame, columns=cols, show="headings", selectmode="extended")
-        for c in cols:
-            self.tree.heading(c, text=c)
-            self.tree.column(c, width=110, stretch=True)
-
-        self.tree.column("RECEBIMENTO", width=110, stretch=False)
-        self.tree.column("Cliente", width=160, stretch=True)
-        self.tree.column("Produto enviado", width=180, stretch=True)
-        self.tree.column("Configuração/Avaria", width=220, stretch=True)
-        self.tree.column("LAUDO TÉCNICO", width=260, stretch=True)
-
-        xscroll = ttk.Scrollbar(table_frame, orient="horizontal", command=self.tree.xview)
-        yscroll = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(xscrollcommand=xscroll.set, yscrollcommand=yscroll.set)
-
-        self.tree.grid(row=0, column=0, sticky="nsew")
-        yscroll.grid(row=0, column=1, sticky="ns")
-        xscroll.grid(row=1, column=0, sticky="ew")
-
-        self.tree.bind("<Double-1>", lambda _evt: self._edit_selected())
+        self._column_titles = cols
+        self.table = VirtualTable(
+            table_frame,
+            cols,
+            row_ids=self._visible_ids,
+            get_values=self.store.values,
+        )
+        self.table.grid(row=1, column=0, sticky="nsew")
+
+        filter_bar = ttk.Frame(table_frame)
+        filter_bar.grid(row=0, column=0, sticky="ew", pady=(2, 4))
+        filter_bar.columnconfigure(1, weight=1)
+
+        ttk.Label(filter_bar, text="Filtrar").grid(row=0, column=0, sticky="w", padx=(6, 4))
+        ttk.Entry(filter_bar, textvariable=self.filtro_var).grid(row=0, column=1, sticky="ew", padx=4)
+        ttk.Combobox(
+            filter_bar,
+            values=["Todas as colunas", *cols],
+            textvariable=self.filtro_coluna_var,
+            state="readonly",
+            width=20,
+        ).grid(row=0, column=2, sticky="w", padx=4)
+        ttk.Checkbutton(
+            filter_bar,
+            text="Aplicar filtro ao resumo e exportação",
+            variable=self.filtro_resumo_var,
+            command=lambda: self._schedule_refresh("summary", "chart"),
+        ).grid(row=0, column=3, sticky="w", padx=4)
+
+        self.filtro_var.trace_add("write", lambda *_: self._schedule_filter())
+        self.filtro_coluna_var.trace_add("write", lambda *_: self._schedule_filter())
+        self.table.on_double_click = self._edit_selected
+
+        tree = self.table.tree
+        for c, field in zip(cols, ENTRY_FIELDS):
+            tree.heading(c, text=c, command=lambda field=field: self._sort_by(field))
+            tree.column(c, width=110, stretch=True)
+
+        tree.column("RECEBIMENTO", width=110, stretch=False)
+        tree.column("Cliente", width=160, stretch=True)
+        tree.column("Produto enviado", width=180, stretch=True)
+        tree.column("Configuração/Avaria", width=220, stretch=True)
+        tree.column("LAUDO TÉCNICO", width=260, stretch=True)
 
         notebook = ttk.Notebook(right)
         notebook.grid(row=0, column=0, sticky="nsew")
+        self.notebook = notebook
 
         chart_tab = ttk.Frame(notebook)
         summary_tab = ttk.Frame(notebook)
         notebook.add(chart_tab, text="Gráfico")
         notebook.add(summary_tab, text="Resumo")
+        self.analysis_view = AnalysisView(notebook, self.cube)
+        notebook.add(self.analysis_view, text="Análise")
+        self.chart_tab = chart_tab
+        notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        chart_tab.bind("<Map>", lambda _evt: self._schedule_chart_init())
 
         chart_tab.columnconfigure(0, weight=1)
         chart_tab.rowconfigure(0, weight=1)
 
-        self.chart_fig = Figure(figsize=(6, 4), dpi=100)
-        self.chart_ax = self.chart_fig.add_subplot(111)
-        self.chart_canvas = FigureCanvasTkAgg(self.chart_fig, master=chart_tab)
-        self.chart_canvas.get_tk_widget().grid(row=0, column=0, sticky="nsew", padx=8, pady=8)
-
         summary_tab.columnconfigure(0, weight=1)
         summary_tab.rowconfigure(0, weight=1)
         summary_tab.rowconfigure(1, weight=1)
@@ -297,33 +461,163 @@ class RmaApp(tk.Tk):
         ttk.Label(parent, text=label).grid(row=row, column=col, sticky="w", padx=6, pady=2)
         ttk.Entry(parent, textvariable=var).grid(row=row, column=col + 1, sticky="ew", padx=6, pady=2)
 
-    def _entry_to_values(self, e: RmaEntry) -> list[str]:
-        return [
-            e.recebimento,
-            e.cliente,
-            e.nf,
-            e.os,
-            e.triagem,
-            e.produto_enviado,
-            e.und,
-            e.plataforma,
-            e.codigo,
-            e.numero_serie,
-            e.status,
-            e.configuracao_avaria,
-            e.pedido_marketplace,
-            e.laudo_tecnico,
-        ]
+    def _visible_ids(self) -> list[int]:
+        return self.store.order if self.filter_ids is None else self.filter_ids
 
-    def _get_entries_in_display_order(self) -> list[RmaEntry]:
-        if self.tree is None:
-            return []
-        out: list[RmaEntry] = []
-        for iid in self.tree.get_children(""):
-            e = self.entry_by_id.get(iid)
-            if e is not None:
-                out.append(e)
-        return out
+    def _summary_ids(self) -> list[int] | None:
+        if self.filter_ids is not None and self.filtro_resumo_var.get():
+            return self.filter_ids
+        return self.period_ids
+
+    def _period_range(self) -> tuple[date, date] | None:
+        if not self.periodo_filtro_var.get():
+            return None
+
+        start = parse_recebimento(self.periodo_de_var.get())
+        end = parse_recebimento(self.periodo_ate_var.get())
+        if start is not None and end is not None:
+            return (start, end) if start <= end else (end, start)
+
+        try:
+            month = MESES.index(self.periodo_mes_var.get().strip().upper()) + 1
+            return month_range(int(self.periodo_ano_var.get().strip()), month)
+        except ValueError:
+            return None
+
+    def _on_period_changed(self, *, title: bool = False) -> None:
+        if title:
+            self._schedule_refresh("chart_title")
+        if self.periodo_filtro_var.get() or self.period_ids is not None:
+            self._schedule_filter()
+
+    def _sort_by(self, field: str) -> None:
+        descending = self._sort_state == (field, False)
+        with span("ordenar", coluna=field, linhas=len(self.store)):
+            self.store.reorder(self.sort_keys.sorted_ids(self.store.order, field, descending=descending))
+        self._sort_state = (field, descending)
+        self._update_sort_headings()
+        if self.table is not None:
+            self.table.offset = 0
+        self._schedule_refresh("filter", "table")
+
+    def _clear_sort_state(self) -> None:
+        if self._sort_state is not None:
+            self._sort_state = None
+            self._update_sort_headings()
+
+    def _update_sort_headings(self) -> None:
+        if self.table is None:
+            return
+        for title, field in zip(self._column_titles, ENTRY_FIELDS):
+            arrow = ""
+            if self._sort_state is not None and self._sort_state[0] == field:
+                arrow = " ▼" if self._sort_state[1] else " ▲"
+            self.table.tree.heading(title, text=f"{title}{arrow}")
+
+    def _get_ids_in_display_order(self) -> list[int]:
+        row_ids = self._summary_ids()
+        return list(self.store.order if row_ids is None else row_ids)
+
+    def _append_entries(
+        self,
+        entries: Iterable[RmaEntry],
+        *,
+        title: str = "Adicionar",
+        duplicates: DuplicateStats | None = None,
+    ) -> int:
+        if duplicates is None:
+            duplicates = DuplicateStats()
+
+        count = 0
+        for entry in entries:
+            keys = self.duplicate_index.keys(entry)
+            match = self.duplicate_index.find(entry, keys)
+            if match is not None:
+                existing_id, kind = match
+                action = duplicates.action or self._ask_duplicate(title, entry, kind, duplicates)
+                if action == SKIP:
+                    duplicates.skipped += 1
+                    continue
+                if action == REPLACE:
+                    self._replace_entry(existing_id, entry)
+                    duplicates.replaced += 1
+                    continue
+                duplicates.kept += 1
+
+            row_id = self.store.add(entry)
+            self.duplicate_index.add(row_id, entry, keys)
+            self.date_index.add(row_id, entry.recebimento)
+            self.row_digests[row_id] = row_digest(entry)
+            self.search_index.enqueue((row_id,))
+            self.summary.add(entry)
+            self.cube.add(entry)
+            count += 1
+
+        if count:
+            self._clear_sort_state()
+            self._schedule_indexing()
+            self._schedule_refresh("filter", "table", "summary", "chart", "analysis")
+        return count
+
+    def _summary_top_n(self) -> int | None:
+        limit = self.resumo_limite_var.get()
+        return None if limit == SUMMARY_LIMITS[0] else int(limit)
+
+    def _active_normalizer(self) -> Normalizer | None:
+        return self.normalizer if self.agrupar_variacoes_var.get() else None
+
+    def _read_aliases(self) -> dict[str, str]:
+        try:
+            return load_aliases()
+        except (OSError, ValueError) as e:
+            messagebox.showwarning("Apelidos", f"Não foi possível ler o arquivo de apelidos:\n{e}")
+            return {}
+
+    def _edit_aliases(self) -> None:
+        dialog = AliasDialog(self, self.normalizer.aliases, self.normalizer.stats())
+        self.wait_window(dialog)
+        if dialog.result is None:
+            return
+
+        try:
+            save_aliases(dialog.result)
+        except OSError as e:
+            messagebox.showerror("Apelidos", f"Falha ao salvar os apelidos:\n{e}")
+            return
+        self.normalizer.set_aliases(dialog.result)
+        self._rebuild_normalized_state()
+
+    def _rebuild_normalized_state(self) -> None:
+        normalizer = self._active_normalizer()
+        self.summary = IncrementalSummary(self.store.rows(), normalizer=normalizer)
+        self.duplicate_index = DuplicateIndex(self.store.row, normalizer=normalizer)
+        for row_id in self.store.order:
+            self.duplicate_index.add(row_id, self.store.row(row_id))
+        self.cube.rebuild(self.store.rows(), normalizer=normalizer)
+        self._schedule_refresh("summary", "chart", "analysis")
+
+    def _ask_duplicate(self, title: str, entry: RmaEntry, kind: str, duplicates: DuplicateStats) -> str:
+        dialog = DuplicateDialog(self, title, entry, kind)
+        self.wait_window(dialog)
+        action = dialog.result or SKIP
+        if dialog.apply_to_all_var.get():
+            duplicates.action = action
+        return action
+
+    def _replace_entry(self, row_id: int, entry: RmaEntry) -> None:
+        old = self.store.get(row_id)
+        self.summary.replace(old, entry)
+        self.cube.replace(old, entry)
+        self.duplicate_index.remove(row_id, old)
+        self.store.replace(row_id, entry)
+        self.duplicate_index.add(row_id, entry)
+        self.row_digests[row_id] = row_digest(entry)
+        self.search_index.update(row_id)
+        self._schedule_indexing()
+        self.sort_keys.invalidate((row_id,))
+        self.date_index.replace(row_id, entry.recebimento)
+        self._clear_sort_state()
+        self._schedule_refresh("filter", "table", "summary", "chart", "analysis")
 
     def _collect_form_entry(self) -> RmaEntry:
         laudo = ""
@@ -348,26 +642,29 @@ class RmaApp(tk.Tk):
         )
 
     def _add_or_update_entry(self) -> None:
-        if self.tree is None:
+        if self.table is None:
             return
 
         entry = self._collect_form_entry()
 
         if self.editing_id is not None:
-            iid = self.editing_id
-            self.entry_by_id[iid] = entry
-            self.tree.item(iid, values=self._entry_to_values(entry))
+            row_id = self.editing_id
+            if row_id in self.store:
+                match = self.duplicate_index.find(entry, exclude=row_id)
+                if match is not None and not messagebox.askyesno(
+                    "Editar",
+                    "Este registro já existe na lista.\n"
+                    f"Critério: {MATCH_LABELS.get(match[1], match[1])}\n\nSalvar a alteração mesmo assim?",
+                ):
+                    return
+                self._replace_entry(row_id, entry)
             self.editing_id = None
             if self.add_update_button is not None:
                 self.add_update_button.configure(text="Adicionar")
         else:
-            self.entry_counter += 1
-            iid = str(self.entry_counter)
-            self.entry_by_id[iid] = entry
-            self.tree.insert("", "end", iid=iid, values=self._entry_to_values(entry))
+            self._append_entries([entry])
 
         self._clear_form(keep_recebimento=True)
-        self._refresh_summaries()
 
     def _clear_form(self, *, keep_recebimento: bool = False) -> None:
         for k, var in self.vars.items():
@@ -383,18 +680,18 @@ class RmaApp(tk.Tk):
             self.add_update_button.configure(text="Adicionar")
 
     def _edit_selected(self) -> None:
-        if self.tree is None:
+        if self.table is None:
             return
 
-        sel = self.tree.selection()
+        sel = self.table.selection()
         if not sel:
             messagebox.showwarning("Editar", "Selecione um registro para editar.")
             return
 
-        iid = sel[0]
-        entry = self.entry_by_id.get(iid)
-        if entry is None:
+        row_id = sel[0]
+        if row_id not in self.store:
             return
+        entry = self.store.get(row_id)
 
         self.vars["recebimento"].set(entry.recebimento)
         self.vars["cliente"].set(entry.cliente)
@@ -414,15 +711,15 @@ class RmaApp(tk.Tk):
             self.laudo_text.delete("1.0", "end")
             self.laudo_text.insert("1.0", entry.laudo_tecnico)
 
-        self.editing_id = iid
+        self.editing_id = row_id
         if self.add_update_button is not None:
             self.add_update_button.configure(text="Atualizar")
 
     def _delete_selected(self) -> None:
-        if self.tree is None:
+        if self.table is None:
             return
 
-        sel = list(self.tree.selection())
+        sel = self.table.selection()
         if not sel:
             messagebox.showwarning("Excluir", "Selecione um ou mais registros para excluir.")
             return
@@ -430,41 +727,247 @@ class RmaApp(tk.Tk):
         if not messagebox.askyesno("Excluir", f"Excluir {len(sel)} registro(s)?"):
             return
 
-        for iid in sel:
-            self.tree.delete(iid)
-            self.entry_by_id.pop(iid, None)
-            if self.editing_id == iid:
+        for row_id in sel:
+            if row_id in self.store:
+                entry = self.store.get(row_id)
+                self.summary.remove(entry)
+                self.cube.remove(entry)
+                self.duplicate_index.remove(row_id, entry)
+                self.row_digests.pop(row_id, None)
+            if self.editing_id == row_id:
                 self.editing_id = None
+        self.store.remove(sel)
+        self.search_index.remove(sel)
+        self.sort_keys.invalidate(sel)
+        self.date_index.remove(sel)
+        if self.search_index.needs_rebuild():
+            self.search_index.rebuild(self.store.order)
+            self._schedule_indexing()
+        self.table.discard(sel)
 
         if self.add_update_button is not None:
             self.add_update_button.configure(text="Adicionar")
 
-        self._refresh_summaries()
+        self._schedule_refresh("filter", "table", "summary", "chart", "analysis")
+
+    def _schedule_filter(self) -> None:
+        if self._filter_after_id is not None:
+            self.after_cancel(self._filter_after_id)
+        self._filter_after_id = self.after(120, self._apply_filter_now)
+
+    def _apply_filter_now(self) -> None:
+        self._filter_after_id = None
+        self._schedule_refresh("filter", "table", "summary", "chart")
+
+    def _recompute_filter(self) -> bool:
+        query = self.filtro_var.get().strip()
+        column_name = self.filtro_coluna_var.get()
+        period = self._period_range()
+        key = (query, column_name, period) if query or period else None
+        changed = key != self._filter_key
+        self._filter_key = key
 
-    def _refresh_summaries(self) -> None:
-        entries = self._get_entries_in_display_order()
-        pieces_sorted, reasons_sorted = summarize_entries(entries)
+        if period is None:
+            self.period_ids = None
+            self.periodo_info_var.set("")
+        else:
+            with span("filtrar.periodo", linhas=len(self.store)):
+                self.period_ids = self._in_display_order(self.date_index.between(*period))
+            start, end = period
+            undated = f", {len(self.date_index.undated)} sem data" if self.date_index.undated else ""
+            self.periodo_info_var.set(
+                f"{start:%d/%m/%Y} a {end:%d/%m/%Y}: {len(self.period_ids)} registro(s){undated}"
+            )
 
-        if self.pieces_tree is not None:
-            for iid in self.pieces_tree.get_children(""):
-                self.pieces_tree.delete(iid)
-            for name, qty in pieces_sorted:
-                self.pieces_tree.insert("", "end", values=[name, qty])
-            if pieces_sorted:
-                self.pieces_tree.insert("", "end", values=["TOTAL", sum(q for _, q in pieces_sorted)])
+        if not query:
+            self.filter_ids = self.period_ids
+        else:
+            column = self._column_titles.index(column_name) if column_name in self._column_titles else None
+            matches = self.search_index.search(query, column=column)
+            candidates = self.store.order if self.period_ids is None else self.period_ids
+            if self.period_ids is None and self.store.insertion_order and len(matches) * 4 < len(candidates):
+                self.filter_ids = sorted(matches)
+            else:
+                self.filter_ids = matches.select(candidates)
+
+        if changed and self.table is not None:
+            self.table.offset = 0
+        return changed or key is not None
+
+    def _in_display_order(self, row_ids: list[int]) -> list[int]:
+        if self._sort_state is None:
+            return row_ids
+        field, descending = self._sort_state
+        return self.sort_keys.sorted_ids(row_ids, field, descending=descending)
+
+    def _summary_items(self) -> tuple[list[tuple[str, int]], list[tuple[str, int]]]:
+        row_ids = self._summary_ids()
+        if row_ids is not None:
+            normalizer = self.summary.normalizer
+            if numpy_available():
+                return summarize_store(self.store, row_ids, normalizer=normalizer)
+            return IncrementalSummary(self.store.rows(row_ids), normalizer=normalizer).sorted_items()
+        return self.summary.sorted_items()
+
+    def _schedule_indexing(self) -> None:
+        if not self._indexing_scheduled and self.search_index.pending:
+            self._indexing_scheduled = True
+            self.after(20, self._index_step)
+
+    def _index_step(self) -> None:
+        self._indexing_scheduled = False
+        if self.search_index.index_pending(budget=0.015):
+            self._schedule_indexing()
+        elif self.filtro_var.get().strip():
+            self._schedule_refresh("filter", "table", "summary", "chart")
+
+    def _schedule_refresh(self, *parts: str) -> None:
+        self._dirty.update(parts)
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.after_idle(self._flush_refresh)
+
+    def _flush_refresh(self) -> None:
+        dirty = self._dirty
+        self._dirty = set()
+        self._refresh_pending = False
+
+        with span("atualizar", partes=",".join(sorted(dirty))):
+            self._refresh_parts(dirty)
+
+    def _refresh_parts(self, dirty: set[str]) -> None:
+        phases = laps("atualizar")
+
+        if "filter" in dirty:
+            if self._recompute_filter():
+                dirty |= {"table", "summary", "chart"}
+            phases.mark("filtro", linhas=len(self._visible_ids()))
+
+        if "table" in dirty and self.table is not None:
+            self.table.refresh()
+            phases.mark("tabela")
+
+        chart_parts = dirty & {"chart", "chart_title"}
+        if chart_parts and (self.chart_canvas is None or not self._chart_visible()):
+            self._chart_pending |= chart_parts
+            chart_parts = set()
+
+        if "summary" in dirty or "chart" in chart_parts:
+            pieces_sorted, reasons_sorted = self._summary_items()
+
+            if "summary" in dirty:
+                if self.pieces_tree is not None:
+                    self._sync_summary_tree(self.pieces_tree, pieces_sorted)
+                if self.reasons_tree is not None:
+                    self._sync_summary_tree(self.reasons_tree, reasons_sorted)
+                phases.mark("resumo")
+
+            if "chart" in chart_parts:
+                self._render_chart(pieces_sorted)
+                phases.mark("grafico")
+                chart_parts.discard("chart_title")
+
+        if "chart_title" in chart_parts:
+            self._update_chart_title()
+
+        if "analysis" in dirty or self._analysis_stale:
+            if self._analysis_visible():
+                self._analysis_stale = False
+                if self.analysis_view is not None:
+                    self.analysis_view.refresh()
+                phases.mark("analise")
+            else:
+                self._analysis_stale = True
+
+    def _on_trace_record(self, record: dict[str, Any]) -> None:
+        if record.get("parent") is None and record["ms"] >= 20:
+            self._trace_records.put(record)
+
+    def _poll_trace_status(self) -> None:
+        record = None
+        while True:
+            try:
+                record = self._trace_records.get_nowait()
+            except queue.Empty:
+                break
+
+        if record is not None:
+            text = f"{record['span']}: {record['ms']:.0f} ms"
+            if "linhas" in record:
+                text += f" · {record['linhas']} linha(s)"
+            if "pico_mb" in record:
+                text += f" · pico {record['pico_mb']:.1f} MB"
+            self.trace_status_var.set(text)
+
+        self.after(500, self._poll_trace_status)
+
+    def _chart_visible(self) -> bool:
+        if self.notebook is None or self.chart_tab is None:
+            return False
+        return self.notebook.select() == str(self.chart_tab)
+
+    def _analysis_visible(self) -> bool:
+        if self.notebook is None or self.analysis_view is None:
+            return False
+        return self.notebook.select() == str(self.analysis_view)
+
+    def _on_tab_changed(self, _event: tk.Event) -> None:
+        if self._analysis_stale and self._analysis_visible():
+            self._schedule_refresh("analysis")
+            return
+        if not self._chart_visible():
+            return
+        if self.chart_canvas is None:
+            self._schedule_chart_init()
+        elif self._chart_pending:
+            pending = self._chart_pending
+            self._chart_pending = set()
+            self._schedule_refresh(*pending)
+
+    def _schedule_chart_init(self) -> None:
+        if self.chart_canvas is None and not self._chart_init_scheduled:
+            self._chart_init_scheduled = True
+            self.after(10, self._init_chart)
+
+    def _init_chart(self) -> None:
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
 
-        if self.reasons_tree is not None:
-            for iid in self.reasons_tree.get_children(""):
-                self.reasons_tree.delete(iid)
-            for name, qty in reasons_sorted:
-                self.reasons_tree.insert("", "end", values=[name, qty])
-            if reasons_sorted:
-                self.reasons_tree.insert("", "end", values=["TOTAL", sum(q for _, q in reasons_sorted)])
+        self.chart_fig = Figure(figsize=(6, 4), dpi=100)
+        self.chart_ax = self.chart_fig.add_subplot(111)
+        self.chart_canvas = FigureCanvasTkAgg(self.chart_fig, master=self.chart_tab)
+        self.chart_canvas.get_tk_widget().grid(row=0, column=0, sticky="nsew", padx=8, pady=8)
 
+        self._chart_pending = set()
+        self._schedule_refresh("chart")
+
+    def _chart_title(self) -> str:
+        return f"PEÇAS DEFEITUOSAS\n{self.periodo_mes_var.get()} - {self.periodo_ano_var.get()}"
+
+    def _update_chart_title(self) -> None:
+        if self.chart_ax is None or self.chart_canvas is None or not self._chart_has_data:
+            return
+        self.chart_ax.set_title(self._chart_title())
+        self.chart_canvas.draw_idle()
+
+    def _render_chart(self, pieces_sorted: list[tuple[str, int]]) -> None:
         if self.chart_ax is None or self.chart_canvas is None:
             return
 
+        labels = [name for name, _qty in pieces_sorted]
+        values = [qty for _name, qty in pieces_sorted]
+
+        if labels and labels == self._chart_labels:
+            self._update_chart_wedges(values)
+            self.chart_ax.set_title(self._chart_title())
+            self.chart_canvas.draw_idle()
+            return
+
         self.chart_ax.clear()
+        self._chart_has_data = bool(pieces_sorted)
+        self._chart_labels = labels
+        self._chart_wedges = []
+        self._chart_autotexts = []
 
         if not pieces_sorted:
             self.chart_ax.text(0.5, 0.5, "Sem dados", ha="center", va="center")
@@ -472,8 +975,6 @@ class RmaApp(tk.Tk):
             self.chart_canvas.draw_idle()
             return
 
-        labels = [name for name, _qty in pieces_sorted]
-        values = [qty for _name, qty in pieces_sorted]
         colors = [PALETTE[i % len(PALETTE)] for i in range(len(values))]
 
         wedges, _texts, autotexts = self.chart_ax.pie(
@@ -489,9 +990,7 @@ class RmaApp(tk.Tk):
             t.set_fontsize(9)
 
         self.chart_ax.set_aspect("equal")
-        self.chart_ax.set_title(
-            f"PEÇAS DEFEITUOSAS\n{self.periodo_mes_var.get()} - {self.periodo_ano_var.get()}"
-        )
+        self.chart_ax.set_title(self._chart_title())
         self.chart_ax.legend(
             wedges,
             labels,
@@ -501,11 +1000,50 @@ class RmaApp(tk.Tk):
             frameon=False,
             fontsize=8,
         )
+        self._chart_wedges = list(wedges)
+        self._chart_autotexts = list(autotexts)
         self.chart_canvas.draw_idle()
 
+    def _update_chart_wedges(self, values: list[int]) -> None:
+        total = sum(values)
+        theta1 = 90.0
+        for wedge, autotext, value in zip(self._chart_wedges, self._chart_autotexts, values):
+            frac = value / total
+            theta2 = theta1 + 360.0 * frac
+            wedge.set_theta1(theta1)
+            wedge.set_theta2(theta2)
+
+            thetam = math.radians((theta1 + theta2) / 2)
+            autotext.set_position((0.6 * math.cos(thetam), 0.6 * math.sin(thetam)))
+            autotext.set_text(f"{frac * 100:.0f}%")
+            theta1 = theta2
+
+    def _sync_summary_tree(self, tree: ttk.Treeview, items: list[tuple[str, int]]) -> None:
+        rows = list(items)
+        if rows:
+            rows.append(("TOTAL", sum(q for _, q in items)))
+
+        previous = self._rendered_summary_rows.get(tree, [])
+        iids = tree.get_children("")
+
+        for idx, row in enumerate(rows):
+            if idx < len(iids):
+                if idx >= len(previous) or previous[idx] != row:
+                    tree.item(iids[idx], values=list(row))
+            else:
+                tree.insert("", "end", values=list(row))
+
+        if len(iids) > len(rows):
+            tree.delete(*iids[len(rows):])
+
+        self._rendered_summary_rows[tree] = rows
+
     def _export_excel(self) -> None:
-        entries = self._get_entries_in_display_order()
-        if not entries:
+        if self.active_job is not None:
+            return
+
+        row_ids = self._get_ids_in_display_order()
+        if not row_ids:
             messagebox.showwarning("Exportar", "Adicione pelo menos um registro antes de exportar.")
             return
 
@@ -521,83 +1059,305 @@ class RmaApp(tk.Tk):
         if not file_name:
             return
 
-        try:
-            path = export_to_excel(
-                entries,
+        title = self.planilha_titulo_var.get().strip() or "Planilha RMA"
+        periodo_mes = self.periodo_mes_var.get().strip() or ""
+        periodo_ano = self.periodo_ano_var.get().strip() or ""
+        analysis_sheet = self.incluir_analise_var.get()
+        summary_top_n = self._summary_top_n()
+        full_breakdown_sheet = self.incluir_detalhamento_var.get()
+        normalizer = self.normalizer.copy() if self.agrupar_variacoes_var.get() else None
+        snapshot = self.store.snapshot()
+        digests = [self.row_digests[row_id] for row_id in row_ids]
+        total = len(row_ids)
+
+        def work(ctx: JobContext) -> Path:
+            def on_progress(done: int) -> None:
+                ctx.check_cancelled()
+                ctx.progress(done, total)
+
+            return export_to_excel(
+                snapshot.rows(row_ids),
                 file_name,
-                title=self.planilha_titulo_var.get().strip() or "Planilha RMA",
-                periodo_mes=self.periodo_mes_var.get().strip() or "",
-                periodo_ano=self.periodo_ano_var.get().strip() or "",
+                title=title,
+                periodo_mes=periodo_mes,
+                periodo_ano=periodo_ano,
+                on_progress=on_progress,
+                summary_top_n=summary_top_n,
+                full_breakdown_sheet=full_breakdown_sheet,
+                analysis_sheet=analysis_sheet,
+                normalizer=normalizer,
+                cache=self.export_cache,
+                entries_digest=entries_digest(digests),
             )
-        except Exception as e:
-            messagebox.showerror("Exportar", f"Falha ao gerar o Excel:\n{e}")
-            return
 
-        messagebox.showinfo("Exportar", f"Planilha gerada com sucesso:\n{path}")
+        def on_finish(kind: str, payload: Any) -> None:
+            if kind == "error":
+                messagebox.showerror("Exportar", f"Falha ao gerar o Excel:\n{payload}")
+                return
+            if kind == "cancelled":
+                messagebox.showwarning("Exportar", "Exportação cancelada.")
+                return
 
-        if self.abrir_ao_exportar_var.get():
-            try:
-                os.startfile(str(path))  # type: ignore[attr-defined]
-            except Exception:
-                pass
+            messagebox.showinfo("Exportar", f"Planilha gerada com sucesso:\n{payload}")
 
+            if self.abrir_ao_exportar_var.get():
+                try:
+                    os.startfile(str(payload))  # type: ignore[attr-defined]
+                except Exception:
+                    pass
 
-    def _import_excel(self) -> None:
-        file_path = filedialog.askopenfilename(
-            title="Selecionar planilha existente",
+        self._run_job(BackgroundJob(work), "Exportando planilha", on_finish=on_finish)
+
+    def _consolidate_folder(self) -> None:
+        if self.active_job is not None:
+            return
+
+        folder = filedialog.askdirectory(title="Selecionar pasta com planilhas RMA")
+        if not folder:
+            return
+
+        paths = find_workbooks(folder)
+        if not paths:
+            messagebox.showwarning("Consolidar", "Nenhuma planilha .xlsx encontrada na pasta.")
+            return
+
+        file_name = filedialog.asksaveasfilename(
+            title="Salvar planilha consolidada",
+            defaultextension=".xlsx",
             filetypes=[("Excel", "*.xlsx")],
+            initialfile=f"Planilha_RMA_Consolidada_{self.periodo_ano_var.get().strip()}.xlsx",
         )
-        if not file_path:
+        if not file_name:
             return
 
-        try:
-            wb = openpyxl.load_workbook(file_path, data_only=True)
-        except Exception as e:
-            messagebox.showerror("Importar", f"Erro ao abrir o arquivo:\n{e}")
-            return
+        title = self.planilha_titulo_var.get().strip() or "Planilha RMA"
+        periodo_mes = self.periodo_mes_var.get().strip() or ""
+        periodo_ano = self.periodo_ano_var.get().strip() or ""
+        analysis_sheet = self.incluir_analise_var.get()
+        summary_top_n = self._summary_top_n()
+        full_breakdown_sheet = self.incluir_detalhamento_var.get()
+        normalizer = self.normalizer.copy() if self.agrupar_variacoes_var.get() else None
+
+        def work(ctx: JobContext) -> Path:
+            def on_file_done(done: int, total: int) -> None:
+                ctx.check_cancelled()
+                ctx.progress(done, total)
+
+            return consolidate_workbooks(
+                paths,
+                file_name,
+                title=title,
+                periodo_mes=periodo_mes,
+                periodo_ano=periodo_ano,
+                workers=os.cpu_count() or 1,
+                on_file_done=on_file_done,
+                summary_top_n=summary_top_n,
+                full_breakdown_sheet=full_breakdown_sheet,
+                analysis_sheet=analysis_sheet,
+                normalizer=normalizer,
+            )
+
+        def on_finish(kind: str, payload: Any) -> None:
+            if kind == "error":
+                messagebox.showerror("Consolidar", f"Falha ao consolidar as planilhas:\n{payload}")
+            elif kind == "cancelled":
+                messagebox.showwarning("Consolidar", "Consolidação cancelada.")
+            else:
+                messagebox.showinfo("Consolidar", f"{len(paths)} planilha(s) consolidada(s) em:\n{payload}")
 
-        if "RMA" not in wb.sheetnames:
-            messagebox.showerror("Importar", "A planilha não contém a aba 'RMA'.")
-            wb.close()
+        self._run_job(BackgroundJob(work), "Consolidando planilhas", on_finish=on_finish, unit="arquivo(s)")
+
+    def _split_export(self) -> None:
+        if self.active_job is not None:
             return
 
-        ws = wb["RMA"]
-        imported_count = 0
+        row_ids = self._get_ids_in_display_order()
+        if not row_ids:
+            messagebox.showwarning("Exportar Separado", "Adicione pelo menos um registro antes de exportar.")
+            return
 
-        for row_idx, row in enumerate(ws.iter_rows(min_row=3, values_only=True), start=3):
-            if not row or all(cell is None or str(cell).strip() == "" for cell in row):
-                continue
+        folder = filedialog.askdirectory(title="Selecionar pasta de destino")
+        if not folder:
+            return
 
-            def safe(val: object) -> str:
-                return str(val).strip() if val is not None else ""
-
-            entry = RmaEntry(
-                recebimento=safe(row[0]) if len(row) > 0 else "",
-                cliente=safe(row[1]) if len(row) > 1 else "",
-                nf=safe(row[2]) if len(row) > 2 else "",
-                os=safe(row[3]) if len(row) > 3 else "",
-                triagem=safe(row[4]) if len(row) > 4 else "",
-                produto_enviado=safe(row[5]) if len(row) > 5 else "",
-                und=safe(row[6]) if len(row) > 6 else "",
-                plataforma=safe(row[7]) if len(row) > 7 else "",
-                codigo=safe(row[8]) if len(row) > 8 else "",
-                numero_serie=safe(row[9]) if len(row) > 9 else "",
-                status=safe(row[10]) if len(row) > 10 else "",
-                configuracao_avaria=safe(row[11]) if len(row) > 11 else "",
-                pedido_marketplace=safe(row[12]) if len(row) > 12 else "",
-                laudo_tecnico=safe(row[13]) if len(row) > 13 else "",
+        label = self.separar_por_var.get()
+        key = next((k for k, v in SPLIT_KEYS.items() if v == label), "cliente")
+        title = self.planilha_titulo_var.get().strip() or "Planilha RMA"
+        periodo_mes = self.periodo_mes_var.get().strip() or ""
+        periodo_ano = self.periodo_ano_var.get().strip() or ""
+        analysis_sheet = self.incluir_analise_var.get()
+        summary_top_n = self._summary_top_n()
+        full_breakdown_sheet = self.incluir_detalhamento_var.get()
+        normalizer = self.normalizer.copy() if self.agrupar_variacoes_var.get() else None
+        snapshot = self.store.snapshot()
+
+        def work(ctx: JobContext) -> list[Any]:
+            def on_file_done(done: int, total: int) -> None:
+                ctx.check_cancelled()
+                ctx.progress(done, total)
+
+            return split_export(
+                snapshot.rows(row_ids),
+                folder,
+                key,
+                title=title,
+                periodo_mes=periodo_mes,
+                periodo_ano=periodo_ano,
+                workers=os.cpu_count() or 1,
+                on_file_done=on_file_done,
+                summary_top_n=summary_top_n,
+                full_breakdown_sheet=full_breakdown_sheet,
+                analysis_sheet=analysis_sheet,
+                normalizer=normalizer,
             )
 
-            self.entry_counter += 1
-            iid = str(self.entry_counter)
-            self.entry_by_id[iid] = entry
-            if self.tree is not None:
-                self.tree.insert("", "end", iid=iid, values=self._entry_to_values(entry))
-            imported_count += 1
+        def on_finish(kind: str, payload: Any) -> None:
+            if kind == "error":
+                messagebox.showerror("Exportar Separado", f"Falha ao gerar as planilhas:\n{payload}")
+            elif kind == "cancelled":
+                messagebox.showwarning("Exportar Separado", "Exportação cancelada.")
+            else:
+                messagebox.showinfo(
+                    "Exportar Separado",
+                    f"{len(payload)} planilha(s) por {label.lower()} geradas em:\n{folder}",
+                )
+
+        self._run_job(BackgroundJob(work), "Gerando planilhas separadas", on_finish=on_finish, unit="arquivo(s)")
+
+    def _archive_entries(self) -> None:
+        if self.active_job is not None:
+            return
 
-        wb.close()
-        self._refresh_summaries()
-        messagebox.showinfo("Importar", f"{imported_count} registro(s) importado(s) com sucesso!")
+        row_ids = self._get_ids_in_display_order()
+        if not row_ids:
+            messagebox.showwarning("Arquivar", "Nenhum registro para arquivar.")
+            return
+
+        if not messagebox.askyesno("Arquivar", f"Gravar {len(row_ids)} registro(s) no arquivo histórico?"):
+            return
+
+        snapshot = self.store.snapshot()
+
+        def work(ctx: JobContext) -> ArchiveStats:
+            with RmaArchive() as archive:
+                return archive.insert_many(snapshot.rows(row_ids))
+
+        def on_finish(kind: str, payload: Any) -> None:
+            if kind == "error":
+                messagebox.showerror("Arquivar", f"Falha ao gravar no arquivo:\n{payload}")
+            elif kind == "done":
+                messagebox.showinfo("Arquivar", f"{payload.describe()}.")
+
+        self._run_job(BackgroundJob(work), "Arquivando registros", on_finish=on_finish)
+
+    def _search_archive(self) -> None:
+        dialog = ArchiveSearchDialog(self)
+        self.wait_window(dialog)
+        if dialog.result is None:
+            return
+
+        try:
+            with RmaArchive() as archive:
+                found = self._append_entries(archive.find(**dialog.result))
+        except Exception as e:
+            messagebox.showerror("Buscar no arquivo", f"Falha ao consultar o arquivo:\n{e}")
+            return
+
+        if found:
+            messagebox.showinfo("Buscar no arquivo", f"{found} registro(s) carregado(s) do arquivo.")
+        else:
+            messagebox.showwarning("Buscar no arquivo", "Nenhum registro encontrado.")
+
+    def _run_job(
+        self,
+        job: BackgroundJob,
+        title: str,
+        *,
+        on_data: Callable[[Any], None] | None = None,
+        on_finish: Callable[[str, Any], None],
+        unit: str = "linha(s)",
+    ) -> None:
+        self.active_job = job
+        self.progress_dialog = ProgressDialog(self, title, self._cancel_active_job)
+        job.start()
+        self.after(50, self._poll_job, job, on_data, on_finish, unit)
+
+    def _cancel_active_job(self) -> None:
+        if self.active_job is not None:
+            self.active_job.cancel()
+        if self.progress_dialog is not None:
+            self.progress_dialog.set_cancelling()
+
+    def _poll_job(
+        self,
+        job: BackgroundJob,
+        on_data: Callable[[Any], None] | None,
+        on_finish: Callable[[str, Any], None],
+        unit: str,
+    ) -> None:
+        deadline = time.perf_counter() + 0.04
+        while time.perf_counter() < deadline:
+            messages = job.poll(max_messages=4)
+            if not messages:
+                break
+            for kind, payload in messages:
+                if kind == "progress":
+                    if self.progress_dialog is not None and not job.cancelled:
+                        self.progress_dialog.update_progress(*payload, unit=unit)
+                elif kind == "data":
+                    if on_data is not None and not job.cancelled:
+                        on_data(payload)
+                else:
+                    self.active_job = None
+                    if self.progress_dialog is not None:
+                        self.progress_dialog.destroy()
+                        self.progress_dialog = None
+                    on_finish(kind, payload)
+                    return
+
+        self.after(50, self._poll_job, job, on_data, on_finish, unit)
+
+    def _import_excel(self) -> None:
+        if self.active_job is not None:
+            return
+
+        file_path = filedialog.askopenfilename(
+            title="Selecionar planilha existente",
+            filetypes=[("Excel", "*.xlsx")],
+        )
+        if not file_path:
+            return
+
+        imported = 0
+        duplicates = DuplicateStats()
+
+        def work(ctx: JobContext) -> None:
+            with span("importar", arquivo=Path(file_path).name):
+                for batch in iter_workbook_entries(file_path, on_progress=ctx.progress):
+                    ctx.emit(batch)
+
+        def on_data(batch: list[RmaEntry]) -> None:
+            nonlocal imported
+            imported += self._append_entries(batch, title="Importar", duplicates=duplicates)
+
+        def on_finish(kind: str, payload: Any) -> None:
+            if kind == "error":
+                if isinstance(payload, WorkbookImportError):
+                    messagebox.showerror("Importar", str(payload))
+                else:
+                    messagebox.showerror("Importar", f"Erro ao importar o arquivo:\n{payload}")
+            elif kind == "cancelled":
+                messagebox.showwarning(
+                    "Importar",
+                    _with_duplicates(f"Importação cancelada. {imported} registro(s) importado(s).", duplicates),
+                )
+            else:
+                messagebox.showinfo(
+                    "Importar",
+                    _with_duplicates(f"{imported} registro(s) importado(s) com sucesso!", duplicates),
+                )
+
+        self._run_job(BackgroundJob(work), "Importando planilha", on_data=on_data, on_finish=on_finish)
 
     def _paste_data(self) -> None:
         try:
@@ -610,53 +1370,36 @@ class RmaApp(tk.Tk):
             messagebox.showwarning("Colar Dados", "Nenhum dado para colar.")
             return
 
-        lines = clipboard.strip().split("\n")
-        imported_count = 0
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
+        dialog = PastePreviewDialog(self, clipboard, detect_paste_delimiter(clipboard), self._column_titles)
+        self.wait_window(dialog)
+        if dialog.result is None:
+            return
 
-            parts = re.split(r"\t", line)
-            if len(parts) < 2:
-                parts = re.split(r"\s{2,}", line)
-
-            def safe(idx: int) -> str:
-                return parts[idx].strip() if idx < len(parts) else ""
-
-            entry = RmaEntry(
-                recebimento=safe(0),
-                cliente=safe(1),
-                nf=safe(2),
-                os=safe(3),
-                triagem=safe(4),
-                produto_enviado=safe(5),
-                und=safe(6),
-                plataforma=safe(7),
-                codigo=safe(8),
-                numero_serie=safe(9),
-                status=safe(10),
-                configuracao_avaria=safe(11),
-                pedido_marketplace=safe(12),
-                laudo_tecnico=safe(13),
+        duplicates = DuplicateStats()
+        imported_count = 0
+        with span("colar") as paste_span:
+            with span("colar.analise"):
+                batches = list(iter_pasted_entries(clipboard, delimiter=dialog.result))
+            with span("colar.inclusao"):
+                for batch in batches:
+                    imported_count += self._append_entries(batch, title="Colar Dados", duplicates=duplicates)
+            paste_span.set(linhas=imported_count)
+        if imported_count > 0 or duplicates.describe():
+            messagebox.showinfo(
+                "Colar Dados",
+                _with_duplicates(f"{imported_count} registro(s) adicionado(s)!", duplicates),
             )
-
-            self.entry_counter += 1
-            iid = str(self.entry_counter)
-            self.entry_by_id[iid] = entry
-            if self.tree is not None:
-                self.tree.insert("", "end", iid=iid, values=self._entry_to_values(entry))
-            imported_count += 1
-
-        self._refresh_summaries()
-        if imported_count > 0:
-            messagebox.showinfo("Colar Dados", f"{imported_count} registro(s) adicionado(s)!")
         else:
             messagebox.showwarning("Colar Dados", "Nenhum dado válido encontrado.")
 
 
+def _with_duplicates(message: str, duplicates: DuplicateStats) -> str:
+    detail = duplicates.describe()
+    return f"{message}\n{detail}." if detail else message
+
+
 def main() -> None:
+    TRACER.configure_from_env()
     app = RmaApp()
     app.mainloop()
 
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from excel_exporter import RmaEntry, parse_recebimento
+from export_cache import row_digest
+
+DEFAULT_ARCHIVE_PATH = Path.home() / ".gerador_rma" / "historico_rma.sqlite3"
+
+_COLUMNS = (
+    "recebimento",
+    "cliente",
+    "nf",
+    "os",
+    "triagem",
+    "produto_enviado",
+    "und",
+    "plataforma",
+    "codigo",
+    "numero_serie",
+    "status",
+    "configuracao_avaria",
+    "pedido_marketplace",
+    "laudo_tecnico",
+)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS rma (
+    id INTEGER PRIMARY KEY,
+    {", ".join(f"{c} TEXT NOT NULL" for c in _COLUMNS)},
+    recebimento_data INTEGER,
+    fingerprint TEXT NOT NULL UNIQUE
+);
+CREATE INDEX IF NOT EXISTS ix_rma_numero_serie ON rma (numero_serie);
+CREATE INDEX IF NOT EXISTS ix_rma_nf ON rma (nf);
+CREATE INDEX IF NOT EXISTS ix_rma_os ON rma (os);
+CREATE INDEX IF NOT EXISTS ix_rma_cliente ON rma (cliente COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS ix_rma_recebimento_data ON rma (recebimento_data);
+"""
+
+_SELECT = f"SELECT {', '.join(_COLUMNS)} FROM rma"
+_INSERT = (
+    f"INSERT OR IGNORE INTO rma ({', '.join(_COLUMNS)}, recebimento_data, fingerprint) "
+    f"VALUES ({', '.join('?' * (len(_COLUMNS) + 2))})"
+)
+
+
+@dataclass(frozen=True)
+class ArchiveStats:
+    inserted: int
+    skipped: int
+
+    def describe(self) -> str:
+        text = f"{self.inserted} registro(s) arquivado(s)"
+        if self.skipped:
+            text += f", {self.skipped} já estava(m) no arquivo"
+        return text
+
+
+class RmaArchive:
+    def __init__(self, path: str | Path = DEFAULT_ARCHIVE_PATH) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> RmaArchive:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def insert_many(self, entries: Iterable[RmaEntry], *, batch_size: int = 5000) -> ArchiveStats:
+        seen = 0
+        batch: list[tuple[object, ...]] = []
+
+        with self.conn:
+            changes = self.conn.total_changes
+            for e in entries:
+                batch.append(self._row(e))
+                if len(batch) >= batch_size:
+                    self.conn.executemany(_INSERT, batch)
+                    seen += len(batch)
+                    batch = []
+
+            if batch:
+                self.conn.executemany(_INSERT, batch)
+                seen += len(batch)
+            inserted = self.conn.total_changes - changes
+
+        return ArchiveStats(inserted, seen - inserted)
+
+    def find(
+        self,
+        *,
+        numero_serie: str | None = None,
+        nf: str | None = None,
+        os: str | None = None,
+        cliente: str | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+        limit: int | None = None,
+    ) -> Iterator[RmaEntry]:
+        where, params = self._where(numero_serie, nf, os, cliente, date_from, date_to)
+        sql = f"{_SELECT}{where} ORDER BY recebimento_data, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        cursor = self.conn.execute(sql, params)
+        try:
+            for row in cursor:
+                yield RmaEntry(*row)
+        finally:
+            cursor.close()
+
+    def count(
+        self,
+        *,
+        numero_serie: str | None = None,
+        nf: str | None = None,
+        os: str | None = None,
+        cliente: str | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+    ) -> int:
+        where, params = self._where(numero_serie, nf, os, cliente, date_from, date_to)
+        return self.conn.execute(f"SELECT COUNT(*) FROM rma{where}", params).fetchone()[0]
+
+    @staticmethod
+    def _row(e: RmaEntry) -> tuple[object, ...]:
+        received = parse_recebimento(e.recebimento)
+        return (
+            e.recebimento,
+            e.cliente,
+            e.nf,
+            e.os,
+            e.triagem,
+            e.produto_enviado,
+            e.und,
+            e.plataforma,
+            e.codigo,
+            e.numero_serie,
+            e.status,
+            e.configuracao_avaria,
+            e.pedido_marketplace,
+            e.laudo_tecnico,
+            received.toordinal() if received is not None else None,
+            row_digest(e).hex(),
+        )
+
+    @staticmethod
+    def _where(
+        numero_serie: str | None,
+        nf: str | None,
+        os: str | None,
+        cliente: str | None,
+        date_from: date | None,
+        date_to: date | None,
+    ) -> tuple[str, list[object]]:
+        clauses: list[str] = []
+        params: list[object] = []
+
+        for column, value in (("numero_serie", numero_serie), ("nf", nf), ("os", os)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value.strip())
+        if cliente:
+            clauses.append("cliente = ? COLLATE NOCASE")
+            params.append(cliente.strip())
+        if date_from is not None:
+            clauses.append("recebimento_data >= ?")
+            params.append(date_from.toordinal())
+        if date_to is not None:
+            clauses.append("recebimento_data <= ?")
+            params.append(date_to.toordinal())
+
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
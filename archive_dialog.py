@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import tkinter as tk
+from tkinter import messagebox, ttk
+from typing import Any
+
+from excel_exporter import parse_recebimento
+
+
+class ArchiveSearchDialog(tk.Toplevel):
+    def __init__(self, master: tk.Misc) -> None:
+        super().__init__(master)
+
+        self.title("Buscar no arquivo")
+        self.resizable(False, False)
+        self.transient(master)
+
+        self.result: dict[str, Any] | None = None
+        self.vars = {
+            "numero_serie": tk.StringVar(),
+            "nf": tk.StringVar(),
+            "os": tk.StringVar(),
+            "cliente": tk.StringVar(),
+            "date_from": tk.StringVar(),
+            "date_to": tk.StringVar(),
+        }
+
+        frame = ttk.Frame(self, padding=12)
+        frame.pack(fill="both", expand=True)
+        frame.columnconfigure(1, weight=1)
+
+        fields = [
+            ("Numero de serie", "numero_serie"),
+            ("NF", "nf"),
+            ("OS", "os"),
+            ("Cliente", "cliente"),
+            ("Recebimento de (dd/mm/aaaa)", "date_from"),
+            ("Recebimento até (dd/mm/aaaa)", "date_to"),
+        ]
+        for row, (label, key) in enumerate(fields):
+            ttk.Label(frame, text=label).grid(row=row, column=0, sticky="w", padx=6, pady=2)
+            ttk.Entry(frame, textvariable=self.vars[key], width=28).grid(row=row, column=1, sticky="ew", padx=6, pady=2)
+
+        buttons = ttk.Frame(frame)
+        buttons.grid(row=len(fields), column=0, columnspan=2, sticky="e", pady=(10, 0))
+        ttk.Button(buttons, text="Buscar", command=self._on_ok).grid(row=0, column=0, padx=4)
+        ttk.Button(buttons, text="Cancelar", command=self.destroy).grid(row=0, column=1, padx=4)
+
+        self.bind("<Return>", lambda _evt: self._on_ok())
+        self.bind("<Escape>", lambda _evt: self.destroy())
+        self.grab_set()
+
+    def _on_ok(self) -> None:
+        filters: dict[str, Any] = {}
+        for key in ("numero_serie", "nf", "os", "cliente"):
+            value = self.vars[key].get().strip()
+            if value:
+                filters[key] = value
+
+        for key in ("date_from", "date_to"):
+            value = self.vars[key].get().strip()
+            if not value:
+                continue
+            parsed = parse_recebimento(value)
+            if parsed is None:
+                messagebox.showwarning("Buscar no arquivo", f"Data inválida: {value}", parent=self)
+                return
+            filters[key] = parsed
+
+        if not filters:
+            messagebox.showwarning("Buscar no arquivo", "Informe pelo menos um filtro.", parent=self)
+            return
+
+        self.result = filters
+        self.destroy()
@@ -0,0 +1,768 @@
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import platform
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from datetime import date
+from itertools import accumulate
+from pathlib import Path
+from typing import Iterator
+
+from consolidation import consolidate_workbooks
+from date_index import DateIndex, month_range
+from entry_store import CATEGORICAL_FIELDS, ENTRY_FIELDS, FREE_TEXT_FIELDS, EntryStore
+from excel_exporter import IncrementalSummary, RmaEntry, export_to_excel, parse_recebimento, summarize_entries
+from importer import iter_pasted_entries, iter_workbook_entries
+from normalization import Normalizer
+from search_index import SearchIndex
+from sort_keys import SortKeyCache, sort_key
+from split_export import split_export
+from vector_summary import numpy_available, summarize_store
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+PRODUTOS = [
+    "SSD 240GB",
+    "SSD 480GB",
+    "HD 1TB",
+    "MEMORIA 8GB DDR4",
+    "MEMORIA 16GB DDR4",
+    "FONTE 500W",
+    "PLACA MAE H610",
+    "PLACA DE VIDEO RTX 3060",
+    "PROCESSADOR I5 12400",
+    "WATER COOLER 240MM",
+]
+
+AVARIAS = [
+    "NÃO LIGA",
+    "TELA AZUL",
+    "SUPERAQUECENDO",
+    "NÃO RECONHECE",
+    "RUÍDO",
+    "SEM VÍDEO",
+    "",
+]
+
+AVARIA_WEIGHTS = [30, 18, 12, 10, 6, 4, 20]
+
+LAUDO_FRASES = [
+    "Produto testado em bancada.",
+    "Defeito confirmado após testes de estresse.",
+    "Equipamento apresenta oxidação nos contatos.",
+    "Sem sinais de mau uso ou violação do lacre.",
+    "Firmware atualizado para a versão mais recente sem sucesso.",
+    "Componente substituído e reteste aprovado.",
+    "Cliente relata falha intermitente após quedas de energia.",
+    "Não foi possível reproduzir o defeito informado.",
+    "Encaminhado ao fabricante para análise de garantia.",
+]
+
+
+def generate_entries(count: int, *, seed: int = 0, years: int = 1) -> Iterator[RmaEntry]:
+    rng = random.Random(seed)
+    produto_weights = list(accumulate(1 / (i + 1) for i in range(len(PRODUTOS))))
+    cliente_weights = list(accumulate(1 / (i + 1) ** 0.8 for i in range(300)))
+    avaria_weights = list(accumulate(AVARIA_WEIGHTS))
+    clientes = [f"CLIENTE {i}" for i in range(1, 301)]
+    for i in range(count):
+        produto = rng.choices(PRODUTOS, cum_weights=produto_weights)[0]
+        yield RmaEntry(
+            recebimento=f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{2026 - i % years}",
+            cliente=rng.choices(clientes, cum_weights=cliente_weights)[0],
+            nf=str(100000 + i),
+            os=str(500000 + i),
+            triagem="OK",
+            produto_enviado=produto,
+            und="1",
+            plataforma=rng.choice(["MERCADO LIVRE", "SHOPEE", "AMAZON", "SITE"]),
+            codigo=f"C{rng.randint(1000, 9999)}",
+            numero_serie=f"SN{rng.getrandbits(40):012X}",
+            status=rng.choice(["REPARO", "REEMBOLSO", "TROCA"]),
+            configuracao_avaria=rng.choices(AVARIAS, cum_weights=avaria_weights)[0],
+            pedido_marketplace=f"PED-{rng.getrandbits(32):010d}",
+            laudo_tecnico=" ".join(rng.choices(LAUDO_FRASES, k=rng.randint(1, 12))),
+        )
+
+
+def peak_rss_mb() -> float:
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def bench_export_memory(rows: int, max_rss_mb: float | None) -> int:
+    baseline = peak_rss_mb()
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        path = export_to_excel(
+            generate_entries(rows),
+            Path(tmp) / "streaming.xlsx",
+            title="Benchmark",
+            periodo_mes="JANEIRO",
+            periodo_ano="2026",
+            constant_memory=True,
+        )
+        elapsed = time.perf_counter() - started
+        size_mb = path.stat().st_size / (1024 * 1024)
+
+    growth = peak_rss_mb() - baseline
+    print(f"{rows} linhas em {elapsed:.2f}s, arquivo {size_mb:.1f} MB, pico RSS +{growth:.1f} MB")
+
+    if max_rss_mb is not None and resource is not None and growth > max_rss_mb:
+        print(f"FALHA: crescimento de RSS acima de {max_rss_mb:.1f} MB")
+        return 1
+    return 0
+
+
+def _traced_mb(build) -> tuple[float, object]:
+    tracemalloc.start()
+    try:
+        result = build()
+        current, _peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return current / (1024 * 1024), result
+
+
+def bench_store_memory(rows: int) -> int:
+    print(f"{rows} registros")
+    for label, strip_laudo in (("com laudo", False), ("sem laudo", True)):
+
+        def entries(seed: int = 0) -> Iterator[RmaEntry]:
+            for e in generate_entries(rows, seed=seed):
+                yield replace(e, laudo_tecnico="") if strip_laudo else e
+
+        dict_mb, _ = _traced_mb(lambda: {str(i): e for i, e in enumerate(entries(), start=1)})
+
+        def build_store(edit: bool) -> EntryStore:
+            store = EntryStore()
+            store.add_many(entries())
+            if edit:
+                for row_id, e in zip(list(store.order), entries(seed=1)):
+                    store.replace(row_id, e)
+            return store
+
+        store_mb, _ = _traced_mb(lambda: build_store(False))
+        edited_mb, _ = _traced_mb(lambda: build_store(True))
+
+        print(f"  {label}:")
+        print(f"    dict[str, RmaEntry]:       {dict_mb:.1f} MB")
+        print(f"    EntryStore:                {store_mb:.1f} MB ({dict_mb / store_mb:.1f}x menor)")
+        print(f"    após editar cada registro: {edited_mb:.1f} MB")
+    return 0
+
+
+def bench_consolidation(files: int, rows: int, worker_counts: list[int]) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        paths = []
+        for i in range(files):
+            paths.append(
+                export_to_excel(
+                    generate_entries(rows, seed=i),
+                    folder / f"mes_{i + 1:02d}.xlsx",
+                    title="Benchmark",
+                    periodo_mes=f"MES {i + 1}",
+                    periodo_ano="2026",
+                    constant_memory=True,
+                )
+            )
+
+        print(f"{files} planilhas x {rows} linhas")
+        base: float | None = None
+        for workers in worker_counts:
+            started = time.perf_counter()
+            consolidate_workbooks(
+                paths,
+                folder / f"consolidado_{workers}.xlsx",
+                title="Benchmark",
+                periodo_mes="ANUAL",
+                periodo_ano="2026",
+                workers=workers,
+            )
+            elapsed = time.perf_counter() - started
+            base = base or elapsed
+            print(f"  {workers} worker(s): {elapsed:.2f}s ({base / elapsed:.2f}x)")
+    return 0
+
+
+def bench_split(rows: int, clients: int, worker_counts: list[int]) -> int:
+    entries = [replace(e, cliente=f"CLIENTE {i % clients + 1}") for i, e in enumerate(generate_entries(rows))]
+    print(f"{rows} linhas em {clients} clientes")
+    base: float | None = None
+    for workers in worker_counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            started = time.perf_counter()
+            results = split_export(
+                entries,
+                tmp,
+                "cliente",
+                title="Benchmark",
+                periodo_mes="JANEIRO",
+                periodo_ano="2026",
+                workers=workers,
+            )
+            elapsed = time.perf_counter() - started
+        base = base or elapsed
+        print(f"  {workers} worker(s): {len(results)} arquivos em {elapsed:.2f}s ({base / elapsed:.2f}x)")
+    return 0
+
+
+def legacy_parse_paste(clipboard: str) -> list[RmaEntry]:
+    lines = clipboard.strip().split("\n")
+    parsed: list[RmaEntry] = []
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        parts = re.split(r"\t", line)
+        if len(parts) < 2:
+            parts = re.split(r"\s{2,}", line)
+
+        def safe(idx: int) -> str:
+            return parts[idx].strip() if idx < len(parts) else ""
+
+        parsed.append(RmaEntry(*(safe(i) for i in range(14))))
+    return parsed
+
+
+def generate_paste_text(rows: int, *, multiline_laudo: bool = False) -> str:
+    lines = []
+    for entry in generate_entries(rows):
+        cells = [getattr(entry, name) for name in ENTRY_FIELDS]
+        if multiline_laudo:
+            cells[-1] = '"' + cells[-1].strip().replace(". ", ".\n") + '"'
+        lines.append("\t".join(cells))
+    return "\n".join(lines) + "\n"
+
+
+def bench_paste(rows: int, repeat: int) -> int:
+    text = generate_paste_text(rows)
+
+    def best(parse) -> tuple[float, int]:
+        timings = []
+        count = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            count = parse(text)
+            timings.append(time.perf_counter() - started)
+        return min(timings), count
+
+    legacy_s, legacy_count = best(lambda t: len(legacy_parse_paste(t)))
+    stream_s, stream_count = best(lambda t: sum(len(batch) for batch in iter_pasted_entries(t)))
+
+    print(f"{rows} linhas coladas")
+    print(f"  parser antigo (re.split por linha): {legacy_s * 1000:.0f} ms, {legacy_count} registros")
+    print(f"  parser em streaming (csv):          {stream_s * 1000:.0f} ms, {stream_count} registros")
+    print(f"  {legacy_s / stream_s:.1f}x mais rápido")
+
+    multiline = generate_paste_text(rows, multiline_laudo=True)
+    multiline_count = sum(len(batch) for batch in iter_pasted_entries(multiline))
+    print(f"  LAUDO com quebras de linha: {multiline_count} registros (antigo: {len(legacy_parse_paste(multiline))})")
+    return 0 if stream_count == legacy_count == multiline_count == rows else 1
+
+
+def bench_summary(rows: int, repeat: int) -> int:
+    if not numpy_available():
+        print("NumPy não está instalado; só o caminho em Python puro está disponível")
+        return 1
+
+    entries = list(generate_entries(rows))
+    store = EntryStore()
+    row_ids = store.add_many(entries)
+    subset = row_ids[::3]
+
+    def best(run) -> tuple[float, object]:
+        timings = []
+        result = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = run()
+            timings.append(time.perf_counter() - started)
+        return min(timings), result
+
+    python_s, python_items = best(lambda: summarize_entries(entries, vectorized=False))
+    numpy_s, numpy_items = best(lambda: summarize_entries(entries, vectorized=True))
+    rows_s, rows_items = best(lambda: IncrementalSummary(store.rows(subset)).sorted_items())
+    codes_s, codes_items = best(lambda: summarize_store(store, subset))
+
+    print(f"{rows} registros")
+    print(f"  summarize_entries (Python):      {python_s * 1000:.0f} ms")
+    print(f"  summarize_entries (NumPy):       {numpy_s * 1000:.0f} ms ({python_s / numpy_s:.1f}x)")
+    print(f"  filtro de {len(subset)} (RowView):  {rows_s * 1000:.0f} ms")
+    print(f"  filtro de {len(subset)} (códigos):  {codes_s * 1000:.0f} ms ({rows_s / codes_s:.1f}x)")
+    identical = python_items == numpy_items and rows_items == codes_items
+    print(f"  resultados idênticos: {'sim' if identical else 'NÃO'}")
+    return 0 if identical else 1
+
+
+def _spelling_variant(value: str, rng: random.Random) -> str:
+    variant = rng.choice((value, value.lower(), value.title(), f" {value} ", value.replace(" ", "  ")))
+    return re.sub(r"(\d)([A-Z]{2})", r"\1 \2", variant) if rng.random() < 0.2 else variant
+
+
+def bench_normalization(rows: int, repeat: int) -> int:
+    rng = random.Random(0)
+    entries = [
+        replace(
+            e,
+            produto_enviado=_spelling_variant(e.produto_enviado, rng),
+            configuracao_avaria=_spelling_variant(e.configuracao_avaria, rng),
+        )
+        for e in generate_entries(rows)
+    ]
+
+    def best(run) -> tuple[float, object]:
+        timings = []
+        result = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = run()
+            timings.append(time.perf_counter() - started)
+        return min(timings), result
+
+    normalizer = Normalizer()
+    raw_s, (raw_pieces, raw_reasons) = best(lambda: summarize_entries(entries, vectorized=False))
+    python_s, python_items = best(lambda: summarize_entries(entries, vectorized=False, normalizer=normalizer))
+    numpy_s, numpy_items = best(lambda: summarize_entries(entries, normalizer=normalizer))
+    pieces, reasons = python_items
+
+    print(f"{rows} registros com grafias variadas")
+    print(f"  sem normalização:        {raw_s * 1000:.0f} ms, {len(raw_pieces)} peças, {len(raw_reasons)} motivos")
+    print(f"  normalizado (Python):    {python_s * 1000:.0f} ms, {len(pieces)} peças, {len(reasons)} motivos")
+    print(f"  normalizado (vetorizado): {numpy_s * 1000:.0f} ms")
+    print(f"  cache: {normalizer.stats().describe()}")
+    return 0 if python_items == numpy_items and sum(q for _, q in pieces) == sum(q for _, q in raw_pieces) else 1
+
+
+def bench_sort(rows: int) -> int:
+    store = EntryStore()
+    store.add_many(generate_entries(rows))
+    keys = SortKeyCache(store)
+    failures = 0
+
+    print(f"{rows} registros")
+    for field in ("recebimento", "nf", "cliente", "numero_serie"):
+        started = time.perf_counter()
+        first = keys.sorted_ids(store.order, field)
+        cold_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        store.reorder(keys.sorted_ids(store.order, field, descending=True))
+        warm_s = time.perf_counter() - started
+
+        values = [sort_key(field, getattr(store.row(row_id), field)) for row_id in first]
+        ranked = [(value is None, isinstance(value, str), value or 0) for value in values]
+        if ranked != sorted(ranked):
+            failures += 1
+        print(f"  {field:<14} primeira ordenação {cold_s * 1000:6.0f} ms, com chaves em cache {warm_s * 1000:6.0f} ms")
+
+    return 1 if failures else 0
+
+
+def bench_period(rows: int, years: int, repeat: int) -> int:
+    store = EntryStore()
+    row_ids = store.add_many(generate_entries(rows, years=years))
+    index = DateIndex()
+    started = time.perf_counter()
+    index.add_many(zip(row_ids, store.column_values("recebimento")))
+    index.between(date(2026, 1, 1), date(2026, 1, 1))
+    build_s = time.perf_counter() - started
+
+    start, end = month_range(2026, 3)
+
+    def scan() -> list[int]:
+        selected = []
+        for row_id in store.order:
+            parsed = parse_recebimento(store.row(row_id).recebimento)
+            if parsed is not None and start <= parsed <= end:
+                selected.append(row_id)
+        return selected
+
+    def best(run) -> tuple[float, list[int]]:
+        timings = []
+        result: list[int] = []
+        for _ in range(repeat):
+            began = time.perf_counter()
+            result = run()
+            timings.append(time.perf_counter() - began)
+        return min(timings), result
+
+    scan_s, scanned = best(scan)
+    index_s, indexed = best(lambda: index.between(start, end))
+
+    print(f"{rows} registros em {years} ano(s); índice montado em {build_s * 1000:.0f} ms")
+    print(f"  MARÇO 2026 por varredura:      {scan_s * 1000:8.1f} ms, {len(scanned)} registros")
+    print(f"  MARÇO 2026 por busca binária:  {index_s * 1000:8.1f} ms, {len(indexed)} registros")
+    return 0 if sorted(scanned) == sorted(indexed) else 1
+
+
+SEARCH_QUERIES = (
+    "a",
+    "1",
+    "12",
+    "ss",
+    "oxida",
+    "cliente 12",
+    "sn0",
+    "ped-",
+    "2026",
+    "não liga",
+    "testes de estresse",
+    "bancada. defeito",
+    "xyzzy",
+)
+
+
+def bench_search(rows: int, repeat: int) -> int:
+    store = EntryStore()
+    store.add_many(generate_entries(rows))
+    index = SearchIndex(
+        ENTRY_FIELDS,
+        CATEGORICAL_FIELDS,
+        tokenized=FREE_TEXT_FIELDS,
+        alive=store,
+        current=store.get,
+        text_of=store.search_text,
+    )
+    index.enqueue(store.order)
+
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    steps = 0
+    slowest = 0.0
+    while True:
+        began = time.perf_counter()
+        pending = index.index_pending(budget=0.015)
+        slowest = max(slowest, time.perf_counter() - began)
+        steps += 1
+        if not pending:
+            break
+    build_s = time.perf_counter() - started
+
+    growth_mb = peak_rss_mb() - baseline
+    print(f"{rows} registros; índice em {build_s:.1f}s ({steps} etapas, maior {slowest * 1000:.0f} ms), RSS +{growth_mb:.0f} MB")
+    for query in SEARCH_QUERIES:
+        matches = index.search(query)
+        timings = []
+        for _ in range(repeat):
+            began = time.perf_counter()
+            index.search(query)
+            timings.append(time.perf_counter() - began)
+        print(f"  {query!r:<22} {len(matches):>8} registros {min(timings) * 1000:8.1f} ms")
+    return 0
+
+
+SUITE_CASES = ("resumo", "exportacao", "importacao", "colagem")
+SUITE_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+
+def _suite_input_workbook(workdir: Path, rows: int) -> Path:
+    path = workdir / f"entrada_{rows}.xlsx"
+    if not path.exists():
+        export_to_excel(
+            generate_entries(rows),
+            path,
+            title="Benchmark",
+            periodo_mes="JANEIRO",
+            periodo_ano="2026",
+            constant_memory=True,
+        )
+    return path
+
+
+def _run_suite_case(case: str, rows: int, repeat: int, workdir: str) -> dict[str, object]:
+    folder = Path(workdir)
+    output_bytes = 0
+
+    if case == "resumo":
+        entries = list(generate_entries(rows))
+
+        def run() -> int:
+            summarize_entries(entries)
+            return 0
+
+    elif case == "exportacao":
+        entries = list(generate_entries(rows))
+        target = folder / f"exportacao_{rows}.xlsx"
+
+        def run() -> int:
+            return export_to_excel(
+                entries,
+                target,
+                title="Benchmark",
+                periodo_mes="JANEIRO",
+                periodo_ano="2026",
+                constant_memory=True,
+            ).stat().st_size
+
+    elif case == "importacao":
+        source = _suite_input_workbook(folder, rows)
+
+        def run() -> int:
+            imported = sum(len(batch) for batch in iter_workbook_entries(source))
+            if imported != rows:
+                raise RuntimeError(f"importação leu {imported} de {rows} linhas")
+            return source.stat().st_size
+
+    elif case == "colagem":
+        text = generate_paste_text(rows, multiline_laudo=True)
+
+        def run() -> int:
+            pasted = sum(len(batch) for batch in iter_pasted_entries(text))
+            if pasted != rows:
+                raise RuntimeError(f"colagem leu {pasted} de {rows} linhas")
+            return len(text.encode("utf-8"))
+
+    else:
+        raise ValueError(f"caso desconhecido: {case}")
+
+    baseline_mb = peak_rss_mb()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output_bytes = run()
+        timings.append(time.perf_counter() - started)
+
+    return {
+        "case": case,
+        "rows": rows,
+        "wall_s": min(timings),
+        "peak_mb": max(0.0, peak_rss_mb() - baseline_mb),
+        "output_bytes": output_bytes,
+    }
+
+
+def run_suite(cases: list[str], sizes: list[int], repeat: int) -> list[dict[str, object]]:
+    results = []
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            for case in cases:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    result = pool.submit(_run_suite_case, case, rows, repeat, tmp).result()
+                results.append(result)
+                print(
+                    f"  {case:<11} {rows:>9} linhas  {result['wall_s'] * 1000:>10.1f} ms  "
+                    f"+{result['peak_mb']:.1f} MB  {result['output_bytes'] / 1024:.0f} KB",
+                    flush=True,
+                )
+    return results
+
+
+def compare_to_baseline(
+    results: list[dict[str, object]],
+    baseline: list[dict[str, object]],
+    *,
+    threshold: float,
+    min_wall_s: float = 0.01,
+    min_peak_mb: float = 5.0,
+) -> list[str]:
+    previous = {(r["case"], r["rows"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get((result["case"], result["rows"]))
+        if old is None:
+            continue
+        for metric, floor in (("wall_s", min_wall_s), ("peak_mb", min_peak_mb)):
+            new_value, old_value = float(result[metric]), float(old[metric])
+            if new_value > old_value * (1 + threshold) and new_value - old_value > floor:
+                regressions.append(
+                    f"{result['case']} {result['rows']} linhas: {metric} {old_value:.3f} -> {new_value:.3f} "
+                    f"(+{(new_value / old_value - 1) * 100 if old_value else float('inf'):.0f}%)"
+                )
+    return regressions
+
+
+def bench_suite(
+    cases: list[str],
+    sizes: list[int],
+    repeat: int,
+    output: Path | None,
+    baseline_path: Path | None,
+    threshold: float,
+) -> int:
+    print(f"Suíte: {', '.join(cases)} em {', '.join(str(n) for n in sizes)} linhas")
+    results = run_suite(cases, sizes, repeat)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results,
+    }
+    if output is not None:
+        output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Resultados salvos em {output}")
+
+    if baseline_path is None:
+        return 0
+
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))["results"]
+    regressions = compare_to_baseline(results, baseline, threshold=threshold)
+    if regressions:
+        print(f"FALHA: regressões acima de {threshold * 100:.0f}% em relação a {baseline_path}")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"Sem regressões acima de {threshold * 100:.0f}% em relação a {baseline_path}")
+    return 0
+
+
+_STARTUP_SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+result = {"import_ms": (t1 - t0) * 1000}
+if sys.argv[1] == "1":
+    root = app.RmaApp()
+    def on_map(_evt):
+        result.setdefault("first_frame_ms", (time.perf_counter() - t0) * 1000)
+        root.after(1, root.destroy)
+    root.bind("<Map>", on_map, add="+")
+    root.mainloop()
+print(json.dumps(result))
+"""
+
+
+def measure_startup(*, with_window: bool) -> dict[str, float]:
+    proc = subprocess.run(
+        [sys.executable, "-c", _STARTUP_SCRIPT, "1" if with_window else "0"],
+        cwd=Path(__file__).resolve().parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def bench_startup(runs: int, max_import_ms: float | None, max_first_frame_ms: float | None) -> int:
+    with_window = bool(os.environ.get("DISPLAY")) or sys.platform in {"win32", "darwin"}
+    samples = [measure_startup(with_window=with_window) for _ in range(runs)]
+
+    failed = False
+    for key, limit in (("import_ms", max_import_ms), ("first_frame_ms", max_first_frame_ms)):
+        values = sorted(s[key] for s in samples if key in s)
+        if not values:
+            print(f"{key}: indisponível (sem display)")
+            continue
+        median = values[len(values) // 2]
+        print(f"{key}: mediana {median:.1f} ms (min {values[0]:.1f}, max {values[-1]:.1f})")
+        if limit is not None and median > limit:
+            print(f"FALHA: {key} acima de {limit:.1f} ms")
+            failed = True
+
+    return 1 if failed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks do Gerador de Planilha RMA")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_export = sub.add_parser("export-memoria", help="Exportação em streaming com limite de memória")
+    p_export.add_argument("--rows", type=int, default=100_000)
+    p_export.add_argument("--max-rss-mb", type=float, default=150.0)
+
+    p_store = sub.add_parser("memoria-registros", help="Memória por registro: dict de RmaEntry vs EntryStore")
+    p_store.add_argument("--rows", type=int, default=100_000)
+
+    p_startup = sub.add_parser("startup", help="Tempo de import e até o primeiro frame da janela")
+    p_startup.add_argument("--runs", type=int, default=5)
+    p_startup.add_argument("--max-import-ms", type=float, default=None)
+    p_startup.add_argument("--max-first-frame-ms", type=float, default=None)
+
+    p_cons = sub.add_parser("consolidacao", help="Consolidação de várias planilhas com 1, 2, 4 e 8 workers")
+    p_cons.add_argument("--files", type=int, default=12)
+    p_cons.add_argument("--rows", type=int, default=20_000)
+    p_cons.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+
+    p_paste = sub.add_parser("colagem", help="Parser de colagem: re.split por linha vs csv em streaming")
+    p_paste.add_argument("--rows", type=int, default=50_000)
+    p_paste.add_argument("--repeat", type=int, default=3)
+
+    p_summary = sub.add_parser("resumo-vetorizado", help="Resumo em Python puro vs NumPy (bincount de códigos)")
+    p_summary.add_argument("--rows", type=int, default=1_000_000)
+    p_summary.add_argument("--repeat", type=int, default=3)
+
+    p_norm = sub.add_parser("normalizacao", help="Resumo com grafias variadas: cache de normalização e tempo")
+    p_norm.add_argument("--rows", type=int, default=200_000)
+    p_norm.add_argument("--repeat", type=int, default=3)
+
+    p_sort = sub.add_parser("ordenacao", help="Ordenação da tabela por coluna com chaves em cache")
+    p_sort.add_argument("--rows", type=int, default=200_000)
+
+    p_period = sub.add_parser("periodo", help="Seleção de um mês: varredura vs índice de datas ordenado")
+    p_period.add_argument("--rows", type=int, default=1_000_000)
+    p_period.add_argument("--anos", type=int, default=5)
+    p_period.add_argument("--repeat", type=int, default=3)
+
+    p_search = sub.add_parser("busca", help="Filtro da tabela: montagem do índice e tempo por consulta")
+    p_search.add_argument("--rows", type=int, default=500_000)
+    p_search.add_argument("--repeat", type=int, default=3)
+
+    p_suite = sub.add_parser("suite", help="Resumo, exportação, importação e colagem em vários tamanhos")
+    p_suite.add_argument("--casos", nargs="+", choices=SUITE_CASES, default=list(SUITE_CASES))
+    p_suite.add_argument("--tamanhos", type=int, nargs="+", default=list(SUITE_SIZES))
+    p_suite.add_argument("--repeat", type=int, default=3)
+    p_suite.add_argument("--saida", type=Path, default=None, help="Arquivo JSON com os resultados")
+    p_suite.add_argument("--baseline", type=Path, default=None, help="JSON de uma execução anterior")
+    p_suite.add_argument("--limite", type=float, default=0.2, help="Regressão tolerada (0.2 = 20%%)")
+
+    p_split = sub.add_parser("separacao", help="Exportação separada por cliente com 1, 2, 4 e 8 workers")
+    p_split.add_argument("--rows", type=int, default=30_000)
+    p_split.add_argument("--clientes", type=int, default=300)
+    p_split.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+
+    args = parser.parse_args(argv)
+
+    if args.command == "export-memoria":
+        return bench_export_memory(args.rows, args.max_rss_mb)
+    if args.command == "memoria-registros":
+        return bench_store_memory(args.rows)
+    if args.command == "consolidacao":
+        return bench_consolidation(args.files, args.rows, args.workers)
+    if args.command == "separacao":
+        return bench_split(args.rows, args.clientes, args.workers)
+    if args.command == "suite":
+        return bench_suite(args.casos, args.tamanhos, args.repeat, args.saida, args.baseline, args.limite)
+    if args.command == "resumo-vetorizado":
+        return bench_summary(args.rows, args.repeat)
+    if args.command == "normalizacao":
+        return bench_normalization(args.rows, args.repeat)
+    if args.command == "ordenacao":
+        return bench_sort(args.rows)
+    if args.command == "periodo":
+        return bench_period(args.rows, args.anos, args.repeat)
+    if args.command == "busca":
+        return bench_search(args.rows, args.repeat)
+    if args.command == "colagem":
+        return bench_paste(args.rows, args.repeat)
+    if args.command == "startup":
+        return bench_startup(args.runs, args.max_import_ms, args.max_first_frame_ms)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
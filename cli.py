@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Iterator, Sequence
+
+from archive import DEFAULT_ARCHIVE_PATH, RmaArchive
+from consolidation import consolidate_workbooks, find_workbooks
+from excel_exporter import MESES, RmaEntry, export_to_excel, parse_recebimento
+from importer import WorkbookImportError, iter_file_entries
+from normalization import DEFAULT_ALIAS_PATH, Normalizer, load_aliases
+from split_export import SPLIT_KEYS, split_export
+from tracing import TRACE_MODES, TRACER
+
+
+@dataclass(frozen=True)
+class ExportJob:
+    inputs: tuple[str, ...]
+    output: str
+    title: str
+    periodo_mes: str
+    periodo_ano: str
+    summary_top_n: int | None = None
+    full_breakdown_sheet: bool = False
+    analysis_sheet: bool = False
+    aliases_path: str | None = None
+
+
+def default_title(now: datetime | None = None) -> str:
+    now = now or datetime.now()
+    return f"{now:%d/%m/%Y}(Atualizada) Planilha RMA"
+
+
+def iter_inputs(paths: Sequence[str]) -> Iterator[RmaEntry]:
+    return itertools.chain.from_iterable(iter_file_entries(p) for p in paths)
+
+
+def build_normalizer(args: argparse.Namespace) -> Normalizer | None:
+    if not args.normalizar:
+        return None
+    return Normalizer(load_aliases(args.apelidos))
+
+
+def run_job(job: ExportJob) -> tuple[str, int, float, str]:
+    started = time.perf_counter()
+    rows = 0
+    normalizer = Normalizer(load_aliases(job.aliases_path)) if job.aliases_path is not None else None
+
+    def count(done: int) -> None:
+        nonlocal rows
+        rows = done
+
+    path = export_to_excel(
+        iter_inputs(job.inputs),
+        job.output,
+        title=job.title,
+        periodo_mes=job.periodo_mes,
+        periodo_ano=job.periodo_ano,
+        on_progress=count,
+        progress_every=10_000,
+        constant_memory=True,
+        summary_top_n=job.summary_top_n,
+        full_breakdown_sheet=job.full_breakdown_sheet,
+        analysis_sheet=job.analysis_sheet,
+        normalizer=normalizer,
+    )
+    note = f" (normalização: {normalizer.stats().describe()})" if normalizer is not None else ""
+    return str(path), rows, time.perf_counter() - started, note
+
+
+def load_jobs(jobs_file: str, defaults: argparse.Namespace) -> list[ExportJob]:
+    with open(jobs_file, encoding="utf-8") as fh:
+        raw = json.load(fh)
+
+    jobs: list[ExportJob] = []
+    for item in raw:
+        inputs = item["entrada"]
+        jobs.append(
+            ExportJob(
+                inputs=tuple([inputs] if isinstance(inputs, str) else inputs),
+                output=item["saida"],
+                title=item.get("titulo", defaults.titulo),
+                periodo_mes=item.get("mes", defaults.mes),
+                periodo_ano=str(item.get("ano", defaults.ano)),
+                summary_top_n=item.get("top_n", defaults.top_n),
+                full_breakdown_sheet=item.get("detalhamento", defaults.detalhamento),
+                analysis_sheet=item.get("analise", defaults.analise),
+                aliases_path=defaults.apelidos if item.get("normalizar", defaults.normalizar) else None,
+            )
+        )
+    return jobs
+
+
+def run_jobs(jobs: Sequence[ExportJob], workers: int) -> int:
+    failures = 0
+
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            failures += _report(job, lambda job=job: run_job(job))
+        return failures
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_job, job): job for job in jobs}
+        for future in as_completed(futures):
+            failures += _report(futures[future], future.result)
+    return failures
+
+
+def _report(job: ExportJob, result) -> int:
+    try:
+        path, rows, elapsed, note = result()
+    except (OSError, WorkbookImportError, ValueError) as e:
+        print(f"ERRO {job.output}: {e}", file=sys.stderr)
+        return 1
+    print(f"{path}: {rows} registro(s) em {elapsed:.2f}s{note}")
+    return 0
+
+
+def _add_export_options(parser: argparse.ArgumentParser) -> None:
+    now = datetime.now()
+    parser.add_argument("--titulo", default=default_title(now), help="Título da planilha")
+    parser.add_argument("--mes", default=MESES[now.month - 1], type=str.upper, help="Mês do período (ex.: MARÇO)")
+    parser.add_argument("--ano", default=str(now.year), help="Ano do período")
+    parser.add_argument("--top-n", type=int, default=None, help="Limita as tabelas do Resumo aos N maiores")
+    parser.add_argument("--detalhamento", action="store_true", help="Inclui a aba Detalhamento completa")
+    parser.add_argument("--analise", action="store_true", help="Inclui a aba Análise (mês, cliente, plataforma, status)")
+    parser.add_argument(
+        "--normalizar",
+        action="store_true",
+        help="Agrupa variações de Produto/Avaria (maiúsculas, acentos, espaços e apelidos)",
+    )
+    parser.add_argument("--apelidos", default=str(DEFAULT_ALIAS_PATH), help="Arquivo JSON de apelidos")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Gerador de Planilha RMA (linha de comando)")
+    parser.add_argument(
+        "--rastreamento",
+        choices=TRACE_MODES,
+        default=None,
+        help="Grava tempos (e opcionalmente memória/perfil) em ~/.gerador_rma/trace",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_gerar = sub.add_parser("gerar", help="Gera uma planilha a partir de CSV/TSV ou planilhas RMA")
+    p_gerar.add_argument("entrada", nargs="+", help="Arquivos .csv, .tsv, .txt ou .xlsx")
+    p_gerar.add_argument("-o", "--saida", required=True, help="Arquivo .xlsx de saída")
+    _add_export_options(p_gerar)
+
+    p_lote = sub.add_parser("lote", help="Gera várias planilhas a partir de um arquivo de jobs JSON")
+    p_lote.add_argument("jobs", help='Lista JSON de {"entrada": ..., "saida": ..., "titulo": ..., "mes": ..., "ano": ...}')
+    p_lote.add_argument("-j", "--workers", type=int, default=1, help="Número de processos em paralelo")
+    _add_export_options(p_lote)
+
+    p_consolidar = sub.add_parser("consolidar", help="Consolida uma pasta de planilhas RMA em uma só")
+    p_consolidar.add_argument("pasta", help="Pasta com as planilhas .xlsx mensais")
+    p_consolidar.add_argument("-o", "--saida", required=True, help="Arquivo .xlsx consolidado")
+    p_consolidar.add_argument("-j", "--workers", type=int, default=1, help="Número de processos em paralelo")
+    _add_export_options(p_consolidar)
+
+    p_separar = sub.add_parser("separar", help="Gera uma planilha por cliente, plataforma, mês ou status")
+    p_separar.add_argument("entrada", nargs="+", help="Arquivos .csv, .tsv, .txt ou .xlsx")
+    p_separar.add_argument("-o", "--saida", required=True, help="Pasta de destino")
+    p_separar.add_argument("--por", choices=list(SPLIT_KEYS), default="cliente", help="Chave de separação")
+    p_separar.add_argument("-j", "--workers", type=int, default=1, help="Número de processos em paralelo")
+    _add_export_options(p_separar)
+
+    p_arquivar = sub.add_parser("arquivar", help="Grava registros de CSV/TSV ou planilhas no arquivo SQLite")
+    p_arquivar.add_argument("entrada", nargs="+", help="Arquivos .csv, .tsv, .txt ou .xlsx")
+    p_arquivar.add_argument("--db", default=str(DEFAULT_ARCHIVE_PATH), help="Arquivo SQLite do histórico")
+
+    p_hist = sub.add_parser("exportar-arquivo", help="Gera uma planilha a partir de uma consulta ao arquivo SQLite")
+    p_hist.add_argument("-o", "--saida", required=True, help="Arquivo .xlsx de saída")
+    p_hist.add_argument("--db", default=str(DEFAULT_ARCHIVE_PATH), help="Arquivo SQLite do histórico")
+    p_hist.add_argument("--serie", help="Numero de serie")
+    p_hist.add_argument("--nf", help="NF")
+    p_hist.add_argument("--os", help="OS")
+    p_hist.add_argument("--cliente", help="Cliente")
+    p_hist.add_argument("--de", type=_parse_date_arg, help="Recebimento a partir de (dd/mm/aaaa)")
+    p_hist.add_argument("--ate", type=_parse_date_arg, help="Recebimento até (dd/mm/aaaa)")
+    _add_export_options(p_hist)
+
+    return parser
+
+
+def _parse_date_arg(value: str) -> date:
+    parsed = parse_recebimento(value)
+    if parsed is None:
+        raise argparse.ArgumentTypeError(f"data inválida: {value}")
+    return parsed
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.rastreamento:
+        TRACER.configure(args.rastreamento)
+    else:
+        TRACER.configure_from_env()
+
+    if args.command == "gerar":
+        job = ExportJob(
+            inputs=tuple(args.entrada),
+            output=args.saida,
+            title=args.titulo,
+            periodo_mes=args.mes,
+            periodo_ano=args.ano,
+            summary_top_n=args.top_n,
+            full_breakdown_sheet=args.detalhamento,
+            analysis_sheet=args.analise,
+            aliases_path=args.apelidos if args.normalizar else None,
+        )
+        return 1 if run_jobs([job], workers=1) else 0
+
+    if args.command == "lote":
+        jobs = load_jobs(args.jobs, args)
+        return 1 if run_jobs(jobs, workers=args.workers) else 0
+
+    if args.command == "separar":
+        started = time.perf_counter()
+        results = split_export(
+            iter_inputs(args.entrada),
+            args.saida,
+            args.por,
+            title=args.titulo,
+            periodo_mes=args.mes,
+            periodo_ano=args.ano,
+            workers=args.workers,
+            summary_top_n=args.top_n,
+            full_breakdown_sheet=args.detalhamento,
+            analysis_sheet=args.analise,
+            normalizer=build_normalizer(args),
+        )
+        print(f"{len(results)} planilha(s) em {args.saida} em {time.perf_counter() - started:.2f}s")
+        return 0
+
+    if args.command == "arquivar":
+        with RmaArchive(args.db) as archive:
+            stats = archive.insert_many(iter_inputs(args.entrada))
+        print(f"{stats.describe()} em {args.db}")
+        return 0
+
+    if args.command == "exportar-arquivo":
+        started = time.perf_counter()
+        with RmaArchive(args.db) as archive:
+            path = export_to_excel(
+                archive.find(
+                    numero_serie=args.serie,
+                    nf=args.nf,
+                    os=args.os,
+                    cliente=args.cliente,
+                    date_from=args.de,
+                    date_to=args.ate,
+                ),
+                args.saida,
+                title=args.titulo,
+                periodo_mes=args.mes,
+                periodo_ano=args.ano,
+                constant_memory=True,
+                summary_top_n=args.top_n,
+                full_breakdown_sheet=args.detalhamento,
+                analysis_sheet=args.analise,
+                normalizer=build_normalizer(args),
+            )
+        print(f"{path} gerado em {time.perf_counter() - started:.2f}s")
+        return 0
+
+    if args.command == "consolidar":
+        paths = find_workbooks(args.pasta)
+        if not paths:
+            print(f"Nenhuma planilha .xlsx encontrada em {args.pasta}", file=sys.stderr)
+            return 1
+
+        started = time.perf_counter()
+        try:
+            path = consolidate_workbooks(
+                paths,
+                args.saida,
+                title=args.titulo,
+                periodo_mes=args.mes,
+                periodo_ano=args.ano,
+                workers=args.workers,
+                on_file_done=lambda done, total: print(f"[{done}/{total}] arquivo(s) lido(s)"),
+                summary_top_n=args.top_n,
+                full_breakdown_sheet=args.detalhamento,
+                analysis_sheet=args.analise,
+                normalizer=build_normalizer(args),
+            )
+        except (OSError, WorkbookImportError, ValueError) as e:
+            print(f"ERRO {args.saida}: {e}", file=sys.stderr)
+            return 1
+        print(f"{path}: {len(paths)} arquivo(s) consolidados em {time.perf_counter() - started:.2f}s")
+        return 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
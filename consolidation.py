@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterator, Sequence
+
+from excel_exporter import IncrementalSummary, RmaEntry, export_to_excel
+from importer import iter_workbook_entries
+
+if TYPE_CHECKING:
+    from normalization import Normalizer
+
+
+RowBatch = list[tuple[str, ...]]
+WorkbookPart = tuple[str, RowBatch, Counter[tuple[str, str]]]
+
+
+def find_workbooks(folder: str | Path) -> list[Path]:
+    return sorted(
+        p for p in Path(folder).iterdir() if p.suffix.lower() == ".xlsx" and not p.name.startswith(("~$", "."))
+    )
+
+
+def read_workbook_part(file_path: str | Path) -> WorkbookPart:
+    summary = IncrementalSummary()
+    rows: RowBatch = []
+    for batch in iter_workbook_entries(file_path, chunk_size=5000):
+        for e in batch:
+            summary.add(e)
+            rows.append(
+                (
+                    e.recebimento,
+                    e.cliente,
+                    e.nf,
+                    e.os,
+                    e.triagem,
+                    e.produto_enviado,
+                    e.und,
+                    e.plataforma,
+                    e.codigo,
+                    e.numero_serie,
+                    e.status,
+                    e.configuracao_avaria,
+                    e.pedido_marketplace,
+                    e.laudo_tecnico,
+                )
+            )
+    return str(file_path), rows, summary.pairs
+
+
+def iter_workbook_parts(paths: Sequence[str | Path], *, workers: int) -> Iterator[WorkbookPart]:
+    if workers <= 1 or len(paths) <= 1:
+        for p in paths:
+            yield read_workbook_part(p)
+        return
+
+    pool = ProcessPoolExecutor(max_workers=min(workers, len(paths)))
+    try:
+        yield from pool.map(read_workbook_part, [str(p) for p in paths])
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def consolidate_workbooks(
+    paths: Sequence[str | Path],
+    output: str | Path,
+    *,
+    title: str,
+    periodo_mes: str,
+    periodo_ano: str,
+    workers: int = 1,
+    on_file_done: Callable[[int, int], None] | None = None,
+    summary_top_n: int | None = None,
+    full_breakdown_sheet: bool = False,
+    analysis_sheet: bool = False,
+    normalizer: Normalizer | None = None,
+) -> Path:
+    summary = IncrementalSummary()
+
+    def entries() -> Iterator[RmaEntry]:
+        for done, (_path, rows, pairs) in enumerate(iter_workbook_parts(paths, workers=workers), start=1):
+            summary.merge(pairs)
+            for row in rows:
+                yield RmaEntry(*row)
+            if on_file_done is not None:
+                on_file_done(done, len(paths))
+
+    return export_to_excel(
+        entries(),
+        output,
+        title=title,
+        periodo_mes=periodo_mes,
+        periodo_ano=periodo_ano,
+        constant_memory=True,
+        summary_top_n=summary_top_n,
+        full_breakdown_sheet=full_breakdown_sheet,
+        analysis_sheet=analysis_sheet,
+        normalizer=normalizer,
+        summary=summary if normalizer is None else None,
+    )
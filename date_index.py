@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import calendar
+from bisect import bisect_left
+from datetime import date
+from typing import Iterable, Sequence
+
+from excel_exporter import parse_recebimento
+
+DateKey = tuple[int, int]
+
+
+def month_range(year: int, month: int) -> tuple[date, date]:
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+class DateIndex:
+    def __init__(self, *, bulk_remove_threshold: int = 64) -> None:
+        self.bulk_remove_threshold = bulk_remove_threshold
+        self.undated: set[int] = set()
+        self._keys: list[DateKey] = []
+        self._pending: list[DateKey] = []
+        self._ordinal_by_id: dict[int, int] = {}
+        self._ordinals: dict[str, int | None] = {}
+
+    def __len__(self) -> int:
+        return len(self._ordinal_by_id)
+
+    def ordinal_of(self, recebimento: str) -> int | None:
+        try:
+            return self._ordinals[recebimento]
+        except KeyError:
+            parsed = parse_recebimento(recebimento)
+            ordinal = self._ordinals[recebimento] = parsed.toordinal() if parsed is not None else None
+            return ordinal
+
+    def add(self, row_id: int, recebimento: str) -> None:
+        ordinal = self.ordinal_of(recebimento)
+        if ordinal is None:
+            self.undated.add(row_id)
+            return
+        self._ordinal_by_id[row_id] = ordinal
+        self._pending.append((ordinal, row_id))
+
+    def add_many(self, rows: Iterable[tuple[int, str]]) -> None:
+        for row_id, recebimento in rows:
+            self.add(row_id, recebimento)
+
+    def replace(self, row_id: int, recebimento: str) -> None:
+        self.remove((row_id,))
+        self.add(row_id, recebimento)
+
+    def remove(self, row_ids: Sequence[int]) -> None:
+        self._flush()
+        removed: set[DateKey] = set()
+        for row_id in row_ids:
+            self.undated.discard(row_id)
+            ordinal = self._ordinal_by_id.pop(row_id, None)
+            if ordinal is not None:
+                removed.add((ordinal, row_id))
+        if not removed:
+            return
+
+        if len(removed) > self.bulk_remove_threshold:
+            self._keys = [key for key in self._keys if key not in removed]
+            return
+        for key in removed:
+            pos = bisect_left(self._keys, key)
+            if pos < len(self._keys) and self._keys[pos] == key:
+                del self._keys[pos]
+
+    def clear(self) -> None:
+        self.undated.clear()
+        self._keys.clear()
+        self._pending.clear()
+        self._ordinal_by_id.clear()
+
+    def between(self, start: date, end: date) -> list[int]:
+        self._flush()
+        lo = bisect_left(self._keys, (start.toordinal(),))
+        hi = bisect_left(self._keys, (end.toordinal() + 1,), lo)
+        return [row_id for _ordinal, row_id in self._keys[lo:hi]]
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._keys.extend(self._pending)
+            self._keys.sort()
+            self._pending.clear()
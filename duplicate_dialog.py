@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import tkinter as tk
+from tkinter import ttk
+
+from duplicates import KEEP, MATCH_LABELS, REPLACE, SKIP
+from excel_exporter import RmaEntry
+
+
+class DuplicateDialog(tk.Toplevel):
+    def __init__(self, master: tk.Misc, title: str, entry: RmaEntry, match_kind: str) -> None:
+        super().__init__(master)
+
+        self.title(title)
+        self.resizable(False, False)
+        self.transient(master)
+
+        self.result: str | None = None
+        self.apply_to_all_var = tk.BooleanVar(value=True)
+
+        frame = ttk.Frame(self, padding=12)
+        frame.pack(fill="both", expand=True)
+
+        details = [
+            f"Critério: {MATCH_LABELS.get(match_kind, match_kind)}",
+            f"Numero de serie: {entry.numero_serie or '-'}",
+            f"NF: {entry.nf or '-'}   OS: {entry.os or '-'}",
+            f"Produto enviado: {entry.produto_enviado or '-'}",
+        ]
+        ttk.Label(frame, text="Este registro já existe na lista.").grid(row=0, column=0, sticky="w", pady=(0, 6))
+        ttk.Label(frame, text="\n".join(details), justify="left").grid(row=1, column=0, sticky="w")
+        ttk.Checkbutton(
+            frame,
+            text="Aplicar aos demais duplicados desta operação",
+            variable=self.apply_to_all_var,
+        ).grid(row=2, column=0, sticky="w", pady=(10, 0))
+
+        buttons = ttk.Frame(frame)
+        buttons.grid(row=3, column=0, sticky="e", pady=(10, 0))
+        ttk.Button(buttons, text="Ignorar", command=lambda: self._choose(SKIP)).grid(row=0, column=0, padx=4)
+        ttk.Button(buttons, text="Substituir", command=lambda: self._choose(REPLACE)).grid(row=0, column=1, padx=4)
+        ttk.Button(buttons, text="Manter ambos", command=lambda: self._choose(KEEP)).grid(row=0, column=2, padx=4)
+
+        self.protocol("WM_DELETE_WINDOW", lambda: self._choose(SKIP))
+        self.bind("<Escape>", lambda _evt: self._choose(SKIP))
+        self.grab_set()
+
+    def _choose(self, action: str) -> None:
+        self.result = action
+        self.destroy()
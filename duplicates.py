@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any
+
+from entry_store import ENTRY_FIELDS
+
+if TYPE_CHECKING:
+    from normalization import Normalizer
+
+SKIP = "skip"
+REPLACE = "replace"
+KEEP = "keep"
+
+MATCH_LABELS = {
+    "numero_serie": "Numero de serie",
+    "nf_os": "NF + OS",
+    "fingerprint": "Registro idêntico",
+}
+
+
+def _norm(value: str) -> str:
+    return value.strip().casefold()
+
+
+def _serial_key(entry: Any) -> str:
+    return _norm(entry.numero_serie)
+
+
+def _nf_os_key(entry: Any) -> tuple[str, str] | None:
+    nf, os_ = _norm(entry.nf), _norm(entry.os)
+    if nf and os_:
+        return nf, os_
+    return None
+
+
+_all_fields = attrgetter(*ENTRY_FIELDS)
+
+
+def _fingerprint_key(entry: Any) -> str:
+    return "\x1f".join(_all_fields(entry)).casefold()
+
+
+_PRODUTO = ENTRY_FIELDS.index("produto_enviado")
+_AVARIA = ENTRY_FIELDS.index("configuracao_avaria")
+
+
+def _normalized_fingerprint_key(entry: Any, normalizer: Normalizer) -> str:
+    values = list(_all_fields(entry))
+    values[_PRODUTO] = normalizer.key(values[_PRODUTO])
+    values[_AVARIA] = normalizer.key(values[_AVARIA])
+    return "\x1f".join(values).casefold()
+
+
+class DuplicateIndex:
+    def __init__(
+        self,
+        get_row: Callable[[int], Any],
+        *,
+        fingerprint: bool = True,
+        normalizer: Normalizer | None = None,
+    ) -> None:
+        self._get_row = get_row
+        self.fingerprint = fingerprint
+        self.normalizer = normalizer
+        self._tables: dict[str, dict[int, int | list[int]]] = {
+            "numero_serie": {},
+            "nf_os": {},
+            "fingerprint": {},
+        }
+
+    def keys(self, entry: Any) -> list[tuple[str, Any]]:
+        keys: list[tuple[str, Any]] = []
+        serial = _serial_key(entry)
+        if serial:
+            keys.append(("numero_serie", serial))
+        else:
+            nf_os = _nf_os_key(entry)
+            if nf_os is not None:
+                keys.append(("nf_os", nf_os))
+        if self.fingerprint:
+            keys.append(("fingerprint", self._fingerprint_key(entry)))
+        return keys
+
+    def add(self, row_id: int, entry: Any, keys: list[tuple[str, Any]] | None = None) -> None:
+        for kind, key in keys if keys is not None else self.keys(entry):
+            table = self._tables[kind]
+            h = hash(key)
+            bucket = table.get(h)
+            if bucket is None:
+                table[h] = row_id
+            elif isinstance(bucket, list):
+                bucket.append(row_id)
+            else:
+                table[h] = [bucket, row_id]
+
+    def remove(self, row_id: int, entry: Any) -> None:
+        for kind, key in self.keys(entry):
+            table = self._tables[kind]
+            h = hash(key)
+            bucket = table.get(h)
+            if bucket is None:
+                continue
+            if isinstance(bucket, list):
+                if row_id in bucket:
+                    bucket.remove(row_id)
+                if len(bucket) == 1:
+                    table[h] = bucket[0]
+                elif not bucket:
+                    del table[h]
+            elif bucket == row_id:
+                del table[h]
+
+    def clear(self) -> None:
+        for table in self._tables.values():
+            table.clear()
+
+    def find(
+        self,
+        entry: Any,
+        keys: list[tuple[str, Any]] | None = None,
+        *,
+        exclude: int | None = None,
+    ) -> tuple[int, str] | None:
+        for kind, key in keys if keys is not None else self.keys(entry):
+            bucket = self._tables[kind].get(hash(key))
+            if bucket is None:
+                continue
+            for row_id in bucket if isinstance(bucket, list) else (bucket,):
+                if row_id != exclude and self._key_of(kind, self._get_row(row_id)) == key:
+                    return row_id, kind
+        return None
+
+    def _key_of(self, kind: str, entry: Any) -> Any:
+        if kind == "numero_serie":
+            return _serial_key(entry)
+        if kind == "nf_os":
+            return _nf_os_key(entry)
+        return self._fingerprint_key(entry)
+
+    def _fingerprint_key(self, entry: Any) -> str:
+        if self.normalizer is None:
+            return _fingerprint_key(entry)
+        return _normalized_fingerprint_key(entry, self.normalizer)
+
+
+@dataclass(slots=True)
+class DuplicateStats:
+    action: str | None = None
+    skipped: int = 0
+    replaced: int = 0
+    kept: int = 0
+
+    def describe(self) -> str:
+        parts = []
+        if self.skipped:
+            parts.append(f"{self.skipped} duplicado(s) ignorado(s)")
+        if self.replaced:
+            parts.append(f"{self.replaced} substituído(s)")
+        if self.kept:
+            parts.append(f"{self.kept} duplicado(s) mantido(s)")
+        return "; ".join(parts)
@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import fields
+from itertools import islice
+from operator import lt
+from typing import Iterable, Iterator, Sequence
+
+from excel_exporter import RmaEntry
+
+
+ENTRY_FIELDS: tuple[str, ...] = tuple(f.name for f in fields(RmaEntry))
+
+CATEGORICAL_FIELDS = frozenset(
+    {
+        "recebimento",
+        "cliente",
+        "triagem",
+        "produto_enviado",
+        "und",
+        "plataforma",
+        "status",
+        "configuracao_avaria",
+    }
+)
+
+FREE_TEXT_FIELDS = frozenset({"laudo_tecnico"})
+
+_SEP = "\x1f"
+_SEP_BYTES = _SEP.encode()
+
+
+class _Dictionary:
+    __slots__ = ("values", "codes", "refs", "free", "version")
+
+    def __init__(self) -> None:
+        self.values: list[str] = [""]
+        self.codes: dict[str, int] = {"": 0}
+        self.refs = array("I", [0])
+        self.free: list[int] = []
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            if self.free:
+                code = self.free.pop()
+                self.values[code] = value
+                self.version += 1
+            else:
+                code = len(self.values)
+                self.values.append(value)
+                self.refs.append(0)
+            self.codes[value] = code
+        if code:
+            self.refs[code] += 1
+        return code
+
+    def release(self, code: int) -> None:
+        if not code:
+            return
+        refs = self.refs[code] - 1
+        self.refs[code] = refs
+        if refs:
+            return
+        del self.codes[self.values[code]]
+        self.values[code] = ""
+        self.free.append(code)
+
+    def frozen(self) -> _Dictionary:
+        copy = _Dictionary.__new__(_Dictionary)
+        copy.values = self.values[:]
+        copy.codes = dict(self.codes)
+        copy.refs = self.refs[:]
+        copy.free = list(self.free)
+        copy.version = self.version
+        return copy
+
+
+class RowView:
+    __slots__ = ("_store", "_slot")
+
+    def __init__(self, store: EntryStore, slot: int) -> None:
+        self._store = store
+        self._slot = slot
+
+    def to_entry(self) -> RmaEntry:
+        return self._store._materialize(self._slot)
+
+    def __repr__(self) -> str:
+        return f"RowView({self.to_entry()!r})"
+
+
+def _categorical_property(col: int) -> property:
+    def get(self: RowView) -> str:
+        store = self._store
+        return store._dictionaries[col].values[store._codes[col][self._slot]]
+
+    return property(get)
+
+
+def _free_text_property(pos: int) -> property:
+    def get(self: RowView) -> str:
+        store = self._store
+        return store._free_text(store._packed[self._slot].split(_SEP_BYTES, len(_ID_COLUMNS))[-1])[pos]
+
+    return property(get)
+
+
+def _id_property(pos: int) -> property:
+    def get(self: RowView) -> str:
+        return self._store._packed[self._slot].split(_SEP_BYTES, pos + 1)[pos].decode()
+
+    return property(get)
+
+
+_CATEGORICAL_COLUMNS = [name for name in ENTRY_FIELDS if name in CATEGORICAL_FIELDS]
+_TEXT_COLUMNS = [name for name in ENTRY_FIELDS if name not in CATEGORICAL_FIELDS]
+_ID_COLUMNS = [name for name in _TEXT_COLUMNS if name not in FREE_TEXT_FIELDS]
+_FREE_TEXT_COLUMNS = [name for name in _TEXT_COLUMNS if name in FREE_TEXT_FIELDS]
+
+for _col, _name in enumerate(_CATEGORICAL_COLUMNS):
+    setattr(RowView, _name, _categorical_property(_col))
+for _pos, _name in enumerate(_ID_COLUMNS):
+    setattr(RowView, _name, _id_property(_pos))
+for _pos, _name in enumerate(_FREE_TEXT_COLUMNS):
+    setattr(RowView, _name, _free_text_property(_pos))
+
+_TEXT_ORDER = [(_ID_COLUMNS + _FREE_TEXT_COLUMNS).index(name) for name in _TEXT_COLUMNS]
+_FIELD_ORDER = [(_CATEGORICAL_COLUMNS + _TEXT_COLUMNS).index(name) for name in ENTRY_FIELDS]
+
+
+def _phrases(text: str) -> list[str]:
+    marked = text.replace(". ", ". \x00").replace("\n", "\n\x00").replace(_SEP, " ")
+    return [phrase for phrase in marked.split("\x00") if phrase]
+
+
+def _phrase_codes(packed: bytes) -> array:
+    if not packed:
+        return array("H")
+    codes = array(chr(packed[0]))
+    codes.frombytes(packed[1:])
+    return codes
+
+
+class EntryStore:
+    def __init__(self) -> None:
+        self._dictionaries = [_Dictionary() for _ in _CATEGORICAL_COLUMNS]
+        self._codes = [array("I") for _ in _CATEGORICAL_COLUMNS]
+        self._phrases = _Dictionary()
+        self._packed: list[bytes] = []
+        self._slot_of = array("I", [0])
+        self._count = 0
+        self._free_slots: list[int] = []
+        self.order: list[int] = []
+        self.insertion_order = True
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, row_id: object) -> bool:
+        return isinstance(row_id, int) and 0 < row_id < len(self._slot_of) and self._slot_of[row_id] > 0
+
+    def add(self, entry: RmaEntry) -> int:
+        row_id = len(self._slot_of)
+
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._write(slot, entry)
+        else:
+            slot = len(self._packed)
+            for col, name in enumerate(_CATEGORICAL_COLUMNS):
+                self._codes[col].append(self._dictionaries[col].encode(getattr(entry, name)))
+            self._packed.append(self._pack(entry))
+
+        self._slot_of.append(slot + 1)
+        self._count += 1
+        self.order.append(row_id)
+        return row_id
+
+    def add_many(self, entries: Iterable[RmaEntry]) -> list[int]:
+        return [self.add(e) for e in entries]
+
+    def replace(self, row_id: int, entry: RmaEntry) -> None:
+        self._write(self._slot(row_id), entry)
+
+    def remove(self, row_ids: Iterable[int]) -> None:
+        removed = set()
+        for row_id in row_ids:
+            if row_id not in self:
+                continue
+            slot = self._slot_of[row_id] - 1
+            self._slot_of[row_id] = 0
+            self._count -= 1
+            self._write(slot, None)
+            self._free_slots.append(slot)
+            removed.add(row_id)
+
+        if removed:
+            self.order = [rid for rid in self.order if rid not in removed]
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def reorder(self, row_ids: Sequence[int]) -> None:
+        if len(row_ids) != len(self.order):
+            raise ValueError("A nova ordem precisa conter todos os registros")
+        self.order = list(row_ids)
+        self.insertion_order = all(map(lt, self.order, islice(self.order, 1, None)))
+
+    def get(self, row_id: int) -> RmaEntry:
+        return self._materialize(self._slot(row_id))
+
+    def row(self, row_id: int) -> RowView:
+        return RowView(self, self._slot(row_id))
+
+    def values(self, row_id: int) -> list[str]:
+        return self._values(self._slot(row_id))
+
+    def search_text(self, row_id: int) -> str:
+        return _SEP.join(self._text_values(self._slot(row_id)))
+
+    def slots(self, row_ids: Sequence[int] | None = None) -> array:
+        slot_of = self._slot_of
+        return array("I", [slot_of[row_id] - 1 for row_id in (self.order if row_ids is None else row_ids)])
+
+    def column_codes(self, name: str) -> tuple[array, list[str]]:
+        col = _CATEGORICAL_COLUMNS.index(name)
+        return self._codes[col], self._dictionaries[col].values
+
+    def column_version(self, name: str) -> int:
+        return self._dictionaries[_CATEGORICAL_COLUMNS.index(name)].version
+
+    def column_values(self, name: str, row_ids: Sequence[int] | None = None) -> list[str]:
+        slots = self.slots(row_ids)
+        if name in CATEGORICAL_FIELDS:
+            codes, values = self.column_codes(name)
+            return [values[codes[slot]] for slot in slots]
+        packed = self._packed
+        if name in FREE_TEXT_FIELDS:
+            pos = _FREE_TEXT_COLUMNS.index(name)
+            split = len(_ID_COLUMNS)
+            return [self._free_text(packed[slot].split(_SEP_BYTES, split)[-1])[pos] for slot in slots]
+        pos = _ID_COLUMNS.index(name)
+        return [packed[slot].split(_SEP_BYTES, pos + 1)[pos].decode() for slot in slots]
+
+    def rows(self, row_ids: Sequence[int] | None = None) -> Iterator[RowView]:
+        slot_of = self._slot_of
+        for row_id in self.order if row_ids is None else row_ids:
+            yield RowView(self, slot_of[row_id] - 1)
+
+    def snapshot(self) -> EntryStore:
+        copy = EntryStore.__new__(EntryStore)
+        copy._dictionaries = [dictionary.frozen() for dictionary in self._dictionaries]
+        copy._codes = [codes[:] for codes in self._codes]
+        copy._phrases = self._phrases.frozen()
+        copy._packed = self._packed[:]
+        copy._slot_of = self._slot_of[:]
+        copy._count = self._count
+        copy._free_slots = list(self._free_slots)
+        copy.order = list(self.order)
+        copy.insertion_order = self.insertion_order
+        return copy
+
+    def _slot(self, row_id: int) -> int:
+        if row_id not in self:
+            raise KeyError(row_id)
+        return self._slot_of[row_id] - 1
+
+    def _text_values(self, slot: int) -> list[str]:
+        parts = self._packed[slot].split(_SEP_BYTES, len(_ID_COLUMNS))
+        values = [part.decode() for part in parts[:-1]]
+        values += self._free_text(parts[-1])
+        return [values[i] for i in _TEXT_ORDER]
+
+    def _free_text(self, packed: bytes) -> list[str]:
+        values = self._phrases.values
+        return "".join([values[code] if code else _SEP for code in _phrase_codes(packed)]).split(_SEP)[:-1]
+
+    def _pack(self, entry: RmaEntry) -> bytes:
+        encode = self._phrases.encode
+        codes: list[int] = []
+        for name in _FREE_TEXT_COLUMNS:
+            codes.extend(map(encode, _phrases(getattr(entry, name))))
+            codes.append(0)
+        typecode = "H" if max(codes) < 0x10000 else "I"
+        parts = [getattr(entry, name).replace(_SEP, " ").encode() for name in _ID_COLUMNS]
+        parts.append(typecode.encode() + array(typecode, codes).tobytes())
+        return _SEP_BYTES.join(parts)
+
+    def _values(self, slot: int) -> list[str]:
+        values = [dictionary.values[codes[slot]] for dictionary, codes in zip(self._dictionaries, self._codes)]
+        values += self._text_values(slot)
+        return [values[i] for i in _FIELD_ORDER]
+
+    def _materialize(self, slot: int) -> RmaEntry:
+        return RmaEntry(*self._values(slot))
+
+    def _write(self, slot: int, entry: RmaEntry | None) -> None:
+        for col, name in enumerate(_CATEGORICAL_COLUMNS):
+            value = getattr(entry, name) if entry is not None else ""
+            dictionary = self._dictionaries[col]
+            codes = self._codes[col]
+            old = codes[slot]
+            codes[slot] = dictionary.encode(value)
+            dictionary.release(old)
+        old_phrases = _phrase_codes(self._packed[slot].split(_SEP_BYTES, len(_ID_COLUMNS))[-1])
+        self._packed[slot] = self._pack(entry) if entry is not None else b""
+        for code in old_phrases:
+            self._phrases.release(code)
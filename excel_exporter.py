@@ -1,14 +1,43 @@
 from __future__ import annotations
 
+import heapq
+import os
+import tempfile
 from collections import Counter
 from dataclasses import dataclass
+from datetime import date, datetime
 from pathlib import Path
-from typing import Iterable
+from typing import TYPE_CHECKING, Callable, Iterable
 
-import xlsxwriter
+from tracing import laps, span
 
+if TYPE_CHECKING:
+    import xlsxwriter
 
-@dataclass(frozen=True)
+    from export_cache import ExportCache
+    from normalization import Normalizer
+    from rollup import RollupCube
+
+
+MESES = [
+    "JANEIRO",
+    "FEVEREIRO",
+    "MARÇO",
+    "ABRIL",
+    "MAIO",
+    "JUNHO",
+    "JULHO",
+    "AGOSTO",
+    "SETEMBRO",
+    "OUTUBRO",
+    "NOVEMBRO",
+    "DEZEMBRO",
+]
+
+NO_DATE = "SEM DATA"
+
+
+@dataclass(frozen=True, slots=True)
 class RmaEntry:
     recebimento: str
     cliente: str
@@ -26,41 +55,274 @@ class RmaEntry:
     laudo_tecnico: str
 
 
-def summarize_entries(entries: Iterable[RmaEntry]) -> tuple[list[tuple[str, int]], list[tuple[str, int]]]:
+def parse_recebimento(value: str) -> date | None:
+    text = (value or "").strip()
+    if not text:
+        return None
+    for fmt in ("%d/%m/%Y", "%d/%m/%y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def month_label(recebimento: str) -> str:
+    parsed = parse_recebimento(recebimento)
+    if parsed is None:
+        return NO_DATE
+    return f"{parsed.year}-{parsed.month:02d} {MESES[parsed.month - 1]}"
+
+
+def _summary_clean(normalizer: Normalizer | None) -> Callable[[str], str]:
+    if normalizer is None:
+        return str.strip
+    from normalization import tidy
+
+    return tidy
+
+
+def _reason_key(produto: str, avaria: str) -> str:
+    if produto and avaria:
+        return f"{produto} ({avaria})"
+    return produto or avaria
+
+
+def pair_counts(
+    pairs: Counter[tuple[str, str]],
+    normalizer: Normalizer | None = None,
+) -> tuple[Counter[str], Counter[str]]:
+    relabel = None
+    if normalizer is not None:
+        produtos: Counter[str] = Counter()
+        avarias: Counter[str] = Counter()
+        for (produto, avaria), qty in pairs.items():
+            produtos[produto] += qty
+            avarias[avaria] += qty
+        produto_labels = normalizer.labels(produtos)
+        avaria_labels = normalizer.labels(avarias)
+        key = normalizer.key
+
+        def relabel(produto: str, avaria: str) -> tuple[str, str]:
+            return produto_labels.get(key(produto), ""), avaria_labels.get(key(avaria), "")
+
+    pieces: Counter[str] = Counter()
+    reasons: Counter[str] = Counter()
+    for (produto, avaria), qty in pairs.items():
+        if relabel is not None:
+            produto, avaria = relabel(produto, avaria)
+        if produto:
+            pieces[produto] += qty
+        reason_key = _reason_key(produto, avaria)
+        if reason_key:
+            reasons[reason_key] += qty
+    return pieces, reasons
+
+
+def _count_order(item: tuple[str, int]) -> tuple[int, str]:
+    return -item[1], item[0].casefold()
+
+
+def _sort_counts(counts: Counter[str]) -> list[tuple[str, int]]:
+    return sorted(counts.items(), key=_count_order)
+
+
+def top_counts(counts: Counter[str], limit: int | None, *, others_label: str = "Outros") -> list[tuple[str, int]]:
+    if limit is None or len(counts) <= limit:
+        return _sort_counts(counts)
+
+    candidates = ((name, qty) for name, qty in counts.items() if name != others_label)
+    top = heapq.nsmallest(limit, candidates, key=_count_order)
+    others = sum(counts.values()) - sum(q for _, q in top)
+    return top + [(others_label, others)]
+
+
+def summarize_entries(
+    entries: Iterable[RmaEntry],
+    *,
+    vectorized: bool | None = None,
+    normalizer: Normalizer | None = None,
+) -> tuple[list[tuple[str, int]], list[tuple[str, int]]]:
+    from vector_summary import numpy_available, summarize_entries_vectorized
+
+    if vectorized is None:
+        vectorized = numpy_available()
+    if vectorized:
+        return summarize_entries_vectorized(entries, normalizer=normalizer)
+
     pieces: Counter[str] = Counter()
     reasons: Counter[str] = Counter()
 
+    if normalizer is None:
+        for e in entries:
+            produto = (e.produto_enviado or "").strip()
+            if produto:
+                pieces[produto] += 1
+
+            reason_key = _reason_key(produto, (e.configuracao_avaria or "").strip())
+            if reason_key:
+                reasons[reason_key] += 1
+
+        return _sort_counts(pieces), _sort_counts(reasons)
+
+    from normalization import tidy
+
+    produtos: Counter[str] = Counter()
+    avarias: Counter[str] = Counter()
+    keys: Counter[tuple[str, str]] = Counter()
     for e in entries:
-        produto = (e.produto_enviado or "").strip()
+        produto = tidy(e.produto_enviado or "")
+        avaria = tidy(e.configuracao_avaria or "")
+        produtos[produto] += 1
+        avarias[avaria] += 1
+        keys[normalizer.key(produto), normalizer.key(avaria)] += 1
+
+    produto_labels = normalizer.labels(produtos)
+    avaria_labels = normalizer.labels(avarias)
+    for (produto_key, avaria_key), qty in keys.items():
+        produto = produto_labels.get(produto_key, "")
         if produto:
-            pieces[produto] += 1
+            pieces[produto] += qty
 
-        avaria = (e.configuracao_avaria or "").strip()
-        if produto and avaria:
-            reason_key = f"{produto} ({avaria})"
+        reason_key = _reason_key(produto, avaria_labels.get(avaria_key, ""))
+        if reason_key:
+            reasons[reason_key] += qty
+
+    return _sort_counts(pieces), _sort_counts(reasons)
+
+
+class IncrementalSummary:
+    def __init__(self, entries: Iterable[RmaEntry] = (), *, normalizer: Normalizer | None = None) -> None:
+        self.pairs: Counter[tuple[str, str]] = Counter()
+        self.normalizer = normalizer
+        self._clean = _summary_clean(normalizer)
+        for e in entries:
+            self.add(e)
+
+    def _pair(self, e: RmaEntry) -> tuple[str, str]:
+        return self._clean(e.produto_enviado or ""), self._clean(e.configuracao_avaria or "")
+
+    def add(self, e: RmaEntry) -> None:
+        self.pairs[self._pair(e)] += 1
+
+    def remove(self, e: RmaEntry) -> None:
+        pair = self._pair(e)
+        remaining = self.pairs[pair] - 1
+        if remaining > 0:
+            self.pairs[pair] = remaining
         else:
-            reason_key = produto or avaria
+            del self.pairs[pair]
 
-        reason_key = (reason_key or "").strip()
-        if reason_key:
-            reasons[reason_key] += 1
+    def replace(self, old: RmaEntry, new: RmaEntry) -> None:
+        self.remove(old)
+        self.add(new)
+
+    def clear(self) -> None:
+        self.pairs.clear()
 
-    pieces_sorted = sorted(pieces.items(), key=lambda x: (-x[1], x[0].casefold()))
-    reasons_sorted = sorted(reasons.items(), key=lambda x: (-x[1], x[0].casefold()))
-    return pieces_sorted, reasons_sorted
+    def merge(self, pairs: Counter[tuple[str, str]]) -> None:
+        self.pairs.update(pairs)
+
+    def counts(self) -> tuple[Counter[str], Counter[str]]:
+        return pair_counts(self.pairs, self.normalizer)
+
+    def sorted_items(self) -> tuple[list[tuple[str, int]], list[tuple[str, int]]]:
+        pieces, reasons = self.counts()
+        return _sort_counts(pieces), _sort_counts(reasons)
 
 
 def export_to_excel(
-    entries: list[RmaEntry],
+    entries: Iterable[RmaEntry],
     file_path: str | Path,
     *,
     title: str,
     periodo_mes: str,
     periodo_ano: str,
+    on_progress: Callable[[int], None] | None = None,
+    progress_every: int = 1000,
+    constant_memory: bool = False,
+    summary_top_n: int | None = None,
+    full_breakdown_sheet: bool = False,
+    summary: IncrementalSummary | None = None,
+    analysis_sheet: bool = False,
+    normalizer: Normalizer | None = None,
+    cache: ExportCache | None = None,
+    entries_digest: str | None = None,
 ) -> Path:
     path = Path(file_path)
     path.parent.mkdir(parents=True, exist_ok=True)
 
+    cache_key = None
+    if cache is not None and entries_digest is not None:
+        from export_cache import export_key
+
+        cache_key = export_key(
+            entries_digest,
+            title=title,
+            periodo_mes=periodo_mes,
+            periodo_ano=periodo_ano,
+            summary_top_n=summary_top_n,
+            full_breakdown_sheet=full_breakdown_sheet,
+            analysis_sheet=analysis_sheet,
+            normalizacao=normalizer.signature() if normalizer is not None else None,
+        )
+        with span("exportar.cache") as cache_span:
+            hit = cache.materialize(cache_key, path)
+            cache_span.set(acerto=hit)
+        if hit:
+            return path
+
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.stem}-", suffix=".xlsx", dir=path.parent)
+    os.close(fd)
+    tmp_path = Path(tmp_name)
+
+    try:
+        with span("exportar", arquivo=path.name):
+            _write_workbook(
+                entries,
+                tmp_path,
+                title=title,
+                periodo_mes=periodo_mes,
+                periodo_ano=periodo_ano,
+                on_progress=on_progress,
+                progress_every=progress_every,
+                constant_memory=constant_memory,
+                summary_top_n=summary_top_n,
+                full_breakdown_sheet=full_breakdown_sheet,
+                summary=summary,
+                analysis_sheet=analysis_sheet,
+                normalizer=normalizer,
+            )
+        if cache is not None and cache_key is not None:
+            try:
+                cache.store(cache_key, tmp_path)
+            except OSError:
+                pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    return path
+
+
+def _write_workbook(
+    entries: Iterable[RmaEntry],
+    path: Path,
+    *,
+    title: str,
+    periodo_mes: str,
+    periodo_ano: str,
+    on_progress: Callable[[int], None] | None,
+    progress_every: int,
+    constant_memory: bool,
+    summary_top_n: int | None,
+    full_breakdown_sheet: bool,
+    summary: IncrementalSummary | None,
+    analysis_sheet: bool,
+    normalizer: Normalizer | None,
+) -> None:
+
     headers = [
         "RECEBIMENTO",
         "Cliente",
@@ -78,7 +340,10 @@ def export_to_excel(
         "LAUDO TÉCNICO",
     ]
 
-    workbook = xlsxwriter.Workbook(str(path))
+    import xlsxwriter
+
+    phases = laps("exportar")
+    workbook = xlsxwriter.Workbook(str(path), {"constant_memory": constant_memory})
 
     fmt_title = workbook.add_format(
         {
@@ -145,6 +410,21 @@ def export_to_excel(
     for col, w in col_widths.items():
         ws.set_column(col, col, w)
 
+    phases.mark("cabecalho")
+
+    from vector_summary import SummaryEncoder, numpy_available
+
+    count_rows = summary is None
+    counts = summary if summary is not None else IncrementalSummary(normalizer=normalizer)
+    encoder = SummaryEncoder(clean=counts._clean) if count_rows and numpy_available() else None
+    row_counter = encoder if encoder is not None else counts
+    cube = None
+    if analysis_sheet:
+        from rollup import RollupCube
+
+        cube = RollupCube()
+    rows_written = 0
+
     for row_idx, e in enumerate(entries, start=2):
         row_values = [
             e.recebimento,
@@ -175,7 +455,24 @@ def export_to_excel(
                 use_wrap = col_idx in {11, 13}
                 ws.write(row_idx, col_idx, v, fmt_cell_wrap if use_wrap else fmt_cell)
 
-    pieces_sorted, reasons_sorted = summarize_entries(entries)
+        if count_rows:
+            row_counter.add(e)
+        if cube is not None:
+            cube.add(e)
+
+        rows_written = row_idx - 1
+        if on_progress is not None and rows_written % progress_every == 0:
+            on_progress(rows_written)
+
+    if on_progress is not None:
+        on_progress(rows_written)
+    phases.mark("linhas", linhas=rows_written)
+
+    if encoder is not None:
+        counts.merge(encoder.pairs())
+    pieces, reasons = counts.counts()
+    pieces_sorted = top_counts(pieces, summary_top_n)
+    reasons_sorted = top_counts(reasons, summary_top_n)
 
     ws2 = workbook.add_worksheet("Resumo")
     ws2.hide_gridlines(2)
@@ -257,16 +554,23 @@ def export_to_excel(
         "#C9C9C9",
     ]
 
+    reason_formats: dict[str, tuple[xlsxwriter.format.Format, xlsxwriter.format.Format]] = {}
+
     for i, (name, qty) in enumerate(reasons_sorted, start=1):
         color = palette[(i - 1) % len(palette)]
-        fmt_reason = workbook.add_format({"border": 1, "bg_color": color})
-        fmt_reason_qty = workbook.add_format({"border": 1, "bg_color": color, "align": "center"})
+        if color not in reason_formats:
+            reason_formats[color] = (
+                workbook.add_format({"border": 1, "bg_color": color}),
+                workbook.add_format({"border": 1, "bg_color": color, "align": "center"}),
+            )
+        fmt_reason, fmt_reason_qty = reason_formats[color]
         ws2.write(reasons_start_row + i, 0, name, fmt_reason)
         ws2.write(reasons_start_row + i, 1, qty, fmt_reason_qty)
 
     reasons_total_row = reasons_start_row + len(reasons_sorted) + 1
     ws2.write(reasons_total_row, 0, "TOTAL", fmt_total_label)
     ws2.write(reasons_total_row, 1, sum(q for _, q in reasons_sorted), fmt_total_qty)
+    phases.mark("resumo")
 
     if pieces_sorted:
         chart = workbook.add_chart({"type": "doughnut"})
@@ -288,6 +592,103 @@ def export_to_excel(
         chart.set_chartarea({"border": {"none": True}})
 
         ws2.insert_chart(1, 3, chart, {"x_scale": 1.4, "y_scale": 1.4})
+    phases.mark("grafico")
+
+    if full_breakdown_sheet:
+        ws3 = workbook.add_worksheet("Detalhamento")
+        ws3.hide_gridlines(2)
+        ws3.set_column(0, 0, 44)
+        ws3.set_column(1, 1, 14)
+
+        row = 0
+        for header, items in (("PEÇAS DEFEITUOSAS", _sort_counts(pieces)), ("MOTIVOS DEFEITUOSOS", _sort_counts(reasons))):
+            ws3.write(row, 0, header, fmt_table_header)
+            ws3.write(row, 1, "QUANTIDADE", fmt_table_header_qty)
+            for name, qty in items:
+                row += 1
+                ws3.write(row, 0, name, fmt_table_cell)
+                ws3.write(row, 1, qty, fmt_table_cell_center)
+            row += 1
+            ws3.write(row, 0, "TOTAL", fmt_total_label)
+            ws3.write(row, 1, sum(q for _, q in items), fmt_total_qty)
+            row += 3
+        phases.mark("detalhamento")
+
+    if cube is not None:
+        _write_analysis_sheet(
+            workbook,
+            cube,
+            fmt_header=fmt_table_header,
+            fmt_header_qty=fmt_table_header_qty,
+            fmt_cell=fmt_table_cell,
+            fmt_cell_center=fmt_table_cell_center,
+            fmt_total_label=fmt_total_label,
+            fmt_total_qty=fmt_total_qty,
+        )
+        phases.mark("analise")
 
     workbook.close()
-    return path
+    phases.mark("fechar")
+
+
+def _write_analysis_sheet(
+    workbook: xlsxwriter.Workbook,
+    cube: RollupCube,
+    *,
+    fmt_header: xlsxwriter.format.Format,
+    fmt_header_qty: xlsxwriter.format.Format,
+    fmt_cell: xlsxwriter.format.Format,
+    fmt_cell_center: xlsxwriter.format.Format,
+    fmt_total_label: xlsxwriter.format.Format,
+    fmt_total_qty: xlsxwriter.format.Format,
+) -> None:
+    from rollup import DIMENSION_LABELS
+
+    ws = workbook.add_worksheet("Análise")
+    ws.hide_gridlines(2)
+    ws.set_column(0, 0, 36)
+    ws.set_column(1, 2, 12)
+    fmt_pct = workbook.add_format({"border": 1, "bg_color": "#D9D9D9", "align": "center", "num_format": "0.0%"})
+
+    row = 0
+    total = cube.total
+    for dim in ("mes", "cliente", "plataforma", "status"):
+        ws.write(row, 0, DIMENSION_LABELS[dim].upper(), fmt_header)
+        ws.write(row, 1, "QUANTIDADE", fmt_header_qty)
+        ws.write(row, 2, "%", fmt_header)
+        items = cube.query([dim])
+        if dim == "mes":
+            items.sort(key=lambda item: item[0])
+        for (value,), qty in items:
+            row += 1
+            ws.write(row, 0, value, fmt_cell)
+            ws.write(row, 1, qty, fmt_cell_center)
+            ws.write(row, 2, qty / total if total else 0, fmt_pct)
+        row += 1
+        ws.write(row, 0, "TOTAL", fmt_total_label)
+        ws.write(row, 1, total, fmt_total_qty)
+        row += 3
+
+    statuses = [value for (value,), _qty in cube.query(["status"])]
+    months = sorted(value for (value,), _qty in cube.query(["mes"]))
+    if not statuses or not months:
+        return
+
+    ws.write(row, 0, "MÊS x STATUS", fmt_header)
+    for col, status in enumerate(statuses, start=1):
+        ws.write(row, col, status, fmt_header)
+    ws.write(row, len(statuses) + 1, "TOTAL", fmt_total_label)
+    if len(statuses) + 1 >= 3:
+        ws.set_column(3, len(statuses) + 1, 14)
+
+    by_month: dict[str, dict[str, int]] = {month: {} for month in months}
+    for (month, status), qty in cube.query(["mes", "status"]):
+        by_month[month][status] = qty
+
+    for month in months:
+        row += 1
+        ws.write(row, 0, month, fmt_cell)
+        counts = by_month[month]
+        for col, status in enumerate(statuses, start=1):
+            ws.write(row, col, counts.get(status, 0), fmt_cell_center)
+        ws.write(row, len(statuses) + 1, sum(counts.values()), fmt_total_qty)
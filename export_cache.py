@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+from operator import attrgetter
+from pathlib import Path
+from typing import Any, Iterable
+
+from entry_store import ENTRY_FIELDS
+
+DEFAULT_CACHE_DIR = Path.home() / ".gerador_rma" / "cache_exportacao"
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+_CACHE_VERSION = b"1"
+_CACHE_GLOB = "[0-9a-f]*.xlsx"
+_all_fields = attrgetter(*ENTRY_FIELDS)
+
+
+def row_digest(entry: Any) -> bytes:
+    return hashlib.blake2b("\x1f".join(_all_fields(entry)).encode("utf-8"), digest_size=16).digest()
+
+
+def entries_digest(row_digests: Iterable[bytes]) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    for digest in row_digests:
+        h.update(digest)
+    return h.hexdigest()
+
+
+def export_key(entries_hex: str, **params: Any) -> str:
+    h = hashlib.blake2b(_CACHE_VERSION, digest_size=20)
+    h.update(entries_hex.encode("ascii"))
+    for name in sorted(params):
+        h.update(f"\x1e{name}\x1f{params[name]!r}".encode("utf-8"))
+    return h.hexdigest()
+
+
+class ExportCache:
+    def __init__(
+        self,
+        directory: str | Path = DEFAULT_CACHE_DIR,
+        *,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        link: bool = False,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.link = link
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.xlsx"
+
+    def lookup(self, key: str) -> Path | None:
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def materialize(self, key: str, destination: Path) -> bool:
+        cached = self.lookup(key)
+        if cached is None:
+            return False
+
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{destination.stem}-", suffix=".xlsx", dir=destination.parent)
+        os.close(fd)
+        tmp_path = Path(tmp_name)
+        try:
+            if self.link:
+                tmp_path.unlink()
+                try:
+                    os.link(cached, tmp_path)
+                except OSError:
+                    shutil.copyfile(cached, tmp_path)
+            else:
+                shutil.copyfile(cached, tmp_path)
+            os.replace(tmp_path, destination)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return True
+
+    def store(self, key: str, source: Path) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=".cache-", suffix=".xlsx", dir=self.directory)
+        os.close(fd)
+        tmp_path = Path(tmp_name)
+        try:
+            shutil.copyfile(source, tmp_path)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        files = []
+        for path in self.directory.glob(_CACHE_GLOB):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _mtime, size, _path in files)
+        for _mtime, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        for path in self.directory.glob(_CACHE_GLOB):
+            path.unlink(missing_ok=True)
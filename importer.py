@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import csv
+import io
+import re
+from pathlib import Path
+from typing import Callable, Iterator, Sequence
+
+from excel_exporter import RmaEntry
+from tracing import laps, span
+
+
+class WorkbookImportError(Exception):
+    pass
+
+
+def _safe(val: object) -> str:
+    return str(val).strip() if val is not None else ""
+
+
+def row_to_entry(row: Sequence[object] | None) -> RmaEntry | None:
+    if not row or all(cell is None or str(cell).strip() == "" for cell in row):
+        return None
+
+    cells = [_safe(v) for v in row[:14]]
+    if len(cells) < 14:
+        cells.extend([""] * (14 - len(cells)))
+
+    return RmaEntry(*cells)
+
+
+def text_row_to_entry(row: Sequence[str]) -> RmaEntry | None:
+    cells = [cell.strip() for cell in row[:14]]
+    if not any(cells):
+        return None
+    if len(cells) < 14:
+        cells.extend([""] * (14 - len(cells)))
+    return RmaEntry(*cells)
+
+
+def iter_workbook_entries(
+    file_path: str | Path,
+    *,
+    chunk_size: int = 2000,
+    on_progress: Callable[[int, int | None], None] | None = None,
+) -> Iterator[list[RmaEntry]]:
+    import openpyxl
+
+    try:
+        with span("importar.abrir"):
+            wb = openpyxl.load_workbook(str(file_path), read_only=True, data_only=True)
+    except Exception as e:
+        raise WorkbookImportError(f"Erro ao abrir o arquivo:\n{e}") from e
+
+    try:
+        if "RMA" not in wb.sheetnames:
+            raise WorkbookImportError("A planilha não contém a aba 'RMA'.")
+
+        ws = wb["RMA"]
+        total_rows = ws.max_row - 2 if ws.max_row else None
+
+        phases = laps("importar")
+        batch: list[RmaEntry] = []
+        rows_read = 0
+        for row in ws.iter_rows(min_row=3, max_col=14, values_only=True):
+            rows_read += 1
+            entry = row_to_entry(row)
+            if entry is not None:
+                batch.append(entry)
+            if len(batch) >= chunk_size:
+                yield batch
+                batch = []
+                if on_progress is not None:
+                    on_progress(rows_read, total_rows)
+
+        if batch:
+            yield batch
+        if on_progress is not None:
+            on_progress(rows_read, total_rows)
+        phases.mark("linhas", linhas=rows_read)
+    finally:
+        wb.close()
+
+
+def iter_delimited_entries(
+    file_path: str | Path,
+    *,
+    delimiter: str | None = None,
+    encoding: str = "utf-8-sig",
+) -> Iterator[RmaEntry]:
+    path = Path(file_path)
+
+    with path.open("r", encoding=encoding, newline="") as fh:
+        if delimiter is None:
+            sample = fh.readline()
+            fh.seek(0)
+            if path.suffix.lower() == ".tsv" or "\t" in sample:
+                delimiter = "\t"
+            elif sample.count(";") > sample.count(","):
+                delimiter = ";"
+            else:
+                delimiter = ","
+
+        for line_no, row in enumerate(csv.reader(fh, delimiter=delimiter)):
+            if line_no == 0 and row and row[0].strip().upper() == "RECEBIMENTO":
+                continue
+            entry = text_row_to_entry(row)
+            if entry is not None:
+                yield entry
+
+
+def iter_file_entries(file_path: str | Path) -> Iterator[RmaEntry]:
+    if Path(file_path).suffix.lower() in {".xlsx", ".xlsm"}:
+        for batch in iter_workbook_entries(file_path):
+            yield from batch
+    else:
+        yield from iter_delimited_entries(file_path)
+
+
+PASTE_SPACES = "  "
+_SPACES_RE = re.compile(r"\s{2,}")
+
+
+def detect_paste_delimiter(text: str, *, sample_lines: int = 20) -> str:
+    sample = text[:65536].splitlines()[:sample_lines]
+    if any("\t" in line for line in sample):
+        return "\t"
+    return PASTE_SPACES
+
+
+def iter_paste_rows(text: str, delimiter: str) -> Iterator[list[str]]:
+    if delimiter == PASTE_SPACES:
+        for line in text.splitlines():
+            line = line.strip()
+            if line:
+                yield _SPACES_RE.split(line)
+        return
+
+    if '"' not in text:
+        for line in text.split("\n"):
+            yield line.rstrip("\r").split(delimiter)
+        return
+
+    yield from csv.reader(io.StringIO(text, newline=""), delimiter=delimiter)
+
+
+def iter_pasted_entries(
+    text: str,
+    *,
+    delimiter: str | None = None,
+    chunk_size: int = 5000,
+) -> Iterator[list[RmaEntry]]:
+    if delimiter is None:
+        delimiter = detect_paste_delimiter(text)
+
+    batch: list[RmaEntry] = []
+    for line_no, row in enumerate(iter_paste_rows(text, delimiter)):
+        if line_no == 0 and row and row[0].strip().upper() == "RECEBIMENTO":
+            continue
+        entry = text_row_to_entry(row)
+        if entry is None:
+            continue
+        batch.append(entry)
+        if len(batch) >= chunk_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
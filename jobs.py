@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Any, Callable
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobContext:
+    def __init__(self, messages: queue.Queue[tuple[str, Any]], cancel_event: threading.Event) -> None:
+        self._messages = messages
+        self._cancel_event = cancel_event
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self) -> None:
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    def progress(self, done: int, total: int | None = None) -> None:
+        self._put(("progress", (done, total)))
+
+    def emit(self, payload: Any) -> None:
+        self._put(("data", payload))
+
+    def _put(self, message: tuple[str, Any]) -> None:
+        while True:
+            self.check_cancelled()
+            try:
+                self._messages.put(message, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+
+class BackgroundJob:
+    def __init__(self, target: Callable[[JobContext], Any], *, max_pending: int = 16) -> None:
+        self._target = target
+        self._messages: queue.Queue[tuple[str, Any]] = queue.Queue(maxsize=max_pending)
+        self._cancel_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self.finished = False
+
+    def start(self) -> BackgroundJob:
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def poll(self, max_messages: int = 64) -> list[tuple[str, Any]]:
+        out: list[tuple[str, Any]] = []
+        for _ in range(max_messages):
+            try:
+                message = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] in {"done", "error", "cancelled"}:
+                self.finished = True
+            out.append(message)
+        return out
+
+    def _run(self) -> None:
+        ctx = JobContext(self._messages, self._cancel_event)
+        try:
+            result = self._target(ctx)
+        except JobCancelled:
+            self._messages.put(("cancelled", None))
+        except Exception as e:
+            self._messages.put(("error", e))
+        else:
+            self._messages.put(("done", result))
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Mapping
+
+DEFAULT_ALIAS_PATH = Path.home() / ".gerador_rma" / "apelidos.json"
+DEFAULT_CACHE_SIZE = 65_536
+
+_SPACES = re.compile(r"\s+")
+_UNIT_GAP = re.compile(r"(?<=\d) (?=[a-z])")
+
+
+def fold(value: str) -> str:
+    text = unicodedata.normalize("NFKD", value)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = _SPACES.sub(" ", text.casefold()).strip()
+    return _UNIT_GAP.sub("", text)
+
+
+def tidy(value: str) -> str:
+    return _SPACES.sub(" ", value).strip()
+
+
+@dataclass(frozen=True)
+class NormalizerStats:
+    hits: int
+    misses: int
+    size: int
+    max_size: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def describe(self) -> str:
+        return (
+            f"{self.hits} acerto(s), {self.misses} falha(s) ({self.hit_rate:.0%}), "
+            f"{self.size}/{self.max_size} grafia(s) em cache"
+        )
+
+
+class Normalizer:
+    def __init__(self, aliases: Mapping[str, str] | None = None, *, max_size: int = DEFAULT_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self._set_aliases(aliases or {})
+        self.key = lru_cache(maxsize=max_size)(self._key)
+
+    @property
+    def aliases(self) -> dict[str, str]:
+        return dict(self._aliases)
+
+    def set_aliases(self, aliases: Mapping[str, str]) -> None:
+        self._set_aliases(aliases)
+        self.key.cache_clear()
+
+    def labels(self, spellings: Mapping[str, int]) -> dict[str, str]:
+        best: dict[str, tuple[int, str, str]] = {}
+        for spelling, qty in spellings.items():
+            key = self.key(spelling)
+            if not key:
+                continue
+            rank = (-qty, spelling.casefold(), spelling)
+            current = best.get(key)
+            if current is None or rank < current:
+                best[key] = rank
+        return {key: self._alias_labels.get(key, rank[2]) for key, rank in best.items()}
+
+    def copy(self) -> Normalizer:
+        clone = Normalizer.__new__(Normalizer)
+        clone.__setstate__(self.__getstate__())
+        return clone
+
+    def signature(self) -> str:
+        payload = json.dumps(sorted(self._aliases.items()), ensure_ascii=False)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+    def stats(self) -> NormalizerStats:
+        info = self.key.cache_info()
+        return NormalizerStats(info.hits, info.misses, info.currsize, self.max_size)
+
+    def _set_aliases(self, aliases: Mapping[str, str]) -> None:
+        self._aliases = {tidy(variant): tidy(target) for variant, target in aliases.items() if tidy(target)}
+        self._alias_keys: dict[str, str] = {}
+        for variant, target in self._aliases.items():
+            self._alias_keys[fold(variant)] = fold(target)
+            self._alias_keys.setdefault(fold(target), fold(target))
+        self._alias_labels = {fold(target): target for target in self._aliases.values()}
+
+    def _key(self, value: str) -> str:
+        key = fold(value)
+        return self._alias_keys.get(key, key)
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"aliases": self._aliases, "max_size": self.max_size}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(state["aliases"], max_size=state["max_size"])
+
+
+def load_aliases(path: str | Path = DEFAULT_ALIAS_PATH) -> dict[str, str]:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            raw = json.load(fh)
+    except FileNotFoundError:
+        return {}
+    if not isinstance(raw, dict):
+        raise ValueError(f"{path}: esperado um objeto {{\"nome padrão\": [\"variante\", ...]}}")
+
+    aliases: dict[str, str] = {}
+    for target, variants in raw.items():
+        for variant in [variants] if isinstance(variants, str) else variants:
+            aliases[variant] = target
+    return aliases
+
+
+def save_aliases(aliases: Mapping[str, str], path: str | Path = DEFAULT_ALIAS_PATH) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    grouped: dict[str, list[str]] = {}
+    for variant, target in sorted(aliases.items(), key=lambda item: (item[1].casefold(), item[0].casefold())):
+        grouped.setdefault(target, []).append(variant)
+
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.stem}-", suffix=".json", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(grouped, fh, ensure_ascii=False, indent=2)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return path
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Sequence
+
+from entry_store import ENTRY_FIELDS
+from importer import PASTE_SPACES, iter_pasted_entries
+
+DELIMITER_LABELS = {
+    "\t": "Tabulação",
+    PASTE_SPACES: "Dois ou mais espaços",
+    ";": "Ponto e vírgula",
+}
+
+
+class PastePreviewDialog(tk.Toplevel):
+    def __init__(
+        self,
+        master: tk.Misc,
+        text: str,
+        delimiter: str,
+        columns: Sequence[str],
+        *,
+        preview_rows: int = 8,
+    ) -> None:
+        super().__init__(master)
+
+        self.title("Colar Dados")
+        self.transient(master)
+
+        self.text = text
+        self.preview_rows = preview_rows
+        self.result: str | None = None
+        self._labels = {label: value for value, label in DELIMITER_LABELS.items()}
+        self.delimiter_var = tk.StringVar(value=DELIMITER_LABELS.get(delimiter, DELIMITER_LABELS["\t"]))
+
+        frame = ttk.Frame(self, padding=12)
+        frame.pack(fill="both", expand=True)
+        frame.columnconfigure(0, weight=1)
+        frame.rowconfigure(1, weight=1)
+
+        top = ttk.Frame(frame)
+        top.grid(row=0, column=0, sticky="ew", pady=(0, 6))
+        ttk.Label(top, text="Separador").grid(row=0, column=0, sticky="w", padx=(0, 6))
+        combo = ttk.Combobox(
+            top,
+            values=list(DELIMITER_LABELS.values()),
+            textvariable=self.delimiter_var,
+            state="readonly",
+            width=22,
+        )
+        combo.grid(row=0, column=1, sticky="w")
+        combo.bind("<<ComboboxSelected>>", lambda _evt: self._render_preview())
+        ttk.Label(top, text=f"{len(text.splitlines())} linha(s) na área de transferência").grid(
+            row=0, column=2, sticky="w", padx=(12, 0)
+        )
+
+        self.tree = ttk.Treeview(frame, columns=list(columns), show="headings", height=preview_rows)
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=110, anchor="w", stretch=False)
+        self.tree.grid(row=1, column=0, sticky="nsew")
+
+        xscroll = ttk.Scrollbar(frame, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=xscroll.set)
+        xscroll.grid(row=2, column=0, sticky="ew")
+
+        buttons = ttk.Frame(frame)
+        buttons.grid(row=3, column=0, sticky="e", pady=(10, 0))
+        ttk.Button(buttons, text="Importar", command=self._on_ok).grid(row=0, column=0, padx=4)
+        ttk.Button(buttons, text="Cancelar", command=self.destroy).grid(row=0, column=1, padx=4)
+
+        self.bind("<Return>", lambda _evt: self._on_ok())
+        self.bind("<Escape>", lambda _evt: self.destroy())
+
+        self._render_preview()
+        self.grab_set()
+
+    def _delimiter(self) -> str:
+        return self._labels.get(self.delimiter_var.get(), "\t")
+
+    def _render_preview(self) -> None:
+        self.tree.delete(*self.tree.get_children())
+        batch = next(iter_pasted_entries(self.text, delimiter=self._delimiter(), chunk_size=self.preview_rows), [])
+        for entry in batch:
+            self.tree.insert("", "end", values=[getattr(entry, name) for name in ENTRY_FIELDS])
+
+    def _on_ok(self) -> None:
+        self.result = self._delimiter()
+        self.destroy()
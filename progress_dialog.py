@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable
+
+
+class ProgressDialog(tk.Toplevel):
+    def __init__(self, master: tk.Misc, title: str, on_cancel: Callable[[], None]) -> None:
+        super().__init__(master)
+
+        self.title(title)
+        self.resizable(False, False)
+        self.transient(master)
+        self.protocol("WM_DELETE_WINDOW", on_cancel)
+
+        self.status_var = tk.StringVar(value="Iniciando...")
+
+        frame = ttk.Frame(self, padding=12)
+        frame.pack(fill="both", expand=True)
+
+        ttk.Label(frame, textvariable=self.status_var, width=48).grid(row=0, column=0, sticky="w", pady=(0, 6))
+
+        self.progressbar = ttk.Progressbar(frame, mode="indeterminate", length=320)
+        self.progressbar.grid(row=1, column=0, sticky="ew", pady=(0, 10))
+        self.progressbar.start(15)
+
+        self.cancel_button = ttk.Button(frame, text="Cancelar", command=on_cancel)
+        self.cancel_button.grid(row=2, column=0, sticky="e")
+
+    def update_progress(self, done: int, total: int | None, unit: str = "linha(s)") -> None:
+        if total:
+            if str(self.progressbar.cget("mode")) != "determinate":
+                self.progressbar.stop()
+                self.progressbar.configure(mode="determinate", maximum=total)
+            self.progressbar.configure(value=min(done, total))
+            self.status_var.set(f"{done} de {total} {unit}")
+        else:
+            self.status_var.set(f"{done} {unit}")
+
+    def set_cancelling(self) -> None:
+        self.status_var.set("Cancelando...")
+        self.cancel_button.configure(state="disabled")
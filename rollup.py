@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+from collections import Counter
+from operator import itemgetter
+from typing import Callable, Iterable, Mapping, Sequence
+
+from excel_exporter import RmaEntry, month_label
+from normalization import Normalizer, tidy
+
+DIMENSIONS = ("mes", "cliente", "plataforma", "status", "produto", "avaria")
+
+DIMENSION_LABELS = {
+    "mes": "Mês",
+    "cliente": "Cliente",
+    "plataforma": "Plataforma",
+    "status": "Status",
+    "produto": "Produto enviado",
+    "avaria": "Configuração/Avaria",
+}
+
+EMPTY_VALUE = "(vazio)"
+
+Cell = tuple[str, ...]
+ViewShape = tuple[tuple[int, ...], tuple[int, ...]]
+Projection = Callable[[Cell], Cell]
+
+_NORMALIZED = (DIMENSIONS.index("produto"), DIMENSIONS.index("avaria"))
+
+
+class RollupCube:
+    def __init__(
+        self,
+        entries: Iterable[RmaEntry] = (),
+        *,
+        max_views: int = 64,
+        normalizer: Normalizer | None = None,
+    ) -> None:
+        self.total = 0
+        self.max_views = max_views
+        self.normalizer = normalizer
+        self._cells: Counter[Cell] = Counter()
+        self._views: dict[ViewShape, dict[Cell, Counter[Cell]]] = {}
+        self._projections: dict[ViewShape, tuple[Projection, Projection]] = {}
+        self._months: dict[str, str] = {}
+        self._spellings: dict[int, Counter[str]] = {pos: Counter() for pos in _NORMALIZED}
+        for e in entries:
+            self.add(e)
+
+    def cell_of(self, e: RmaEntry) -> Cell:
+        recebimento = e.recebimento.strip()
+        month = self._months.get(recebimento)
+        if month is None:
+            month = self._months[recebimento] = month_label(recebimento)
+        produto = e.produto_enviado.strip()
+        avaria = e.configuracao_avaria.strip()
+        if self.normalizer is not None:
+            produto = self.normalizer.key(produto)
+            avaria = self.normalizer.key(avaria)
+        return (
+            month,
+            e.cliente.strip() or EMPTY_VALUE,
+            e.plataforma.strip() or EMPTY_VALUE,
+            e.status.strip() or EMPTY_VALUE,
+            produto or EMPTY_VALUE,
+            avaria or EMPTY_VALUE,
+        )
+
+    def add(self, e: RmaEntry) -> None:
+        self._count_spellings(e, 1)
+        self._apply(self.cell_of(e), 1)
+
+    def remove(self, e: RmaEntry) -> None:
+        self._count_spellings(e, -1)
+        self._apply(self.cell_of(e), -1)
+
+    def replace(self, old: RmaEntry, new: RmaEntry) -> None:
+        self.remove(old)
+        self.add(new)
+
+    def clear(self) -> None:
+        self.total = 0
+        self._cells.clear()
+        self._views.clear()
+        self._projections.clear()
+        for spellings in self._spellings.values():
+            spellings.clear()
+
+    def rebuild(self, entries: Iterable[RmaEntry], *, normalizer: Normalizer | None = None) -> None:
+        self.clear()
+        self.normalizer = normalizer
+        for e in entries:
+            self.add(e)
+
+    def _count_spellings(self, e: RmaEntry, delta: int) -> None:
+        if self.normalizer is None:
+            return
+        for pos, value in zip(_NORMALIZED, (e.produto_enviado, e.configuracao_avaria)):
+            spelling = tidy(value)
+            if spelling:
+                _bump(self._spellings[pos], spelling, delta)
+
+    def _apply(self, cell: Cell, delta: int) -> None:
+        self.total += delta
+        _bump(self._cells, cell, delta)
+        for shape, view in self._views.items():
+            group_of, filter_of = self._projections[shape]
+            _bump_view(view, filter_of(cell), group_of(cell), delta)
+
+    def _view(self, shape: ViewShape) -> dict[Cell, Counter[Cell]]:
+        view = self._views.get(shape)
+        if view is None:
+            if len(self._views) >= self.max_views:
+                oldest = next(iter(self._views))
+                del self._views[oldest]
+                del self._projections[oldest]
+            group_of, filter_of = _projection(shape[0]), _projection(shape[1])
+            view = {}
+            for cell, count in self._cells.items():
+                key = filter_of(cell)
+                groups = view.get(key)
+                if groups is None:
+                    groups = view[key] = Counter()
+                groups[group_of(cell)] += count
+            self._views[shape] = view
+            self._projections[shape] = (group_of, filter_of)
+        return view
+
+    def query(
+        self,
+        group_by: Sequence[str],
+        filters: Mapping[str, str] | None = None,
+    ) -> list[tuple[Cell, int]]:
+        group_positions = tuple(DIMENSIONS.index(d) for d in group_by)
+        filter_items = sorted(
+            (pos, self._filter_value(pos, value))
+            for pos, value in ((DIMENSIONS.index(d), value) for d, value in (filters or {}).items())
+        )
+        shape = (group_positions, tuple(p for p, _value in filter_items))
+
+        groups = self._view(shape).get(tuple(value for _p, value in filter_items))
+        if not groups:
+            return []
+        relabeled = self._labels(group_positions)
+        if relabeled:
+            labeled: Counter[Cell] = Counter()
+            for cell, count in groups.items():
+                labeled[tuple(relabeled[i].get(v, v) if i in relabeled else v for i, v in enumerate(cell))] += count
+            groups = labeled
+        return sorted(groups.items(), key=lambda item: (-item[1], item[0]))
+
+    def values(self, dimension: str) -> list[str]:
+        return sorted(cell[0] for cell, _count in self.query([dimension]))
+
+    def _filter_value(self, pos: int, value: str) -> str:
+        if self.normalizer is None or pos not in _NORMALIZED or value == EMPTY_VALUE:
+            return value
+        return self.normalizer.key(value) or EMPTY_VALUE
+
+    def _labels(self, group_positions: tuple[int, ...]) -> dict[int, dict[str, str]]:
+        if self.normalizer is None:
+            return {}
+        return {
+            i: self.normalizer.labels(self._spellings[pos])
+            for i, pos in enumerate(group_positions)
+            if pos in _NORMALIZED
+        }
+
+
+def _bump(counter: Counter[Cell], key: Cell, delta: int) -> None:
+    value = counter[key] + delta
+    if value > 0:
+        counter[key] = value
+    else:
+        del counter[key]
+
+
+def _projection(positions: tuple[int, ...]) -> Projection:
+    if not positions:
+        return lambda cell: ()
+    if len(positions) == 1:
+        (pos,) = positions
+        return lambda cell: (cell[pos],)
+    return itemgetter(*positions)
+
+
+def _bump_view(view: dict[Cell, Counter[Cell]], key: Cell, group: Cell, delta: int) -> None:
+    groups = view.get(key)
+    if groups is None:
+        groups = view[key] = Counter()
+    _bump(groups, group, delta)
+    if not groups:
+        del view[key]
@@ -0,0 +1,390 @@
+from __future__ import annotations
+
+import re
+import time
+from array import array
+from collections import defaultdict, deque
+from itertools import compress
+from operator import attrgetter
+from typing import Any, Callable, Collection, Container, Iterable, Iterator, Sequence
+
+from vector_summary import numpy_available
+
+FOLD_MIN = 1024
+VECTOR_BITSET_MIN = 256
+SEARCH_BUDGET = 0.02
+
+_WORD = re.compile(r"\w+")
+_FLAGS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def _short_grams(text: str) -> set[str]:
+    return {text[i : i + n] for n in (1, 2, 3) for i in range(len(text) - n + 1)}
+
+
+def _lookup_grams(needle: str) -> set[str]:
+    return {needle} if len(needle) <= 3 else {needle[i : i + 3] for i in range(len(needle) - 2)}
+
+
+def _phrases(text: str) -> list[str]:
+    return text.replace(". ", ". \x00").replace("\n", "\n\x00").split("\x00")
+
+
+def _new_docs() -> array:
+    return array("I")
+
+
+def _bitset(docs: array) -> int:
+    if len(docs) >= VECTOR_BITSET_MIN and numpy_available():
+        import numpy as np
+
+        positions = np.frombuffer(docs, dtype=np.uint32)
+        flags = np.zeros(int(positions.max()) + 1, dtype=bool)
+        flags[positions] = True
+        return int.from_bytes(np.packbits(flags, bitorder="little").tobytes(), "little")
+
+    buf = bytearray((max(docs) >> 3) + 1)
+    for doc in docs:
+        buf[doc >> 3] |= 1 << (doc & 7)
+    return int.from_bytes(buf, "little")
+
+
+def _flags(bits: int, size: int) -> bytes:
+    return bin(bits)[:1:-1].encode().translate(_FLAGS).ljust(size, b"\x00")
+
+
+def _fields(columns: Sequence[str], cols: Sequence[int]) -> Callable[[Any], tuple[str, ...]]:
+    names = [columns[i] for i in cols]
+    if len(names) == 1:
+        name = names[0]
+        return lambda entry: (getattr(entry, name),)
+    if not names:
+        return lambda entry: ()
+    return attrgetter(*names)
+
+
+class _Posting:
+    __slots__ = ("bits", "docs")
+
+    def __init__(self) -> None:
+        self.bits = 0
+        self.docs = array("I")
+
+    def add(self, doc: int) -> None:
+        docs = self.docs
+        docs.append(doc)
+        if len(docs) >= FOLD_MIN and len(docs) * 32 >= doc:
+            self.fold()
+
+    def fold_dense(self, size: int) -> None:
+        if len(self.docs) >= FOLD_MIN and len(self.docs) * 32 >= size:
+            self.fold()
+
+    def fold(self) -> int:
+        if self.docs:
+            self.bits |= _bitset(self.docs)
+            self.docs = array("I")
+        return self.bits
+
+    def value(self) -> int:
+        if self.bits:
+            return self.fold()
+        return _bitset(self.docs) if self.docs else 0
+
+
+def _union(postings: Iterable[_Posting]) -> int:
+    bits = 0
+    sparse = array("I")
+    for posting in postings:
+        if posting.bits:
+            bits |= posting.fold()
+        else:
+            sparse.extend(posting.docs)
+    if sparse:
+        bits |= _bitset(sparse)
+    return bits
+
+
+class Matches:
+    def __init__(self, bits: int, rows: array, doc_of: array) -> None:
+        self._bits = bits
+        self._rows = rows
+        self._doc_of = doc_of
+        self._marks: bytes | None = None
+
+    def __len__(self) -> int:
+        return self._bits.bit_count()
+
+    def __iter__(self) -> Iterator[int]:
+        return compress(self._rows, self._flags()[1:])
+
+    def __contains__(self, row_id: object) -> bool:
+        if not isinstance(row_id, int) or not 0 <= row_id < len(self._doc_of):
+            return False
+        return bool(self._flags()[self._doc_of[row_id]])
+
+    def select(self, row_ids: Iterable[int]) -> list[int]:
+        row_ids = list(row_ids)
+        doc_of = self._doc_of
+        if row_ids and max(row_ids) >= len(doc_of):
+            return [row_id for row_id in row_ids if row_id in self]
+        return list(compress(row_ids, map(self._flags().__getitem__, map(doc_of.__getitem__, row_ids))))
+
+    def _flags(self) -> bytes:
+        if self._marks is None:
+            self._marks = b"\x00" + _flags(self._bits, len(self._rows))
+        return self._marks
+
+
+class SearchIndex:
+    def __init__(
+        self,
+        columns: Sequence[str],
+        categorical: Collection[str],
+        *,
+        tokenized: Collection[str] = (),
+        alive: Container[int],
+        current: Callable[[int], Any],
+        text_of: Callable[[int], str],
+        text_sep: str = "\x1f",
+    ) -> None:
+        self.columns = list(columns)
+        self._categorical_cols = [i for i, c in enumerate(self.columns) if c in categorical]
+        self._text_cols = [i for i, c in enumerate(self.columns) if c not in categorical]
+        self._word_cols = [i for i in self._text_cols if self.columns[i] in tokenized]
+        self._scan_cols = [i for i in self._text_cols if i not in self._word_cols]
+        self._get_categorical = _fields(self.columns, self._categorical_cols)
+        self._get_words = _fields(self.columns, self._word_cols)
+        self._get_scanned = _fields(self.columns, self._scan_cols)
+
+        self._alive = alive
+        self._current = current
+        self._text_of = text_of
+        self._text_sep = text_sep
+
+        self.clear()
+
+    def clear(self) -> None:
+        self._value_rows: list[dict[str, _Posting]] = [defaultdict(_Posting) for _ in self.columns]
+        self._value_grams: dict[str, set[tuple[int, str]]] = defaultdict(set)
+        self._chars: dict[int, list[dict[str, _Posting]]] = {col: [] for col in self._scan_cols}
+        self._phrase_ids: dict[tuple[int, str], int] = {}
+        self._phrase_text: list[str] = []
+        self._phrase_col = array("B")
+        self._phrase_rows: list[_Posting] = []
+        self._pairs: dict[int, _Posting] = defaultdict(_Posting)
+        self._word_phrases: dict[str, array] = defaultdict(_new_docs)
+        self._word_grams: dict[str, set[str]] = defaultdict(set)
+        self._rows = array("I")
+        self._doc_of = array("I")
+        self._dead = 0
+        self._dead_docs = array("I")
+        self._dead_count = 0
+        self._pending: deque[int] = deque()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def needs_rebuild(self) -> bool:
+        return self._dead_count > max(10_000, len(self._rows) - self._dead_count)
+
+    def enqueue(self, row_ids: Iterable[int]) -> None:
+        row_ids = list(row_ids)
+        if row_ids:
+            self._reserve(max(row_ids))
+            self._pending.extend(row_ids)
+
+    def index_pending(self, limit: int | None = None, *, budget: float | None = None) -> int:
+        deadline = time.perf_counter() + budget if budget is not None else None
+        done = 0
+        while self._pending and (limit is None or done < limit):
+            row_id = self._pending.popleft()
+            if row_id in self._alive:
+                self._retire(row_id)
+                self._add(row_id, self._current(row_id))
+                if not len(self._rows) % FOLD_MIN:
+                    self._fold_dense()
+            done += 1
+            if deadline is not None and not done % 64 and time.perf_counter() >= deadline:
+                break
+        return len(self._pending)
+
+    def rebuild(self, row_ids: Iterable[int]) -> None:
+        self.clear()
+        self.enqueue(row_ids)
+
+    def update(self, row_id: int) -> None:
+        self._retire(row_id)
+        self.enqueue((row_id,))
+
+    def remove(self, row_ids: Iterable[int]) -> None:
+        for row_id in row_ids:
+            self._retire(row_id)
+
+    def search(self, query: str, *, column: int | None = None) -> Matches:
+        needle = query.strip().casefold()
+        if not needle:
+            return Matches(0, array("I"), array("I"))
+
+        self.index_pending(budget=SEARCH_BUDGET)
+
+        cols = set(range(len(self.columns))) if column is None else {column}
+        bits = _union(self._value_rows[col][value] for col, value in self._matching_values(needle, cols))
+        bits |= self._search_chars(needle, [c for c in self._scan_cols if c in cols])
+        word_cols = {c for c in self._word_cols if c in cols}
+        if word_cols:
+            bits |= self._search_phrases(needle, word_cols)
+
+        return Matches(bits & ~self._dead_bits(), self._rows[:], self._doc_of[:])
+
+    def _reserve(self, row_id: int) -> None:
+        missing = row_id + 1 - len(self._doc_of)
+        if missing > 0:
+            self._doc_of.frombytes(bytes(missing * self._doc_of.itemsize))
+
+    def _retire(self, row_id: int) -> None:
+        if row_id < len(self._doc_of) and self._doc_of[row_id]:
+            self._dead_docs.append(self._doc_of[row_id] - 1)
+            self._dead_count += 1
+            self._doc_of[row_id] = 0
+
+    def _dead_bits(self) -> int:
+        if self._dead_docs:
+            self._dead |= _bitset(self._dead_docs)
+            self._dead_docs = array("I")
+        return self._dead
+
+    def _add(self, row_id: int, entry: Any) -> None:
+        doc = len(self._rows)
+        self._rows.append(row_id)
+        self._doc_of[row_id] = doc + 1
+
+        for col, value in zip(self._categorical_cols, self._get_categorical(entry)):
+            rows = self._value_rows[col]
+            if value not in rows:
+                for gram in _short_grams(value.casefold()):
+                    self._value_grams[gram].add((col, value))
+            rows[value].docs.append(doc)
+
+        for col, value in zip(self._scan_cols, self._get_scanned(entry)):
+            text = value.casefold()
+            positions = self._chars[col]
+            while len(positions) < len(text):
+                positions.append(defaultdict(_Posting))
+            for slot, char in zip(positions, text):
+                slot[char].docs.append(doc)
+
+        for col, value in zip(self._word_cols, self._get_words(entry)):
+            previous = -1
+            for phrase in _phrases(value.casefold()):
+                if not phrase:
+                    continue
+                phrase_id = self._phrase_ids.get((col, phrase))
+                if phrase_id is None:
+                    phrase_id = self._new_phrase(col, phrase)
+                self._phrase_rows[phrase_id].add(doc)
+                if previous >= 0:
+                    self._pairs[previous << 32 | phrase_id].add(doc)
+                previous = phrase_id
+
+    def _fold_dense(self) -> None:
+        size = len(self._rows)
+        for rows in self._value_rows:
+            for posting in rows.values():
+                posting.fold_dense(size)
+        for positions in self._chars.values():
+            for slot in positions:
+                for posting in slot.values():
+                    posting.fold_dense(size)
+
+    def _new_phrase(self, col: int, phrase: str) -> int:
+        phrase_id = len(self._phrase_text)
+        self._phrase_ids[col, phrase] = phrase_id
+        self._phrase_text.append(phrase)
+        self._phrase_col.append(col)
+        self._phrase_rows.append(_Posting())
+        for word in set(_WORD.findall(phrase)):
+            if word not in self._word_phrases:
+                for gram in _short_grams(word):
+                    self._word_grams[gram].add(word)
+            self._word_phrases[word].append(phrase_id)
+        return phrase_id
+
+    def _search_chars(self, needle: str, cols: list[int]) -> int:
+        width = len(needle)
+        bits = 0
+        for col in cols:
+            positions = self._chars[col]
+            for start in range(len(positions) - width + 1):
+                found = -1
+                for slot, char in zip(positions[start : start + width], needle):
+                    posting = slot.get(char)
+                    found = found & posting.value() if posting is not None else 0
+                    if not found:
+                        break
+                bits |= found
+        return bits
+
+    def _search_phrases(self, needle: str, cols: set[int]) -> int:
+        pieces = _phrases(needle)
+        if len(pieces) == 1:
+            phrases = self._phrases_where(needle, cols, lambda text: needle in text)
+            return _union(self._phrase_rows[p] for p in phrases)
+
+        first, *middle, last = pieces
+        chain = [set(self._phrases_where(first, cols, lambda text: text.endswith(first)))]
+        for piece in middle:
+            chain.append({self._phrase_ids[col, piece] for col in cols if (col, piece) in self._phrase_ids})
+        chain.append(set(self._phrases_where(last, cols, lambda text: text.startswith(last))))
+
+        bits = -1
+        for before, after in zip(chain, chain[1:]):
+            bits &= _union(self._adjacent(before, after))
+            if not bits:
+                return 0
+        if middle:
+            bits = self._verify(needle, bits & ~self._dead_bits(), sorted(cols))
+        return bits
+
+    def _adjacent(self, before: set[int], after: set[int]) -> Iterator[_Posting]:
+        pairs = self._pairs
+        if len(before) * len(after) <= len(pairs):
+            for a in before:
+                for b in after:
+                    posting = pairs.get(a << 32 | b)
+                    if posting is not None:
+                        yield posting
+        else:
+            for key, posting in pairs.items():
+                if key >> 32 in before and key & 0xFFFFFFFF in after:
+                    yield posting
+
+    def _phrases_where(self, piece: str, cols: set[int], test: Callable[[str], bool]) -> list[int]:
+        candidates: Iterable[int] = range(len(self._phrase_text))
+        best = len(self._phrase_text)
+        for word in set(_WORD.findall(piece)):
+            gram_sets = sorted((self._word_grams.get(g, set()) for g in _lookup_grams(word)), key=len)
+            lists = [self._word_phrases[token] for token in gram_sets[0].intersection(*gram_sets[1:]) if word in token]
+            size = sum(map(len, lists))
+            if size < best:
+                best = size
+                candidates = {p for ids in lists for p in ids}
+        texts = self._phrase_text
+        phrase_col = self._phrase_col
+        return [p for p in candidates if phrase_col[p] in cols and test(texts[p])]
+
+    def _verify(self, needle: str, bits: int, cols: list[int]) -> int:
+        positions = [self._text_cols.index(c) for c in cols]
+        rows = self._rows
+        found = array("I")
+        for doc in compress(range(len(rows)), _flags(bits, len(rows))):
+            parts = self._text_of(rows[doc]).casefold().split(self._text_sep)
+            if any(needle in parts[p] for p in positions):
+                found.append(doc)
+        return _bitset(found) if found else 0
+
+    def _matching_values(self, needle: str, cols: set[int]) -> list[tuple[int, str]]:
+        gram_sets = sorted((self._value_grams.get(g, set()) for g in _lookup_grams(needle)), key=len)
+        candidates = gram_sets[0].intersection(*gram_sets[1:])
+        return [(col, value) for col, value in candidates if col in cols and needle in value.casefold()]
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from typing import Callable, Sequence, Union
+
+from entry_store import CATEGORICAL_FIELDS, EntryStore
+from excel_exporter import parse_recebimento
+
+NUMERIC_FIELDS = frozenset({"nf", "os"})
+
+SortKey = Union[int, str, None]
+
+
+def _date_key(value: str) -> SortKey:
+    text = value.strip()
+    if not text:
+        return None
+    parsed = parse_recebimento(text)
+    return parsed.toordinal() if parsed is not None else text.casefold()
+
+
+def _number_key(value: str) -> SortKey:
+    text = value.strip()
+    if text.isdigit():
+        return int(text)
+    return text.casefold() or None
+
+
+def _text_key(value: str) -> SortKey:
+    return value.strip().casefold() or None
+
+
+def key_function(field: str) -> Callable[[str], SortKey]:
+    if field == "recebimento":
+        return _date_key
+    if field in NUMERIC_FIELDS:
+        return _number_key
+    return _text_key
+
+
+def sort_key(field: str, value: str) -> SortKey:
+    return key_function(field)(value)
+
+
+class SortKeyCache:
+    def __init__(self, store: EntryStore) -> None:
+        self.store = store
+        self._row_keys: dict[str, dict[int, SortKey]] = {}
+        self._value_keys: dict[str, tuple[int, list[SortKey]]] = {}
+
+    def invalidate(self, row_ids: Sequence[int]) -> None:
+        for keys in self._row_keys.values():
+            for row_id in row_ids:
+                keys.pop(row_id, None)
+
+    def clear(self) -> None:
+        self._row_keys.clear()
+        self._value_keys.clear()
+
+    def keys_for(self, field: str, row_ids: Sequence[int]) -> dict[int, SortKey]:
+        keys = self._row_keys.setdefault(field, {})
+        missing = [row_id for row_id in row_ids if row_id not in keys] if keys else list(row_ids)
+        if not missing:
+            return keys
+
+        key_of = key_function(field)
+        if field in CATEGORICAL_FIELDS:
+            codes, values = self.store.column_codes(field)
+            version = self.store.column_version(field)
+            cached = self._value_keys.get(field)
+            if cached is None or cached[0] != version:
+                cached = self._value_keys[field] = (version, [])
+            value_keys = cached[1]
+            value_keys.extend(map(key_of, values[len(value_keys) :]))
+            keys.update(zip(missing, [value_keys[codes[slot]] for slot in self.store.slots(missing)]))
+        else:
+            keys.update(zip(missing, map(key_of, self.store.column_values(field, missing))))
+        return keys
+
+    def sorted_ids(self, row_ids: Sequence[int], field: str, *, descending: bool = False) -> list[int]:
+        keys = self.keys_for(field, row_ids)
+        numbers: list[int] = []
+        texts: list[int] = []
+        blank: list[int] = []
+        for row_id in row_ids:
+            key = keys[row_id]
+            if key is None:
+                blank.append(row_id)
+            elif type(key) is int:
+                numbers.append(row_id)
+            else:
+                texts.append(row_id)
+
+        numbers.sort(key=keys.__getitem__, reverse=descending)
+        texts.sort(key=keys.__getitem__, reverse=descending)
+        if descending:
+            return texts + numbers + blank
+        return numbers + texts + blank
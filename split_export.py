@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable
+
+from excel_exporter import RmaEntry, export_to_excel, month_label
+
+if TYPE_CHECKING:
+    from normalization import Normalizer
+
+RowTuple = tuple[str, ...]
+
+SPLIT_KEYS = {
+    "cliente": "Cliente",
+    "plataforma": "Plataforma",
+    "mes": "Mês do recebimento",
+    "status": "Status",
+}
+
+EMPTY_GROUP = "SEM INFORMAÇÃO"
+
+_INVALID_FILENAME_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+
+
+@dataclass(frozen=True)
+class SplitResult:
+    group: str
+    path: Path
+    rows: int
+
+
+def group_of(entry: RmaEntry, key: str) -> str:
+    if key == "mes":
+        return month_label(entry.recebimento)
+    if key not in SPLIT_KEYS:
+        raise ValueError(f"Chave de separação inválida: {key}")
+    return getattr(entry, key).strip() or EMPTY_GROUP
+
+
+def partition_entries(entries: Iterable[RmaEntry], key: str) -> dict[str, list[RowTuple]]:
+    groups: dict[str, list[RowTuple]] = {}
+    folded: dict[str, str] = {}
+    for e in entries:
+        group = group_of(e, key)
+        group = folded.setdefault(group.casefold(), group)
+        rows = groups.get(group)
+        if rows is None:
+            rows = groups[group] = []
+        rows.append(
+            (
+                e.recebimento,
+                e.cliente,
+                e.nf,
+                e.os,
+                e.triagem,
+                e.produto_enviado,
+                e.und,
+                e.plataforma,
+                e.codigo,
+                e.numero_serie,
+                e.status,
+                e.configuracao_avaria,
+                e.pedido_marketplace,
+                e.laudo_tecnico,
+            )
+        )
+    return groups
+
+
+def safe_file_name(name: str, used: set[str], *, max_length: int = 80) -> str:
+    base = _INVALID_FILENAME_CHARS.sub("_", name).strip(" .") or "grupo"
+    base = base[:max_length]
+    candidate = base
+    n = 2
+    while candidate.casefold() in used:
+        candidate = f"{base} ({n})"
+        n += 1
+    used.add(candidate.casefold())
+    return f"{candidate}.xlsx"
+
+
+def export_partition(
+    group: str,
+    rows: list[RowTuple],
+    path: str,
+    title: str,
+    periodo_mes: str,
+    periodo_ano: str,
+    summary_top_n: int | None,
+    full_breakdown_sheet: bool,
+    analysis_sheet: bool,
+    normalizer: Normalizer | None,
+) -> SplitResult:
+    export_to_excel(
+        (RmaEntry(*row) for row in rows),
+        path,
+        title=f"{title} - {group}",
+        periodo_mes=periodo_mes,
+        periodo_ano=periodo_ano,
+        constant_memory=True,
+        summary_top_n=summary_top_n,
+        full_breakdown_sheet=full_breakdown_sheet,
+        analysis_sheet=analysis_sheet,
+        normalizer=normalizer,
+    )
+    return SplitResult(group, Path(path), len(rows))
+
+
+def split_export(
+    entries: Iterable[RmaEntry],
+    output_dir: str | Path,
+    key: str,
+    *,
+    title: str,
+    periodo_mes: str,
+    periodo_ano: str,
+    workers: int = 1,
+    on_file_done: Callable[[int, int], None] | None = None,
+    summary_top_n: int | None = None,
+    full_breakdown_sheet: bool = False,
+    analysis_sheet: bool = False,
+    normalizer: Normalizer | None = None,
+    index_name: str = "Indice.xlsx",
+) -> list[SplitResult]:
+    folder = Path(output_dir)
+    folder.mkdir(parents=True, exist_ok=True)
+
+    groups = partition_entries(entries, key)
+    used = {Path(index_name).stem.casefold()}
+    tasks = [
+        (group, rows, str(folder / safe_file_name(group, used)))
+        for group, rows in sorted(groups.items(), key=lambda item: -len(item[1]))
+    ]
+    options = (title, periodo_mes, periodo_ano, summary_top_n, full_breakdown_sheet, analysis_sheet, normalizer)
+    total = len(tasks)
+    results: list[SplitResult] = []
+
+    if workers <= 1 or total <= 1:
+        for group, rows, path in tasks:
+            results.append(export_partition(group, rows, path, *options))
+            if on_file_done is not None:
+                on_file_done(len(results), total)
+    else:
+        pool = ProcessPoolExecutor(max_workers=min(workers, total))
+        try:
+            futures = [pool.submit(export_partition, group, rows, path, *options) for group, rows, path in tasks]
+            for future in as_completed(futures):
+                results.append(future.result())
+                if on_file_done is not None:
+                    on_file_done(len(results), total)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    results.sort(key=lambda r: r.group.casefold())
+    write_index_workbook(results, folder / index_name, key=key, title=title)
+    return results
+
+
+def write_index_workbook(results: list[SplitResult], path: Path, *, key: str, title: str) -> Path:
+    import xlsxwriter
+
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.stem}-", suffix=".xlsx", dir=path.parent)
+    os.close(fd)
+    tmp_path = Path(tmp_name)
+
+    try:
+        workbook = xlsxwriter.Workbook(str(tmp_path))
+        fmt_title = workbook.add_format({"bold": True, "font_size": 14})
+        fmt_header = workbook.add_format(
+            {"bold": True, "bg_color": "#4472C4", "font_color": "#FFFFFF", "border": 1, "align": "center"}
+        )
+        fmt_cell = workbook.add_format({"border": 1})
+        fmt_link = workbook.add_format({"border": 1, "font_color": "#0563C1", "underline": 1})
+        fmt_total = workbook.add_format({"bold": True, "border": 1, "bg_color": "#D9D9D9"})
+
+        ws = workbook.add_worksheet("Índice")
+        ws.set_column(0, 0, 36)
+        ws.set_column(1, 1, 12)
+        ws.set_column(2, 2, 48)
+
+        ws.write(0, 0, f"{title} - por {SPLIT_KEYS.get(key, key)}", fmt_title)
+        for col, header in enumerate((SPLIT_KEYS.get(key, key), "REGISTROS", "ARQUIVO")):
+            ws.write(2, col, header, fmt_header)
+
+        for row, result in enumerate(results, start=3):
+            ws.write(row, 0, result.group, fmt_cell)
+            ws.write(row, 1, result.rows, fmt_cell)
+            ws.write_url(row, 2, f"external:{result.path.name}", fmt_link, string=result.path.name)
+
+        total_row = len(results) + 3
+        ws.write(total_row, 0, "TOTAL", fmt_total)
+        ws.write(total_row, 1, sum(r.rows for r in results), fmt_total)
+        ws.write(total_row, 2, f"{len(results)} arquivo(s)", fmt_total)
+
+        workbook.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    return path
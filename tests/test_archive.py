@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from archive import ArchiveStats, RmaArchive
+from benchmark import generate_entries
+
+
+def test_archiving_the_same_rows_twice_keeps_one_copy(tmp_path: Path) -> None:
+    entries = list(generate_entries(300))
+
+    with RmaArchive(tmp_path / "historico.sqlite3") as archive:
+        assert archive.insert_many(entries, batch_size=64) == ArchiveStats(300, 0)
+        assert archive.insert_many(entries[:100] + list(generate_entries(50, seed=1))) == ArchiveStats(50, 100)
+        found = list(archive.find(numero_serie=entries[0].numero_serie))
+
+    assert found == [entries[0]]
+    with RmaArchive(tmp_path / "historico.sqlite3") as archive:
+        assert archive.count() == 350
+        assert archive.insert_many(archive.find()) == ArchiveStats(0, 350)
+
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+from benchmark import generate_entries
+from duplicates import DuplicateIndex
+
+
+def test_find_excludes_the_row_being_edited() -> None:
+    entries = list(generate_entries(3))
+    rows = dict(enumerate(entries))
+    index = DuplicateIndex(rows.__getitem__)
+    for row_id, entry in rows.items():
+        index.add(row_id, entry)
+
+    edited = replace(entries[0], status="REPARADO")
+    assert index.find(edited, exclude=0) is None
+
+    clash = replace(entries[0], numero_serie=entries[1].numero_serie)
+    assert index.find(clash, exclude=0) == (1, "numero_serie")
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+from benchmark import generate_entries
+from entry_store import CATEGORICAL_FIELDS, EntryStore
+from sort_keys import SortKeyCache
+
+
+def _dictionary_sizes(store: EntryStore) -> dict[str, int]:
+    return {name: len(set(store.column_codes(name)[1]) - {""}) for name in CATEGORICAL_FIELDS}
+
+
+def test_round_trip_and_free_text_is_not_dictionary_encoded() -> None:
+    entries = list(generate_entries(300))
+    store = EntryStore()
+    row_ids = store.add_many(entries)
+
+    assert [store.get(row_id) for row_id in row_ids] == entries
+    assert "laudo_tecnico" not in CATEGORICAL_FIELDS
+    assert "codigo" not in CATEGORICAL_FIELDS
+    assert store.column_values("laudo_tecnico") == [e.laudo_tecnico for e in entries]
+
+
+def test_removed_and_replaced_values_are_reclaimed() -> None:
+    store = EntryStore()
+    row_ids = store.add_many(replace(e, cliente=f"CLIENTE UNICO {i}") for i, e in enumerate(generate_entries(500)))
+
+    for row_id in row_ids[:250]:
+        store.replace(row_id, replace(store.get(row_id), cliente="CLIENTE FIXO"))
+    assert _dictionary_sizes(store)["cliente"] == 251
+
+    capacity = len(store.column_codes("cliente")[1])
+    store.remove(row_ids)
+    assert set(_dictionary_sizes(store).values()) == {0}
+
+    store.add_many(generate_entries(500, seed=1))
+    assert len(store.column_codes("cliente")[1]) == capacity
+
+
+def test_snapshot_keeps_values_when_codes_are_reused() -> None:
+    store = EntryStore()
+    first, second = store.add_many(generate_entries(2))
+    store.replace(first, replace(store.get(first), cliente="CLIENTE ANTIGO"))
+    snapshot = store.snapshot()
+    expected = [snapshot.get(first), snapshot.get(second)]
+
+    store.remove([first])
+    store.add(replace(store.get(second), cliente="CLIENTE NOVO"))
+
+    assert [snapshot.get(first), snapshot.get(second)] == expected
+
+
+def test_sort_keys_follow_reused_dictionary_codes() -> None:
+    store = EntryStore()
+    keys = SortKeyCache(store)
+    base = next(generate_entries(1))
+    row_ids = store.add_many(replace(base, cliente=name) for name in ("B", "C", "A"))
+    assert keys.sorted_ids(store.order, "cliente") == [row_ids[2], row_ids[0], row_ids[1]]
+
+    store.remove([row_ids[2]])
+    keys.invalidate([row_ids[2]])
+    new_id = store.add(replace(base, cliente="Z"))
+
+    assert keys.sorted_ids(store.order, "cliente") == [row_ids[0], row_ids[1], new_id]
+
+
+def test_insertion_order_flag_tracks_reorder() -> None:
+    store = EntryStore()
+    row_ids = store.add_many(generate_entries(10))
+    assert store.insertion_order
+
+    store.reorder(row_ids[::-1])
+    assert not store.insertion_order
+
+    store.reorder(row_ids)
+    store.remove(row_ids[:3])
+    store.add(next(generate_entries(1)))
+    assert store.insertion_order
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import zipfile
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+import excel_exporter
+from benchmark import generate_entries
+from excel_exporter import RmaEntry, export_to_excel
+from export_cache import ExportCache, entries_digest, row_digest
+
+
+def _sheets(path: Path) -> dict[str, bytes]:
+    with zipfile.ZipFile(path) as zf:
+        return {
+            name: zf.read(name)
+            for name in zf.namelist()
+            if name.startswith("xl/worksheets/") or name == "xl/sharedStrings.xml"
+        }
+
+
+def _export(entries: list[RmaEntry], path: Path, cache: ExportCache) -> Path:
+    return export_to_excel(
+        entries,
+        path,
+        title="Cache",
+        periodo_mes="JANEIRO",
+        periodo_ano="2026",
+        cache=cache,
+        entries_digest=entries_digest(row_digest(e) for e in entries),
+    )
+
+
+def test_hit_is_identical_and_changed_entries_regenerate(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = ExportCache(tmp_path / "cache")
+    entries = list(generate_entries(500))
+
+    first = _export(entries, tmp_path / "primeira.xlsx", cache)
+
+    write_workbook = excel_exporter._write_workbook
+
+    def unexpected_write(*args, **kwargs) -> None:
+        raise AssertionError("a planilha deveria vir do cache")
+
+    monkeypatch.setattr(excel_exporter, "_write_workbook", unexpected_write)
+    second = _export(entries, tmp_path / "segunda.xlsx", cache)
+    assert second.read_bytes() == first.read_bytes()
+    monkeypatch.setattr(excel_exporter, "_write_workbook", write_workbook)
+
+    entries[0] = replace(entries[0], status="STATUS ALTERADO")
+    third = _export(entries, tmp_path / "terceira.xlsx", cache)
+    assert _sheets(third) != _sheets(first)
+    assert len(list(cache.directory.glob("*.xlsx"))) == 2
+
+
+def test_eviction_keeps_the_cache_under_its_size_limit(tmp_path: Path) -> None:
+    cache = ExportCache(tmp_path / "cache")
+    entries = list(generate_entries(500))
+    first = _export(entries, tmp_path / "primeira.xlsx", cache)
+
+    cache.max_bytes = first.stat().st_size * 3 // 2
+    entries[0] = replace(entries[0], status="STATUS ALTERADO")
+    _export(entries, tmp_path / "segunda.xlsx", cache)
+    assert len(list(cache.directory.glob("*.xlsx"))) == 1
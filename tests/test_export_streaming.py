@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from benchmark import generate_entries
+from excel_exporter import export_to_excel, summarize_entries
+
+ROOT = Path(__file__).resolve().parent.parent
+ROWS = 20_000
+MAX_RSS_GROWTH_MB = 40.0
+
+_CHILD = textwrap.dedent(
+    """
+    import sys
+
+    import xlsxwriter
+
+    from benchmark import generate_entries, peak_rss_mb
+    from excel_exporter import export_to_excel
+
+    rows, target = int(sys.argv[1]), sys.argv[2]
+    baseline = peak_rss_mb()
+    export_to_excel(
+        generate_entries(rows),
+        target,
+        title="Streaming",
+        periodo_mes="JANEIRO",
+        periodo_ano="2026",
+        constant_memory=True,
+    )
+    print(peak_rss_mb() - baseline)
+    """
+)
+
+
+def _read_resumo(path: Path) -> tuple[list[tuple[str, int]], list[tuple[str, int]]]:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True)
+    try:
+        rows = [(name, qty) for name, qty in wb["Resumo"].iter_rows(min_col=1, max_col=2, values_only=True)]
+    finally:
+        wb.close()
+
+    tables: list[list[tuple[str, int]]] = []
+    current: list[tuple[str, int]] | None = None
+    for name, qty in rows:
+        if qty == "QUANTIDADE":
+            current = []
+        elif name == "TOTAL" and current is not None:
+            tables.append(current)
+            current = None
+        elif current is not None:
+            current.append((name, qty))
+    pieces, reasons = tables
+    return pieces, reasons
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="resource indisponível")
+def test_streaming_export_keeps_peak_rss_bounded(tmp_path: Path) -> None:
+    target = tmp_path / "streaming.xlsx"
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD, str(ROWS), str(target)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    growth_mb = float(result.stdout.strip().splitlines()[-1])
+
+    assert growth_mb < MAX_RSS_GROWTH_MB
+    assert _read_resumo(target) == summarize_entries(generate_entries(ROWS), vectorized=False)
+
+
+def test_streaming_export_accepts_a_generator(tmp_path: Path) -> None:
+    consumed = 0
+
+    def entries():
+        nonlocal consumed
+        for entry in generate_entries(500):
+            consumed += 1
+            yield entry
+
+    path = export_to_excel(
+        entries(),
+        tmp_path / "gerador.xlsx",
+        title="Streaming",
+        periodo_mes="JANEIRO",
+        periodo_ano="2026",
+        constant_memory=True,
+    )
+
+    assert consumed == 500
+    assert _read_resumo(path) == summarize_entries(generate_entries(500), vectorized=False)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+from benchmark import generate_entries
+from excel_exporter import IncrementalSummary
+from normalization import Normalizer
+from rollup import RollupCube
+
+
+def _entries(*produtos: str):
+    base = next(iter(generate_entries(1)))
+    return [replace(base, produto_enviado=p, configuracao_avaria="") for p in produtos]
+
+
+def test_label_is_the_most_frequent_spelling_regardless_of_order() -> None:
+    entries = _entries("ssd 240gb", "SSD 240GB", "SSD  240 GB", "SSD 240GB")
+    normalizer = Normalizer()
+
+    forward = IncrementalSummary(entries, normalizer=normalizer).sorted_items()
+    backward = IncrementalSummary(reversed(entries), normalizer=normalizer).sorted_items()
+
+    assert forward == backward
+    assert forward[0] == [("SSD 240GB", 4)]
+
+
+def test_label_follows_current_rows_and_alias_target() -> None:
+    normalizer = Normalizer()
+    summary = IncrementalSummary(_entries("mouse usb", "mouse usb"), normalizer=normalizer)
+    for entry in _entries("Mouse USB", "Mouse USB", "Mouse USB"):
+        summary.add(entry)
+    assert summary.sorted_items()[0] == [("Mouse USB", 5)]
+
+    for entry in _entries("Mouse USB", "Mouse USB"):
+        summary.remove(entry)
+    assert summary.sorted_items()[0] == [("mouse usb", 3)]
+
+    normalizer.set_aliases({"mouse usb": "MOUSE-USB"})
+    assert summary.sorted_items()[0] == [("MOUSE-USB", 3)]
+
+
+def test_signature_depends_only_on_aliases() -> None:
+    normalizer = Normalizer({"SSD 240 GB": "SSD 240GB"})
+    before = normalizer.signature()
+    IncrementalSummary(_entries("ssd 240 gb", "Ssd 240gb"), normalizer=normalizer).sorted_items()
+
+    assert normalizer.signature() == before == Normalizer({"SSD 240 GB": "SSD 240GB"}).signature()
+    assert Normalizer().signature() != before
+
+
+def test_analysis_cube_groups_variations_when_normalizing() -> None:
+    entries = _entries("SSD 240GB", "ssd 240 gb", "SSD 240GB", "HD 1TB")
+
+    cube = RollupCube(entries)
+    assert len(cube.query(["produto"])) == 3
+
+    cube.rebuild(entries, normalizer=Normalizer())
+    assert cube.query(["produto"]) == [(("SSD 240GB",), 3), (("HD 1TB",), 1)]
+    assert cube.values("produto") == ["HD 1TB", "SSD 240GB"]
+    assert cube.query(["cliente"], {"produto": "ssd 240 gb"})[0][1] == 3
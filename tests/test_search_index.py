@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import replace
+
+import pytest
+
+from benchmark import generate_entries
+from entry_store import CATEGORICAL_FIELDS, ENTRY_FIELDS, FREE_TEXT_FIELDS, EntryStore
+from search_index import SearchIndex
+
+QUERIES = [
+    "a",
+    "1",
+    "12",
+    "A1",
+    "0a",
+    "ss",
+    "Re",
+    "oxida",
+    "OXIDAÇÃO",
+    "cliente 12",
+    "sn0",
+    "ped-",
+    "2026",
+    "não liga",
+    "testes de estresse",
+    "contatos.",
+    "bancada. defeito",
+    "bancada. defeito confirmado após testes de estresse. equip",
+    "xyzzy",
+]
+
+LATENCY_QUERIES = [
+    "a",
+    "1",
+    "12",
+    "a1",
+    "ss",
+    "oxida",
+    "cliente 12",
+    "sn0",
+    "ped-",
+    "2026",
+    "não liga",
+    "testes de estresse",
+    "bancada. defeito",
+    "xyzzy",
+]
+LATENCY_ROWS = 500_000
+MAX_QUERY_MS = 50.0
+
+
+def _index(store: EntryStore) -> SearchIndex:
+    return SearchIndex(
+        ENTRY_FIELDS,
+        CATEGORICAL_FIELDS,
+        tokenized=FREE_TEXT_FIELDS,
+        alive=store,
+        current=store.get,
+        text_of=store.search_text,
+    )
+
+
+def _build(entries) -> tuple[EntryStore, SearchIndex]:
+    store = EntryStore()
+    index = _index(store)
+    index.enqueue(store.add_many(entries))
+    _drain(index)
+    return store, index
+
+
+def _drain(index: SearchIndex) -> None:
+    while index.index_pending(budget=0.01):
+        pass
+
+
+def _expected(store: EntryStore, query: str, column: int | None = None) -> set[int]:
+    needle = query.strip().casefold()
+    cols = range(len(ENTRY_FIELDS)) if column is None else [column]
+    return {
+        row_id for row_id in store.order if any(needle in store.values(row_id)[c].casefold() for c in cols)
+    }
+
+
+def test_search_matches_a_full_scan() -> None:
+    store, index = _build(generate_entries(3000))
+    for query in QUERIES:
+        assert set(index.search(query)) == _expected(store, query), query
+
+
+@pytest.mark.parametrize("field", ["cliente", "numero_serie", "laudo_tecnico", "pedido_marketplace"])
+def test_search_restricted_to_one_column(field: str) -> None:
+    store, index = _build(generate_entries(2000))
+    column = ENTRY_FIELDS.index(field)
+    for query in QUERIES:
+        assert set(index.search(query, column=column)) == _expected(store, query, column), (field, query)
+
+
+def test_search_follows_edits_and_removals() -> None:
+    rng = random.Random(7)
+    store, index = _build(generate_entries(2000))
+
+    for row_id in rng.sample(store.order, 300):
+        entry = store.get(row_id)
+        store.replace(row_id, replace(entry, laudo_tecnico="Placa oxidada", numero_serie="SN-EDITADO", cliente="Novo"))
+        index.update(row_id)
+    removed = rng.sample(store.order, 300)
+    store.remove(removed)
+    index.remove(removed)
+    index.enqueue(store.add_many(generate_entries(500, seed=3)))
+    _drain(index)
+
+    for query in QUERIES + ["oxidada", "editado", "novo"]:
+        assert set(index.search(query)) == _expected(store, query), query
+
+
+def test_search_indexes_pending_rows_within_a_budget() -> None:
+    store = EntryStore()
+    index = _index(store)
+    index.enqueue(store.add_many(generate_entries(20_000)))
+
+    started = time.perf_counter()
+    index.search("oxida")
+    assert time.perf_counter() - started < 0.2
+    assert index.pending
+
+    _drain(index)
+    assert set(index.search("oxida")) == _expected(store, "oxida")
+
+
+def test_filter_latency() -> None:
+    _store, index = _build(generate_entries(LATENCY_ROWS))
+    for query in LATENCY_QUERIES:
+        index.search(query)
+        best = min(_timed(index, query) for _ in range(3))
+        assert best * 1000 < MAX_QUERY_MS, f"{query!r}: {best * 1000:.1f} ms"
+
+
+def _timed(index: SearchIndex, query: str) -> float:
+    started = time.perf_counter()
+    index.search(query)
+    return time.perf_counter() - started
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import random
+from collections import Counter
+from dataclasses import replace
+
+import pytest
+
+from benchmark import AVARIAS, PRODUTOS, generate_entries
+from excel_exporter import IncrementalSummary, RmaEntry, summarize_entries, top_counts
+from normalization import Normalizer
+from vector_summary import numpy_available
+
+VECTORIZED = [False, pytest.param(True, marks=pytest.mark.skipif(not numpy_available(), reason="NumPy ausente"))]
+
+
+def _baseline_summary(entries: list[RmaEntry]) -> tuple[list[tuple[str, int]], list[tuple[str, int]]]:
+    pieces: Counter[str] = Counter()
+    reasons: Counter[str] = Counter()
+    for e in entries:
+        produto = (e.produto_enviado or "").strip()
+        if produto:
+            pieces[produto] += 1
+        avaria = (e.configuracao_avaria or "").strip()
+        reason_key = f"{produto} ({avaria})" if produto and avaria else produto or avaria
+        if reason_key:
+            reasons[reason_key] += 1
+    return (
+        sorted(pieces.items(), key=lambda x: (-x[1], x[0].casefold())),
+        sorted(reasons.items(), key=lambda x: (-x[1], x[0].casefold())),
+    )
+
+
+def _ignoring_case_ties(items: tuple[list[tuple[str, int]], ...]) -> tuple[list[tuple[str, int]], ...]:
+    return tuple(sorted(part, key=lambda x: (-x[1], x[0].casefold(), x[0])) for part in items)
+
+
+def _mutated(entry: RmaEntry, rng: random.Random) -> RmaEntry:
+    produto = rng.choice(PRODUTOS + ["", "  ", " ssd 240gb "])
+    avaria = rng.choice(AVARIAS + ["  ", "não liga"])
+    return replace(entry, produto_enviado=produto, configuracao_avaria=avaria)
+
+
+@pytest.mark.parametrize("vectorized", VECTORIZED)
+@pytest.mark.parametrize("normalize", [False, True])
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_summary_matches_full_recompute(seed: int, normalize: bool, vectorized: bool) -> None:
+    rng = random.Random(seed)
+    normalizer = Normalizer({"SSD 240 GB": "SSD 240GB"}) if normalize else None
+    pool = iter(generate_entries(2000, seed=seed))
+    live: dict[int, RmaEntry] = {}
+    summary = IncrementalSummary(normalizer=normalizer)
+
+    for step in range(600):
+        op = rng.random()
+        if op < 0.5 or not live:
+            entry = next(pool)
+            if rng.random() < 0.3:
+                entry = _mutated(entry, rng)
+            live[step] = entry
+            summary.add(entry)
+        elif op < 0.8:
+            row_id = rng.choice(list(live))
+            new = _mutated(live[row_id], rng)
+            summary.replace(live[row_id], new)
+            live[row_id] = new
+        else:
+            row_id = rng.choice(list(live))
+            summary.remove(live.pop(row_id))
+
+        if step % 50 == 0:
+            assert _ignoring_case_ties(summary.sorted_items()) == _ignoring_case_ties(
+                summarize_entries(list(live.values()), vectorized=vectorized, normalizer=normalizer)
+            )
+
+    assert _ignoring_case_ties(summary.sorted_items()) == _ignoring_case_ties(
+        summarize_entries(list(live.values()), vectorized=vectorized, normalizer=normalizer)
+    )
+
+
+@pytest.mark.parametrize("vectorized", VECTORIZED)
+def test_case_only_ties_keep_first_seen_order(vectorized: bool) -> None:
+    base = next(iter(generate_entries(1)))
+    entries = [
+        replace(base, produto_enviado=produto, configuracao_avaria=avaria)
+        for produto, avaria in [("hd", ""), ("HD", ""), ("ssd", "sem vídeo"), ("SSD", "SEM VÍDEO"), ("Hd", "x")]
+    ]
+
+    assert summarize_entries(entries, vectorized=vectorized) == _baseline_summary(entries)
+    assert summarize_entries(entries, vectorized=vectorized)[0][:2] == [("hd", 1), ("HD", 1)]
+
+
+@pytest.mark.parametrize("vectorized", VECTORIZED)
+@pytest.mark.parametrize("seed", range(3))
+def test_summarize_entries_matches_baseline_order(seed: int, vectorized: bool) -> None:
+    rng = random.Random(seed)
+    entries = [_mutated(e, rng) if rng.random() < 0.5 else e for e in generate_entries(5000, seed=seed)]
+    assert summarize_entries(entries, vectorized=vectorized) == _baseline_summary(entries)
+
+
+def test_removing_everything_leaves_no_zero_counts() -> None:
+    entries = list(generate_entries(200))
+    summary = IncrementalSummary(entries)
+    for entry in entries:
+        summary.remove(entry)
+    assert summary.sorted_items() == ([], [])
+    assert not summary.pairs
+
+
+def test_top_counts_folds_existing_outros_into_the_bucket() -> None:
+    counts = Counter({"Outros": 50, "SSD 240GB": 40, "HD 1TB": 30, "FONTE 500W": 5, "RUÍDO": 1})
+
+    items = top_counts(counts, 2)
+
+    assert items == [("SSD 240GB", 40), ("HD 1TB", 30), ("Outros", 56)]
+    assert [name for name, _qty in items].count("Outros") == 1
+    assert sum(qty for _name, qty in items) == sum(counts.values())
+
+
+def test_top_counts_without_overflow_keeps_every_row() -> None:
+    counts = Counter({"Outros": 3, "SSD 240GB": 2})
+    assert top_counts(counts, 2) == [("Outros", 3), ("SSD 240GB", 2)]
+
+
+@pytest.mark.skipif(not numpy_available(), reason="NumPy ausente")
+@pytest.mark.parametrize("seed", range(3))
+def test_normalized_vectorized_matches_reference(seed: int) -> None:
+    rng = random.Random(seed)
+    entries = [_mutated(e, rng) if rng.random() < 0.5 else e for e in generate_entries(5000, seed=seed)]
+    normalizer = Normalizer({"SSD 240 GB": "SSD 240GB"})
+    assert summarize_entries(entries, vectorized=True, normalizer=normalizer) == summarize_entries(
+        entries, vectorized=False, normalizer=normalizer
+    )
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    import cProfile
+    import logging
+
+TRACE_ENV = "GERADOR_RMA_TRACE"
+TRACE_MODES = ("tempo", "memoria", "perfil")
+DEFAULT_TRACE_DIR = Path.home() / ".gerador_rma" / "trace"
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> _NullSpan:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _NullLaps:
+    __slots__ = ()
+
+    def mark(self, name: str, **attrs: Any) -> None:
+        pass
+
+
+_NULL_LAPS = _NullLaps()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "attrs", "parent", "started", "profiler")
+
+    def __init__(self, tracer: Tracer, name: str, attrs: dict[str, Any]) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.parent: str | None = None
+        self.started = 0.0
+        self.profiler: cProfile.Profile | None = None
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> _Span:
+        stack = self.tracer._stack()
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+
+        if self.parent is None:
+            if self.tracer.memory:
+                tracemalloc.reset_peak()
+            if self.tracer.profile:
+                import cProfile
+
+                self.profiler = cProfile.Profile()
+                try:
+                    self.profiler.enable()
+                except ValueError:
+                    self.profiler = None
+
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, *exc: object) -> None:
+        elapsed_ms = (time.perf_counter() - self.started) * 1000
+        stack = self.tracer._stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+
+        record: dict[str, Any] = {
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "span": self.name,
+            "parent": self.parent,
+            "ms": round(elapsed_ms, 3),
+            "thread": threading.current_thread().name,
+        }
+        if exc_type is not None:
+            record["erro"] = exc_type.__name__
+        record.update(self.attrs)
+
+        if self.parent is None:
+            if self.tracer.memory and tracemalloc.is_tracing():
+                record["pico_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+            if self.profiler is not None:
+                self.profiler.disable()
+                record["perfil"] = str(self.tracer._dump_profile(self.name, self.profiler))
+
+        self.tracer._emit(record)
+
+
+class _Laps:
+    __slots__ = ("tracer", "prefix", "last")
+
+    def __init__(self, tracer: Tracer, prefix: str) -> None:
+        self.tracer = tracer
+        self.prefix = prefix
+        self.last = time.perf_counter()
+
+    def mark(self, name: str, **attrs: Any) -> None:
+        now = time.perf_counter()
+        stack = self.tracer._stack()
+        record: dict[str, Any] = {
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "span": f"{self.prefix}.{name}",
+            "parent": stack[-1].name if stack else None,
+            "ms": round((now - self.last) * 1000, 3),
+            "thread": threading.current_thread().name,
+        }
+        record.update(attrs)
+        self.last = now
+        self.tracer._emit(record)
+
+
+class Tracer:
+    def __init__(self) -> None:
+        self.enabled = False
+        self.memory = False
+        self.profile = False
+        self.directory = DEFAULT_TRACE_DIR
+        self._local = threading.local()
+        self._listeners: list[Callable[[dict[str, Any]], None]] = []
+        self._logger: logging.Logger | None = None
+
+    def configure(
+        self,
+        mode: str | None,
+        *,
+        directory: str | Path = DEFAULT_TRACE_DIR,
+        max_bytes: int = 2 * 1024 * 1024,
+        backup_count: int = 3,
+    ) -> None:
+        mode = (mode or "").strip().lower()
+        if mode in {"", "0", "off", "desligado"}:
+            self.enabled = self.memory = self.profile = False
+            return
+        if mode not in TRACE_MODES and mode != "1":
+            raise ValueError(f"Modo de rastreamento inválido: {mode} (use {', '.join(TRACE_MODES)})")
+
+        import logging
+        from logging.handlers import RotatingFileHandler
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        logger = logging.getLogger("gerador_rma.trace")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+        handler = RotatingFileHandler(
+            self.directory / "trace.jsonl",
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding="utf-8",
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        self._logger = logger
+
+        self.memory = mode in {"memoria", "perfil"}
+        self.profile = mode == "perfil"
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.enabled = True
+
+    def configure_from_env(self) -> None:
+        self.configure(os.environ.get(TRACE_ENV))
+
+    def span(self, name: str, **attrs: Any) -> _Span | _NullSpan:
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, attrs)
+
+    def laps(self, prefix: str) -> _Laps | _NullLaps:
+        if not self.enabled:
+            return _NULL_LAPS
+        return _Laps(self, prefix)
+
+    def add_listener(self, listener: Callable[[dict[str, Any]], None]) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[dict[str, Any]], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _stack(self) -> list[_Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _emit(self, record: dict[str, Any]) -> None:
+        if self._logger is not None:
+            self._logger.info(json.dumps(record, ensure_ascii=False, default=str))
+        for listener in list(self._listeners):
+            listener(record)
+
+    def _dump_profile(self, name: str, profiler: cProfile.Profile) -> Path:
+        path = self.directory / f"{name}-{datetime.now():%Y%m%d-%H%M%S-%f}.prof"
+        profiler.dump_stats(str(path))
+        return path
+
+
+TRACER = Tracer()
+span = TRACER.span
+laps = TRACER.laps
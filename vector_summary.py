@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import importlib.util
+from array import array
+from collections import Counter
+from functools import cache
+from typing import TYPE_CHECKING, Callable, Iterable, Sequence
+
+if TYPE_CHECKING:
+    import numpy
+
+    from entry_store import EntryStore
+    from excel_exporter import RmaEntry
+    from normalization import Normalizer
+
+PairCounts = Counter[tuple[str, str]]
+SummaryItems = tuple[list[tuple[str, int]], list[tuple[str, int]]]
+
+_DENSE_BINS = 1 << 20
+
+
+@cache
+def numpy_available() -> bool:
+    return importlib.util.find_spec("numpy") is not None
+
+
+class SummaryEncoder:
+    def __init__(self, *, clean: Callable[[str], str] = str.strip) -> None:
+        self.clean = clean
+        self._produtos: dict[str, int] = {}
+        self._avarias: dict[str, int] = {}
+        self._produto_codes = array("I")
+        self._avaria_codes = array("I")
+
+    def add(self, e: RmaEntry) -> None:
+        produtos = self._produtos
+        avarias = self._avarias
+        self._produto_codes.append(produtos.setdefault(e.produto_enviado or "", len(produtos)))
+        self._avaria_codes.append(avarias.setdefault(e.configuracao_avaria or "", len(avarias)))
+
+    def add_many(self, entries: Iterable[RmaEntry]) -> None:
+        produtos = self._produtos
+        avarias = self._avarias
+        encode_produto = produtos.setdefault
+        encode_avaria = avarias.setdefault
+        produto_codes = self._produto_codes
+        avaria_codes = self._avaria_codes
+        for e in entries:
+            produto_codes.append(encode_produto(e.produto_enviado or "", len(produtos)))
+            avaria_codes.append(encode_avaria(e.configuracao_avaria or "", len(avarias)))
+
+    def pairs(self) -> PairCounts:
+        import numpy as np
+
+        return count_pairs(
+            np.frombuffer(self._produto_codes, dtype=np.uint32),
+            list(self._produtos),
+            np.frombuffer(self._avaria_codes, dtype=np.uint32),
+            list(self._avarias),
+            clean=self.clean,
+        )
+
+
+def count_pairs(
+    produto_codes: Sequence[int],
+    produto_values: Sequence[str],
+    avaria_codes: Sequence[int],
+    avaria_values: Sequence[str],
+    *,
+    clean: Callable[[str], str] = str.strip,
+) -> PairCounts:
+    import numpy as np
+
+    produtos, produto_remap = _clean_values(produto_values, clean)
+    avarias, avaria_remap = _clean_values(avaria_values, clean)
+
+    width = len(avarias)
+    pairs = produto_remap[np.asarray(produto_codes, dtype=np.int64)] * width
+    pairs += avaria_remap[np.asarray(avaria_codes, dtype=np.int64)]
+
+    bins = len(produtos) * width
+    if bins <= max(len(pairs), _DENSE_BINS):
+        totals = np.bincount(pairs, minlength=bins)
+        first = np.full(bins, len(pairs), dtype=np.int64)
+        np.minimum.at(first, pairs, np.arange(len(pairs), dtype=np.int64))
+        distinct = np.flatnonzero(totals)
+        first, totals = first[distinct], totals[distinct]
+    else:
+        distinct, first, totals = np.unique(pairs, return_index=True, return_counts=True)
+    order = np.argsort(first, kind="stable")
+
+    counts: PairCounts = Counter()
+    for pair, qty in zip(distinct[order].tolist(), totals[order].tolist()):
+        counts[produtos[pair // width], avarias[pair % width]] = qty
+    return counts
+
+
+def summarize_entries_vectorized(
+    entries: Iterable[RmaEntry],
+    *,
+    normalizer: Normalizer | None = None,
+) -> SummaryItems:
+    from excel_exporter import _summary_clean
+
+    encoder = SummaryEncoder(clean=_summary_clean(normalizer))
+    encoder.add_many(entries)
+    return _sorted(encoder.pairs(), normalizer)
+
+
+def summarize_store(
+    store: EntryStore,
+    row_ids: Sequence[int] | None = None,
+    *,
+    normalizer: Normalizer | None = None,
+) -> SummaryItems:
+    import numpy as np
+
+    from excel_exporter import _summary_clean
+
+    slots = np.frombuffer(store.slots(row_ids), dtype=np.uint32)
+    produto_codes, produto_values = store.column_codes("produto_enviado")
+    avaria_codes, avaria_values = store.column_codes("configuracao_avaria")
+    pairs = count_pairs(
+        np.frombuffer(produto_codes, dtype=np.uint32)[slots],
+        produto_values,
+        np.frombuffer(avaria_codes, dtype=np.uint32)[slots],
+        avaria_values,
+        clean=_summary_clean(normalizer),
+    )
+    return _sorted(pairs, normalizer)
+
+
+def _sorted(pairs: PairCounts, normalizer: Normalizer | None) -> SummaryItems:
+    from excel_exporter import _sort_counts, pair_counts
+
+    pieces, reasons = pair_counts(pairs, normalizer)
+    return _sort_counts(pieces), _sort_counts(reasons)
+
+
+def _clean_values(values: Sequence[str], clean: Callable[[str], str]) -> tuple[list[str], numpy.ndarray]:
+    import numpy as np
+
+    stripped: list[str] = [""]
+    codes_by_value = {"": 0}
+    remap = np.empty(len(values), dtype=np.int64)
+    for code, value in enumerate(values):
+        value = clean(value)
+        new_code = codes_by_value.get(value)
+        if new_code is None:
+            new_code = codes_by_value[value] = len(stripped)
+            stripped.append(value)
+        remap[code] = new_code
+    return stripped, remap
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Sequence
+
+
+class VirtualTable(ttk.Frame):
+    def __init__(
+        self,
+        master: tk.Misc,
+        columns: Sequence[str],
+        *,
+        row_ids: Callable[[], Sequence[int]],
+        get_values: Callable[[int], Sequence[str]],
+        buffer_rows: int = 2,
+    ) -> None:
+        super().__init__(master)
+
+        self._row_ids = row_ids
+        self._get_values = get_values
+        self._buffer_rows = buffer_rows
+
+        self.offset = 0
+        self.visible_rows = 1
+        self.on_double_click: Callable[[], None] | None = None
+
+        self._items: list[str] = []
+        self._attached: list[bool] = []
+        self._selected: set[int] = set()
+        self._anchor: int | None = None
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.tree = ttk.Treeview(self, columns=list(columns), show="headings", selectmode="extended")
+        self.yscroll = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        xscroll = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=xscroll.set)
+
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.yscroll.grid(row=0, column=1, sticky="ns")
+        xscroll.grid(row=1, column=0, sticky="ew")
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<Button-1>", self._on_click)
+        self.tree.bind("<Control-Button-1>", lambda e: self._on_click(e, toggle=True))
+        self.tree.bind("<Shift-Button-1>", lambda e: self._on_click(e, extend=True))
+        self.tree.bind("<Double-1>", self._on_double_click)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda _e: self._scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda _e: self._scroll_by(3))
+        self.tree.bind("<Up>", lambda _e: self._move_cursor(-1))
+        self.tree.bind("<Down>", lambda _e: self._move_cursor(1))
+        self.tree.bind("<Prior>", lambda _e: self._scroll_by(-self.visible_rows))
+        self.tree.bind("<Next>", lambda _e: self._scroll_by(self.visible_rows))
+        self.tree.bind("<Control-a>", self._select_all)
+
+    def refresh(self) -> None:
+        row_ids = self._row_ids()
+        total = len(row_ids)
+
+        self.offset = max(0, min(self.offset, total - self.visible_rows))
+
+        selected_items: list[str] = []
+        for pos, item in enumerate(self._items):
+            idx = self.offset + pos
+            if idx < total:
+                row_id = row_ids[idx]
+                self.tree.item(item, values=list(self._get_values(row_id)))
+                if not self._attached[pos]:
+                    self.tree.move(item, "", pos)
+                    self._attached[pos] = True
+                if row_id in self._selected:
+                    selected_items.append(item)
+            elif self._attached[pos]:
+                self.tree.detach(item)
+                self._attached[pos] = False
+
+        self.tree.selection_set(selected_items)
+
+        if total:
+            self.yscroll.set(self.offset / total, min(1.0, (self.offset + self.visible_rows) / total))
+        else:
+            self.yscroll.set(0.0, 1.0)
+
+    def selection(self) -> list[int]:
+        if not self._selected:
+            return []
+        return [rid for rid in self._row_ids() if rid in self._selected]
+
+    def discard(self, row_ids: Sequence[int]) -> None:
+        self._selected.difference_update(row_ids)
+
+    def _on_configure(self, event: tk.Event) -> None:
+        row_height = self._row_height()
+        heading_height = row_height + 4
+        self.visible_rows = max(1, (event.height - heading_height) // row_height)
+
+        wanted = self.visible_rows + self._buffer_rows
+        while len(self._items) < wanted:
+            self._items.append(self.tree.insert("", "end", iid=f"row{len(self._items)}"))
+            self._attached.append(True)
+        while len(self._items) > wanted:
+            self.tree.delete(self._items.pop())
+            self._attached.pop()
+
+        self.refresh()
+
+    def _row_height(self) -> int:
+        value = ttk.Style(self).lookup("Treeview", "rowheight")
+        try:
+            return max(1, int(value))
+        except (TypeError, ValueError):
+            return 20
+
+    def _index_at(self, y: int) -> int | None:
+        item = self.tree.identify_row(y)
+        if not item or item not in self._items:
+            return None
+        idx = self.offset + self._items.index(item)
+        return idx if idx < len(self._row_ids()) else None
+
+    def _on_click(self, event: tk.Event, *, toggle: bool = False, extend: bool = False) -> str | None:
+        if self.tree.identify_region(event.x, event.y) not in {"cell", "tree"}:
+            return None
+
+        self.tree.focus_set()
+        idx = self._index_at(event.y)
+        if idx is None:
+            return "break"
+
+        row_ids = self._row_ids()
+        row_id = row_ids[idx]
+
+        if extend and self._anchor is not None:
+            lo, hi = sorted((self._anchor, idx))
+            self._selected = set(row_ids[lo : hi + 1])
+        elif toggle:
+            self._selected ^= {row_id}
+            self._anchor = idx
+        else:
+            self._selected = {row_id}
+            self._anchor = idx
+
+        self.refresh()
+        return "break"
+
+    def _on_double_click(self, event: tk.Event) -> str | None:
+        if self._index_at(event.y) is None:
+            return "break"
+        if self.on_double_click is not None:
+            self.on_double_click()
+        return "break"
+
+    def _on_mousewheel(self, event: tk.Event) -> str:
+        step = -1 if event.delta > 0 else 1
+        if abs(event.delta) >= 120:
+            step *= 3 * (abs(event.delta) // 120)
+        self._scroll_by(step)
+        return "break"
+
+    def _move_cursor(self, delta: int) -> str:
+        row_ids = self._row_ids()
+        if not row_ids:
+            return "break"
+
+        current = self._anchor if self._anchor is not None else self.offset - delta
+        idx = max(0, min(len(row_ids) - 1, current + delta))
+        self._selected = {row_ids[idx]}
+        self._anchor = idx
+
+        if idx < self.offset:
+            self.offset = idx
+        elif idx >= self.offset + self.visible_rows:
+            self.offset = idx - self.visible_rows + 1
+        self.refresh()
+        return "break"
+
+    def _select_all(self, _event: tk.Event) -> str:
+        self._selected = set(self._row_ids())
+        self.refresh()
+        return "break"
+
+    def _scroll_by(self, rows: int) -> str:
+        self.offset += rows
+        self.refresh()
+        return "break"
+
+    def _on_scrollbar(self, action: str, *args: str) -> None:
+        total = len(self._row_ids())
+        if action == "moveto":
+            self.offset = int(float(args[0]) * total)
+        elif action == "scroll":
+            amount = int(args[0])
+            if args[1] == "pages":
+                amount *= self.visible_rows
+            self.offset += amount
+        self.refresh()